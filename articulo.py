@@ -1,20 +1,53 @@
-from conexion import obtener_conexion
+from conexion import obtener_conexion, consultar
+from ejecutor import obtener_ejecutor
+from cambios import obtener_monitor
+from repositorio import consultar_llaves
+from catalogo import catalogo
+from importador import importar_articulos
+from referencias import referencias
+from modelo_tabla import ModeloTabla, PestanaCatalogo, crear_vista
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QFormLayout,
-    QLineEdit, QPushButton, QTableWidget, QTableWidgetItem,
-    QComboBox, QMessageBox, QHeaderView
+    QLineEdit, QPushButton, QComboBox, QMessageBox, QFileDialog
 )
-from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QDoubleValidator, QIntValidator
 
-class VentanaArticulos(QWidget):
-    def __init__(self, conexion):
+CONSULTA = """
+    SELECT codigo, nombre, precio, costo, existencias, reorden,
+           id_categorias, id_proveedor, id_unidad
+    FROM articulos
+"""
+
+def consultar_articulos(codigos=None):
+    # Solo los IDs de categoría, proveedor y unidad; los nombres salen del caché de referencias
+    if codigos is None:
+        filas = consultar(CONSULTA + " ORDER BY nombre")
+    else:
+        filas = consultar_llaves(CONSULTA, "codigo", codigos)
+    categorias = referencias.nombres("categorias")
+    proveedores = referencias.nombres("proveedores")
+    unidades = referencias.nombres("unidad")
+    return [
+        tuple(fila[:6]) + (
+            categorias.get(fila[6], fila[6]),
+            proveedores.get(fila[7], fila[7]),
+            unidades.get(fila[8], fila[8])
+        )
+        for fila in filas
+    ]
+
+class VentanaArticulos(PestanaCatalogo, QWidget):
+    # Precios y existencias también cambian en una venta o en otra terminal
+    TABLA = "articulos"
+
+    def __init__(self):
         super().__init__()
-        self.conexion = conexion
+        self.version_combos = None
         
         self.init_ui()
         self.cargar_combos()
         self.cargar_datos()
+        obtener_monitor().cambiaron.connect(self.datos_cambiados)
 
     def init_ui(self):
         self.setWindowTitle("Gestión de Artículos")
@@ -61,8 +94,13 @@ class VentanaArticulos(QWidget):
         self.boton_limpiar = QPushButton("🧹 Limpiar")
         self.boton_limpiar.setStyleSheet("background-color: #f44336; color: white;")
         
+        self.boton_importar = QPushButton("📥 Importar CSV")
+        self.boton_importar.setStyleSheet("background-color: #673AB7; color: white;")
+        
+        self.filtro_input = QLineEdit()
+        self.filtro_input.setPlaceholderText("Filtrar por código, nombre, categoría...")
+        
         # Tabla
-        self.tabla = QTableWidget()
         self.configurar_tabla()
         
         # Layouts
@@ -81,10 +119,12 @@ class VentanaArticulos(QWidget):
         button_layout.addWidget(self.boton_agregar)
         button_layout.addWidget(self.boton_actualizar)
         button_layout.addWidget(self.boton_limpiar)
+        button_layout.addWidget(self.boton_importar)
         
         main_layout = QVBoxLayout()
         main_layout.addLayout(form_layout)
         main_layout.addLayout(button_layout)
+        main_layout.addWidget(self.filtro_input)
         main_layout.addWidget(self.tabla)
         
         self.setLayout(main_layout)
@@ -93,48 +133,57 @@ class VentanaArticulos(QWidget):
         self.boton_agregar.clicked.connect(self.agregar)
         self.boton_actualizar.clicked.connect(self.cargar_datos)
         self.boton_limpiar.clicked.connect(self.limpiar_campos)
-        self.tabla.itemDoubleClicked.connect(self.cargar_datos_desde_tabla)
+        self.boton_importar.clicked.connect(self.importar_csv)
+        self.tabla.doubleClicked.connect(self.cargar_datos_desde_tabla)
+        self.filtro_input.textChanged.connect(self.modelo.filtrar)
 
     def configurar_tabla(self):
-        self.tabla.setColumnCount(9)
-        self.tabla.setHorizontalHeaderLabels([
-            "Código", "Nombre", "Precio", "Costo", "Existencias",
-            "Reorden", "Categoría", "Proveedor", "Unidad"
-        ])
-        self.tabla.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        self.tabla.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.tabla.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.modelo = ModeloTabla(
+            ["Código", "Nombre", "Precio", "Costo", "Existencias",
+             "Reorden", "Categoría", "Proveedor", "Unidad"],
+            formatos={2: lambda precio: f"${float(precio):.2f}", 3: lambda costo: f"${float(costo):.2f}"},
+            derecha=(2, 3))
+        self.tabla = crear_vista(self.modelo, 1)
+
+    def showEvent(self, event):
+        # Si se cambió una categoría, proveedor o unidad en otra pestaña, recargar los combos
+        super().showEvent(event)
+        if self.version_combos is not None and self.version_combos != referencias.version:
+            self.cargar_combos()
+            self.cargar_datos()
 
     def cargar_combos(self):
-        conexion = None
-        cursor = None
-        try:
-            conexion = obtener_conexion()
-            cursor = conexion.cursor()
+        self.version_combos = referencias.version
+        obtener_ejecutor().ejecutar(
+            referencias.todas,
+            clave=(id(self), "cargar_combos"),
+            al_terminar=self.mostrar_combos,
+            al_fallar=lambda e: QMessageBox.critical(self, "Error", f"Error al cargar combos:\n{e}")
+        )
 
-            # Agregar item vacío al inicio de cada combo
-            self.categoria_combo.addItem("", None)
-            cursor.execute("SELECT id_categorias, nombre FROM categorias")
-            for id_cat, nombre in cursor.fetchall():
-                self.categoria_combo.addItem(nombre, id_cat)
+    def mostrar_combos(self, combos):
+        categorias, proveedores, unidades = combos
 
-            self.proveedor_combo.addItem("", None)
-            cursor.execute("SELECT id_proveedor, nombre FROM proveedores")
-            for id_prov, nombre in cursor.fetchall():
-                self.proveedor_combo.addItem(nombre, id_prov)
+        # Se recargan al cambiar las referencias: conservar lo seleccionado
+        seleccion = [combo.currentData() for combo in (self.categoria_combo, self.proveedor_combo, self.unidad_combo)]
+        for combo in (self.categoria_combo, self.proveedor_combo, self.unidad_combo):
+            combo.clear()
 
-            self.unidad_combo.addItem("", None)
-            cursor.execute("SELECT id_unidad, nombre FROM unidad")
-            for id_uni, nombre in cursor.fetchall():
-                self.unidad_combo.addItem(nombre, id_uni)
+        # Agregar item vacío al inicio de cada combo
+        self.categoria_combo.addItem("", None)
+        for id_cat, nombre in categorias:
+            self.categoria_combo.addItem(nombre, id_cat)
 
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error al cargar combos:\n{e}")
-        finally:
-            if cursor:
-                cursor.close()
-            if conexion:
-                conexion.close()
+        self.proveedor_combo.addItem("", None)
+        for id_prov, nombre in proveedores:
+            self.proveedor_combo.addItem(nombre, id_prov)
+
+        self.unidad_combo.addItem("", None)
+        for id_uni, nombre in unidades:
+            self.unidad_combo.addItem(nombre, id_uni)
+
+        for combo, dato in zip((self.categoria_combo, self.proveedor_combo, self.unidad_combo), seleccion):
+            combo.setCurrentIndex(max(combo.findData(dato), 0) if dato is not None else 0)
 
     def agregar(self):
         conexion = None
@@ -180,9 +229,14 @@ class VentanaArticulos(QWidget):
             valores = (codigo, nombre, precio, costo, existencias, reorden, id_categoria, id_proveedor, id_unidad)
             cursor.execute(query, valores)
             conexion.commit()
+            catalogo.actualizar_articulo(codigo, nombre, precio, existencias)
+            self.modelo.guardar((
+                codigo, nombre, precio, costo, existencias, reorden,
+                self.categoria_combo.currentText(), self.proveedor_combo.currentText(),
+                self.unidad_combo.currentText()
+            ))
             
             QMessageBox.information(self, "Éxito", "Artículo agregado correctamente")
-            self.cargar_datos()
             self.limpiar_campos()
             
         except Exception as e:
@@ -195,66 +249,59 @@ class VentanaArticulos(QWidget):
             if conexion:
                 conexion.close()
 
-    def cargar_datos(self):
-        conexion = None
-        cursor = None
-        try:
-            self.tabla.setRowCount(0)
-            conexion = obtener_conexion()
-            cursor = conexion.cursor()
-            cursor.execute("""
-                SELECT a.codigo, a.nombre, a.precio, a.costo, a.existencias, a.reorden,
-                       c.nombre, p.nombre, u.nombre
-                FROM articulos a
-                JOIN categorias c ON a.id_categorias = c.id_categorias
-                JOIN proveedores p ON a.id_proveedor = p.id_proveedor
-                JOIN unidad u ON a.id_unidad = u.id_unidad
-                ORDER BY a.nombre
-            """)
+    def importar_csv(self):
+        archivo, _ = QFileDialog.getOpenFileName(
+            self, "Importar artículos", "", "Archivos CSV (*.csv);;Todos los archivos (*)")
+        if not archivo:
+            return
             
-            for row_idx, row in enumerate(cursor.fetchall()):
-                self.tabla.insertRow(row_idx)
-                for col_idx, dato in enumerate(row):
-                    item = QTableWidgetItem(str(dato))
-                    if col_idx in (2, 3):  # Columnas de precio y costo
-                        item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-                        if col_idx == 2:  # Precio
-                            item.setText(f"${float(dato):.2f}")
-                        elif col_idx == 3:  # Costo
-                            item.setText(f"${float(dato):.2f}")
-                    self.tabla.setItem(row_idx, col_idx, item)
-                    
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error al cargar datos:\n{e}")
-        finally:
-            if cursor:
-                cursor.close()
-            if conexion:
-                conexion.close()
+        # La importación corre en segundo plano; el archivo se procesa por lotes
+        self.boton_importar.setEnabled(False)
+        self.boton_importar.setText("⏳ Importando...")
+        obtener_ejecutor().ejecutar(
+            importar_articulos, archivo,
+            clave=(id(self), "importar"),
+            al_terminar=self.importacion_terminada,
+            al_fallar=self.importacion_fallida
+        )
 
-    def cargar_datos_desde_tabla(self, item):
-        row = item.row()
-        self.codigo_input.setText(self.tabla.item(row, 0).text())
-        self.nombre_input.setText(self.tabla.item(row, 1).text())
-        self.precio_input.setText(self.tabla.item(row, 2).text().replace('$', ''))
-        self.costo_input.setText(self.tabla.item(row, 3).text().replace('$', ''))
-        self.existencias_input.setText(self.tabla.item(row, 4).text())
-        self.reorden_input.setText(self.tabla.item(row, 5).text())
+    def importacion_terminada(self, resultado):
+        self.boton_importar.setEnabled(True)
+        self.boton_importar.setText("📥 Importar CSV")
+        if resultado.con_error:
+            QMessageBox.warning(self, "Importación con errores", resultado.resumen())
+        else:
+            QMessageBox.information(self, "Importación terminada", resultado.resumen())
+        self.cargar_datos()
+
+    def importacion_fallida(self, error):
+        self.boton_importar.setEnabled(True)
+        self.boton_importar.setText("📥 Importar CSV")
+        QMessageBox.critical(self, "Error", f"No se pudo importar el archivo:\n{error}")
+
+    def consultar_datos(self, llaves=None):
+        return consultar_articulos(llaves)
+
+    def cargar_datos_desde_tabla(self, indice):
+        (codigo, nombre, precio, costo, existencias, reorden,
+         categoria, proveedor, unidad) = self.modelo.fila(indice)
+        self.codigo_input.setText(codigo)
+        self.nombre_input.setText(nombre)
+        self.precio_input.setText(f"{float(precio):.2f}")
+        self.costo_input.setText(f"{float(costo):.2f}")
+        self.existencias_input.setText(str(existencias))
+        self.reorden_input.setText(str(reorden))
         
         # Establecer los combos según los valores
-        categoria = self.tabla.item(row, 6).text()
-        proveedor = self.tabla.item(row, 7).text()
-        unidad = self.tabla.item(row, 8).text()
-        
-        index = self.categoria_combo.findText(categoria)
+        index = self.categoria_combo.findText(str(categoria))
         if index >= 0:
             self.categoria_combo.setCurrentIndex(index)
             
-        index = self.proveedor_combo.findText(proveedor)
+        index = self.proveedor_combo.findText(str(proveedor))
         if index >= 0:
             self.proveedor_combo.setCurrentIndex(index)
             
-        index = self.unidad_combo.findText(unidad)
+        index = self.unidad_combo.findText(str(unidad))
         if index >= 0:
             self.unidad_combo.setCurrentIndex(index)
 
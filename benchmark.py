@@ -0,0 +1,451 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+# Las ventanas se crean sin pantalla
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import mysql.connector
+from conexion import CONFIGURACION, configurar_pool, cerrar_pool, obtener_conexion
+from migraciones import ARCHIVO_ESQUEMA, sentencias_sql
+from ejecutor import obtener_ejecutor
+from catalogo import catalogo
+from directorio import directorio
+from secuencia import folios_venta, folios_compra
+from bitacora import BitacoraVentas
+from servicio_compra import guardar_compra
+from reportes import reconstruir_resumenes
+from exportador import filtros_ventas
+from venta import ModeloCarrito
+from detalles_venta import ModeloVentas
+from repositorio import detalles_de_venta
+from articulo import VentanaArticulos
+from cliente import VentanaClientes
+from PyQt6.QtWidgets import QApplication
+
+# Mide las rutas de datos de la caja contra un MySQL local, en una base de datos aparte
+# que se crea desde db23270637.sql y se llena con datos sintéticos de cada tamaño.
+BASE_BENCHMARK = "BodegaAurrera_benchmark"
+TAMANOS = [1000, 100000, 1000000]
+REPETICIONES = 200          # Por prueba ligera
+REPETICIONES_PESADAS = 3    # Por prueba que carga tablas completas
+LOTE_CARGA = 5000           # Filas por INSERT al llenar la base
+LINEAS_COMPRA = 2000        # Renglones de la entrega que se registra en registrar_compra
+DIAS_HISTORIAL = 3 * 365    # Las ventas se reparten en este número de días
+UMBRAL_REGRESION = 1.2      # Un p50 o p99 20% mayor que el anterior se reporta
+BASE_TIENDA = CONFIGURACION["database"]  # Nunca se usa como base de prueba
+
+METODOS_PAGO = ["EFECTIVO", "TARJETA", "TRANSFERENCIA"]
+PALABRAS = [
+    "Leche", "Yoghurt", "Catsup", "Galletas", "Harina", "Cafe", "Te", "Jugo", "Pasta",
+    "Mermelada", "Crema", "Chile", "Salsa", "Cereal", "Refresco", "Agua", "Pan", "Queso",
+    "Lala", "Gamesa", "Maseca", "Nestle", "Bimbo", "Herdez", "Great Value", "Clemente Jacques"
+]
+
+
+def _ahora():
+    return time.perf_counter()
+
+
+def _esperar_ui():
+    # Espera las consultas en segundo plano y entrega sus resultados a las ventanas
+    obtener_ejecutor().esperar()
+    QApplication.processEvents()
+
+
+def _percentil(ordenados, fraccion):
+    posicion = min(len(ordenados) - 1, max(0, int(round(fraccion * len(ordenados))) - 1))
+    return ordenados[posicion]
+
+
+def estadisticas(tiempos):
+    ordenados = sorted(tiempos)
+    total = sum(ordenados)
+    return {
+        "repeticiones": len(ordenados),
+        "p50_ms": round(_percentil(ordenados, 0.50) * 1000, 3),
+        "p99_ms": round(_percentil(ordenados, 0.99) * 1000, 3),
+        "media_ms": round(total / len(ordenados) * 1000, 3),
+        "por_segundo": round(len(ordenados) / total, 1) if total else None
+    }
+
+
+# ---------------------------------------------------------------------------
+# Base de datos de prueba
+# ---------------------------------------------------------------------------
+
+def _conectar_servidor():
+    opciones = dict(CONFIGURACION)
+    opciones.pop("database", None)
+    opciones["autocommit"] = True
+    return mysql.connector.connect(**opciones)
+
+
+def crear_base(base):
+    if base == BASE_TIENDA:
+        raise ValueError("El benchmark borra la base de datos; usa una distinta a la de la tienda")
+
+    with open(ARCHIVO_ESQUEMA, encoding="utf-8") as archivo:
+        esquema = archivo.read().replace("`BodegaAurrera`", f"`{base}`")
+
+    servidor = _conectar_servidor()
+    cursor = servidor.cursor()
+    try:
+        cursor.execute(f"DROP DATABASE IF EXISTS `{base}`")
+        for sentencia in sentencias_sql(esquema):
+            cursor.execute(sentencia)
+        cursor.execute("SELECT VERSION()")
+        return cursor.fetchone()[0]
+    finally:
+        cursor.close()
+        servidor.close()
+
+
+def _insertar(conexion_bd, cursor, sql, filas):
+    for inicio in range(0, len(filas), LOTE_CARGA):
+        cursor.executemany(sql, filas[inicio:inicio + LOTE_CARGA])
+        conexion_bd.commit()
+
+
+def poblar(tamano, semilla):
+    # tamano artículos, tamano ventas (1 a 5 renglones cada una), tamano/10 clientes
+    azar = random.Random(semilla)
+    hoy = date.today()
+    codigos = [str(7800000000000 + i) for i in range(tamano)]
+    telefonos = ["0000000000"] + [str(5500000000 + i) for i in range(max(tamano // 10, 10))]
+
+    conexion_bd = None
+    cursor = None
+    try:
+        conexion_bd = obtener_conexion()
+        cursor = conexion_bd.cursor()
+        cursor.execute("SET SESSION foreign_key_checks = 0, unique_checks = 0")
+
+        articulos = []
+        for codigo in codigos:
+            nombre = f"{azar.choice(PALABRAS)} {azar.choice(PALABRAS)} {codigo[-6:]}"
+            precio = round(azar.uniform(5, 300), 2)
+            articulos.append((codigo, nombre, precio, round(precio * 0.8, 2), 10 ** 8, "10",
+                              azar.randint(1, 10), 1, azar.randint(1, 7)))
+        _insertar(conexion_bd, cursor, """
+            INSERT INTO articulos (codigo, nombre, precio, costo, existencias, reorden,
+                                   id_categorias, id_proveedor, id_unidad)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, articulos)
+        precios = {fila[0]: fila[2] for fila in articulos}
+        del articulos
+
+        _insertar(conexion_bd, cursor, """
+            INSERT INTO clientes (telefono, nombre, direccion) VALUES (%s, %s, %s)
+        """, [(telefono, f"Cliente {telefono}", "Sin dirección") for telefono in telefonos[1:]])
+
+        # Las ventas se generan por bloques para no tener el historial completo en memoria
+        for inicio in range(1, tamano + 1, LOTE_CARGA):
+            ventas = []
+            detalles = []
+            facturas = []
+            for id_venta in range(inicio, min(inicio + LOTE_CARGA, tamano + 1)):
+                importe = 0
+                for codigo in azar.sample(codigos, azar.randint(1, min(5, tamano))):
+                    cantidad = azar.randint(1, 4)
+                    detalles.append((id_venta, codigo, cantidad, precios[codigo]))
+                    importe += cantidad * precios[codigo]
+                ventas.append((id_venta, hoy - timedelta(days=azar.randrange(DIAS_HISTORIAL)),
+                               round(importe, 2), azar.choice(telefonos), azar.randint(1, 3),
+                               azar.choice(METODOS_PAGO)))
+                if azar.random() < 0.05:
+                    facturas.append((id_venta, "XAXX010101000", "Cliente de prueba",
+                                     "Sin dirección", "factura@ejemplo.com"))
+            _insertar(conexion_bd, cursor, """
+                INSERT INTO venta (id_venta, fecha, importe, telefono, id_empleado, metodo_pago)
+                VALUES (%s, %s, %s, %s, %s, %s)
+            """, ventas)
+            _insertar(conexion_bd, cursor, """
+                INSERT INTO detalles_venta (id_venta, codigo, cantidad, precio) VALUES (%s, %s, %s, %s)
+            """, detalles)
+            if facturas:
+                _insertar(conexion_bd, cursor, """
+                    INSERT INTO facturas (id_venta, rfc, razon_social, direccion_fiscal, email)
+                    VALUES (%s, %s, %s, %s, %s)
+                """, facturas)
+        # La conexión vuelve al pool: las pruebas la usan con las verificaciones normales
+        cursor.execute("SET SESSION foreign_key_checks = 1, unique_checks = 1")
+    finally:
+        if cursor:
+            cursor.close()
+        if conexion_bd:
+            conexion_bd.close()
+
+    reconstruir_resumenes()
+    return codigos, telefonos
+
+
+# ---------------------------------------------------------------------------
+# Pruebas
+# ---------------------------------------------------------------------------
+
+def prueba_cargar_catalogo(datos, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = _ahora()
+        catalogo.cargar()
+        tiempos.append(_ahora() - inicio)
+    return tiempos
+
+
+def prueba_buscar_producto(datos, repeticiones):
+    catalogo.preparar_busqueda()
+    tiempos = []
+    for _ in range(repeticiones):
+        texto = datos["azar"].choice(PALABRAS)[:datos["azar"].randint(2, 6)].lower()
+        inicio = _ahora()
+        catalogo.buscar(texto)
+        tiempos.append(_ahora() - inicio)
+    return tiempos
+
+
+def prueba_buscar_cliente(datos, repeticiones):
+    # Fragmentos de teléfono como los que teclea el cajero en el directorio
+    directorio.preparar_busqueda()
+    tiempos = []
+    for _ in range(repeticiones):
+        telefono = datos["azar"].choice(datos["telefonos"])
+        inicio_fragmento = datos["azar"].randrange(0, 7)
+        texto = telefono[inicio_fragmento:inicio_fragmento + datos["azar"].randint(3, 6)]
+        inicio = _ahora()
+        directorio.buscar(texto)
+        tiempos.append(_ahora() - inicio)
+    return tiempos
+
+
+def prueba_agregar_producto(datos, repeticiones):
+    # Lo que hace VentanaVenta.agregar_producto con un código nuevo: catálogo y carrito
+    carrito = ModeloCarrito()
+    tiempos = []
+    for _ in range(repeticiones):
+        codigo = datos["azar"].choice(datos["codigos"])
+        inicio = _ahora()
+        fila = carrito.fila_de(codigo)
+        if fila is None:
+            nombre, precio, existencias = catalogo.obtener(codigo)
+            carrito.agregar(codigo, nombre, 1, precio)
+        else:
+            carrito.establecer_cantidad(fila, carrito.cantidad(fila) + 1)
+        tiempos.append(_ahora() - inicio)
+    return tiempos
+
+
+def prueba_actualizar_cantidad(datos, repeticiones):
+    carrito = ModeloCarrito()
+    for codigo in datos["azar"].sample(datos["codigos"], min(50, len(datos["codigos"]))):
+        nombre, precio, _ = catalogo.obtener(codigo)
+        carrito.agregar(codigo, nombre, 1, precio)
+    tiempos = []
+    for _ in range(repeticiones):
+        fila = datos["azar"].randrange(carrito.rowCount())
+        cantidad = datos["azar"].randint(1, 10)
+        inicio = _ahora()
+        codigo = carrito.productos()[fila][0]
+        if catalogo.existencias(codigo) >= cantidad:
+            carrito.establecer_cantidad(fila, cantidad)
+        tiempos.append(_ahora() - inicio)
+    return tiempos
+
+
+def prueba_procesar_pago(datos, repeticiones):
+    # Venta de 5 renglones registrada en MySQL como lo hace el envío de la bitácora, pero
+    # una por una y en línea, para medir la transacción y no el disco local
+    with tempfile.TemporaryDirectory() as carpeta:
+        bitacora = BitacoraVentas(os.path.join(carpeta, "bitacora.db"), priorizar=False)
+        tiempos = []
+        for _ in range(repeticiones):
+            productos = []
+            for codigo in datos["azar"].sample(datos["codigos"], min(5, len(datos["codigos"]))):
+                nombre, precio, _ = catalogo.obtener(codigo)
+                productos.append((codigo, nombre, 1, precio))
+            venta = {
+                "fecha": datetime.now().strftime("%Y-%m-%d"),
+                "total": round(sum(precio for _, _, _, precio in productos), 2),
+                "telefono": datos["azar"].choice(datos["telefonos"]),
+                "id_empleado": 3,
+                "metodo_pago": "EFECTIVO",
+                "productos": productos,
+                "datos_factura": None
+            }
+            inicio = _ahora()
+            _, en_linea = bitacora.guardar_venta(venta)
+            tiempos.append(_ahora() - inicio)
+            if not en_linea:
+                raise RuntimeError(f"La venta quedó en la bitácora: {bitacora.ultimo_error}")
+        return tiempos
+
+
+def prueba_registrar_compra(datos, repeticiones):
+    # Entrega de LINEAS_COMPRA códigos distintos por la misma ruta que la pestaña Compras
+    tiempos = []
+    for numero in range(repeticiones):
+        codigos = datos["azar"].sample(datos["codigos"], min(LINEAS_COMPRA, len(datos["codigos"])))
+        lineas = [(codigo, datos["azar"].randint(1, 48), None if indice % 2 else 12.5)
+                  for indice, codigo in enumerate(codigos)]
+        inicio = _ahora()
+        guardar_compra(f"BENCH-{numero}", "FACTURA", date.today(), 1, lineas)
+        tiempos.append(_ahora() - inicio)
+    return tiempos
+
+
+def prueba_cargar_ventas(datos, repeticiones):
+    # Primera página de la pestaña Detalles Ventas con el filtro por defecto (último mes)
+    modelo = ModeloVentas()
+    hasta = date.today()
+    desde = hasta - timedelta(days=30)
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = _ahora()
+        modelo.establecer_filtro(*filtros_ventas(desde.isoformat(), hasta.isoformat()))
+        _esperar_ui()
+        tiempos.append(_ahora() - inicio)
+    return tiempos
+
+
+def prueba_cargar_detalles_venta(datos, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        id_venta = datos["azar"].randint(1, datos["tamano"])
+        inicio = _ahora()
+        detalles_de_venta(id_venta)
+        tiempos.append(_ahora() - inicio)
+    return tiempos
+
+
+def _prueba_cargar_pestana(clase):
+    def prueba(datos, repeticiones):
+        ventana = clase()
+        _esperar_ui()
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = _ahora()
+            ventana.cargar_datos()
+            _esperar_ui()
+            tiempos.append(_ahora() - inicio)
+        ventana.deleteLater()
+        return tiempos
+    return prueba
+
+
+# nombre -> (función, es pesada)
+PRUEBAS = {
+    "cargar_catalogo": (prueba_cargar_catalogo, True),
+    "buscar_producto": (prueba_buscar_producto, False),
+    "buscar_cliente": (prueba_buscar_cliente, False),
+    "agregar_producto": (prueba_agregar_producto, False),
+    "actualizar_cantidad": (prueba_actualizar_cantidad, False),
+    "procesar_pago": (prueba_procesar_pago, False),
+    "registrar_compra": (prueba_registrar_compra, True),
+    "cargar_ventas": (prueba_cargar_ventas, False),
+    "cargar_detalles_venta": (prueba_cargar_detalles_venta, False),
+    "articulos_cargar_datos": (_prueba_cargar_pestana(VentanaArticulos), True),
+    "clientes_cargar_datos": (_prueba_cargar_pestana(VentanaClientes), True),
+}
+
+
+def ejecutar(tamanos, pruebas, repeticiones, repeticiones_pesadas, base, semilla):
+    CONFIGURACION["database"] = base
+    resultado = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit_actual(),
+        "python": platform.python_version(),
+        "base": base,
+        "tamanos": {}
+    }
+
+    for tamano in tamanos:
+        print(f"[{tamano}] creando y llenando {base}...", file=sys.stderr)
+        cerrar_pool()
+        resultado["servidor"] = crear_base(base)
+        configurar_pool()
+        folios_venta.reiniciar()
+        folios_compra.reiniciar()
+        catalogo.invalidar()
+        directorio.invalidar()
+
+        inicio = _ahora()
+        codigos, telefonos = poblar(tamano, semilla)
+        print(f"[{tamano}] datos listos en {_ahora() - inicio:.1f} s", file=sys.stderr)
+
+        datos = {"tamano": tamano, "codigos": codigos, "telefonos": telefonos,
+                 "azar": random.Random(semilla)}
+        catalogo.cargar()
+        resultado["tamanos"][str(tamano)] = medidas = {}
+        for nombre in pruebas:
+            funcion, pesada = PRUEBAS[nombre]
+            tiempos = funcion(datos, repeticiones_pesadas if pesada else repeticiones)
+            medidas[nombre] = estadisticas(tiempos)
+            print(f"[{tamano}] {nombre}: p50 {medidas[nombre]['p50_ms']} ms, "
+                  f"p99 {medidas[nombre]['p99_ms']} ms, "
+                  f"{medidas[nombre]['por_segundo']}/s", file=sys.stderr)
+
+    cerrar_pool()
+    return resultado
+
+
+def comparar(anterior, actual):
+    # Devuelve las pruebas cuyo p50 o p99 creció más que UMBRAL_REGRESION
+    regresiones = []
+    for tamano, medidas in actual["tamanos"].items():
+        for nombre, medida in medidas.items():
+            previa = anterior.get("tamanos", {}).get(tamano, {}).get(nombre)
+            if not previa:
+                continue
+            for campo in ("p50_ms", "p99_ms"):
+                if previa[campo] and medida[campo] / previa[campo] > UMBRAL_REGRESION:
+                    regresiones.append((tamano, nombre, campo, previa[campo], medida[campo]))
+    return regresiones
+
+
+def _commit_actual():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de las rutas de datos del punto de venta")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=TAMANOS,
+                        help="filas de catálogo e historial de ventas por corrida")
+    parser.add_argument("--pruebas", nargs="+", choices=list(PRUEBAS), default=list(PRUEBAS))
+    parser.add_argument("--repeticiones", type=int, default=REPETICIONES)
+    parser.add_argument("--repeticiones-pesadas", type=int, default=REPETICIONES_PESADAS)
+    parser.add_argument("--base", default=BASE_BENCHMARK,
+                        help="base de datos de prueba; se borra y se vuelve a crear")
+    parser.add_argument("--semilla", type=int, default=1)
+    parser.add_argument("--salida", help="archivo JSON de resultados (por defecto benchmark-<commit>.json)")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior para detectar regresiones")
+    argumentos = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    resultado = ejecutar(argumentos.tamanos, argumentos.pruebas, argumentos.repeticiones,
+                         argumentos.repeticiones_pesadas, argumentos.base, argumentos.semilla)
+
+    salida = argumentos.salida or f"benchmark-{resultado['commit'] or 'local'}.json"
+    with open(salida, "w", encoding="utf-8") as archivo:
+        json.dump(resultado, archivo, indent=2, ensure_ascii=False)
+    print(f"Resultados guardados en {salida}")
+
+    if argumentos.comparar:
+        with open(argumentos.comparar, encoding="utf-8") as archivo:
+            regresiones = comparar(json.load(archivo), resultado)
+        for tamano, nombre, campo, antes, despues in regresiones:
+            print(f"REGRESIÓN [{tamano}] {nombre} {campo}: {antes} ms -> {despues} ms")
+        if not regresiones:
+            print("Sin regresiones respecto a " + argumentos.comparar)
+        sys.exit(1 if regresiones else 0)
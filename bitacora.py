@@ -0,0 +1,287 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from conexion import obtener_pool, es_falla_de_conexion
+from secuencia import folios_venta
+from servicio_venta import registrar_venta
+
+# Bitácora local de ventas: si MySQL no responde, la venta se guarda en un archivo
+# SQLite y un hilo la envía después, en el mismo orden en que se cobró.
+ARCHIVO_BITACORA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ventas_pendientes.db")
+ESPERA_EN_LINEA = 2         # Segundos máximos esperando una conexión antes de usar la bitácora
+LECTURA_EN_LINEA = 3        # Segundos máximos por respuesta de MySQL al cobrar en línea
+PRIORIZAR_BITACORA = True   # Toda venta se confirma primero en la bitácora; False: en línea si MySQL responde
+TAMANO_LOTE = 50            # Ventas por transacción al enviar
+INTERVALO_ENVIO = 5         # Segundos entre intentos de envío
+ESPERA_MAXIMA = 120         # Tope del intervalo cuando MySQL sigue sin responder
+
+log = logging.getLogger("pos.bitacora")
+
+
+class BitacoraVentas:
+    def __init__(self, archivo=ARCHIVO_BITACORA, priorizar=PRIORIZAR_BITACORA):
+        self.archivo = archivo
+        self.priorizar = priorizar
+        self.ultimo_error = None
+        self._envio = threading.Lock()  # Un solo envío a la vez para conservar el orden
+        self._despertar = threading.Event()
+        self._detener = threading.Event()
+        self._hilo = None
+        self._crear()
+
+    def _abrir(self):
+        conexion = sqlite3.connect(self.archivo, timeout=10)
+        # Cada commit llega al disco antes de confirmar el cobro
+        conexion.execute("PRAGMA synchronous=FULL")
+        return conexion
+
+    def _crear(self):
+        conexion = self._abrir()
+        try:
+            conexion.execute("PRAGMA journal_mode=WAL")
+            conexion.execute("""
+                CREATE TABLE IF NOT EXISTS ventas (
+                    id_local INTEGER PRIMARY KEY AUTOINCREMENT,
+                    id_venta INTEGER,
+                    datos TEXT NOT NULL,
+                    registrada REAL NOT NULL,
+                    intentos INTEGER NOT NULL DEFAULT 0,
+                    fallida INTEGER NOT NULL DEFAULT 0,
+                    error TEXT
+                )
+            """)
+            conexion.commit()
+        finally:
+            conexion.close()
+
+    def guardar_venta(self, venta):
+        # venta: dict con fecha, total, telefono, id_empleado, metodo_pago, productos y
+        # datos_factura. Devuelve (id_venta, en_linea); id_venta es None si la venta
+        # quedó en la bitácora sin folio (se asigna al enviarla) y en_linea es False si
+        # MySQL no respondió. StockInsuficiente y los errores de datos se propagan.
+        if self.priorizar or self.pendientes():
+            # El cobro solo espera al disco local: el folio sale del bloque ya reservado y el
+            # hilo de envío manda la venta enseguida. Con ventas en cola, las nuevas esperan
+            # su turno para no alterar el orden.
+            venta["id_venta"] = folios_venta.reservado()
+            return self._encolar(venta), self.ultimo_error is None
+
+        try:
+            venta["id_venta"] = folios_venta.siguiente()
+            self._registrar_en_linea(venta)
+            return venta["id_venta"], True
+        except Exception as e:
+            if not es_falla_de_conexion(e):
+                raise
+            self.ultimo_error = str(e)
+            return self._encolar(venta), False
+
+    def _registrar_en_linea(self, venta):
+        conexion = obtener_pool().obtener(espera=ESPERA_EN_LINEA)
+        cursor = None
+        try:
+            # Un MySQL lento cuenta como caído: la venta pasa a la bitácora
+            conexion.limitar_lectura(LECTURA_EN_LINEA)
+            cursor = conexion.cursor()
+            registrar_venta(
+                cursor, venta["id_venta"], venta["fecha"], venta["total"], venta["telefono"],
+                venta["id_empleado"], venta["metodo_pago"], venta["productos"],
+                venta["datos_factura"]
+            )
+            conexion.commit()
+        except Exception:
+            try:
+                conexion.rollback()
+            except Exception:
+                pass
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+            try:
+                conexion.limitar_lectura(None)
+            except Exception:
+                pass
+            conexion.close()
+
+    def _encolar(self, venta):
+        id_venta = venta.get("id_venta")
+        conexion = self._abrir()
+        try:
+            conexion.execute(
+                "INSERT INTO ventas (id_venta, datos, registrada) VALUES (?, ?, ?)",
+                (id_venta, json.dumps(venta, default=str), time.time()))
+            conexion.commit()
+        finally:
+            conexion.close()
+        self._despertar.set()
+        return id_venta
+
+    def pendientes(self):
+        conexion = self._abrir()
+        try:
+            return conexion.execute("SELECT COUNT(*) FROM ventas WHERE fallida = 0").fetchone()[0]
+        finally:
+            conexion.close()
+
+    def fallidas(self):
+        # Ventas que MySQL rechazó por sus datos; requieren revisión manual
+        conexion = self._abrir()
+        try:
+            return conexion.execute(
+                "SELECT id_local, id_venta, datos, error FROM ventas WHERE fallida = 1 ORDER BY id_local"
+            ).fetchall()
+        finally:
+            conexion.close()
+
+    def enviar(self):
+        # Envía la cola completa por lotes. Una falla de conexión detiene el envío y
+        # deja el resto para el siguiente intento; devuelve cuántas ventas se enviaron.
+        with self._envio:
+            enviadas = 0
+            while True:
+                lote = self._siguiente_lote()
+                if not lote:
+                    return enviadas
+                lote = self._asignar_folios(lote)
+                try:
+                    self._enviar_lote(lote)
+                    enviadas += len(lote)
+                except Exception as e:
+                    if es_falla_de_conexion(e):
+                        self._contar_intento(lote, e)
+                        raise
+                    # Alguna venta del lote no es válida: se envían una por una para aislarla
+                    for entrada in lote:
+                        try:
+                            self._enviar_lote([entrada])
+                            enviadas += 1
+                        except Exception as e:
+                            if es_falla_de_conexion(e):
+                                self._contar_intento([entrada], e)
+                                raise
+                            self._marcar_fallida(entrada, e)
+
+    def _siguiente_lote(self):
+        conexion = self._abrir()
+        try:
+            filas = conexion.execute(
+                "SELECT id_local, id_venta, datos FROM ventas WHERE fallida = 0 ORDER BY id_local LIMIT ?",
+                (TAMANO_LOTE,)).fetchall()
+        finally:
+            conexion.close()
+        return [(id_local, id_venta, json.loads(datos)) for id_local, id_venta, datos in filas]
+
+    def _asignar_folios(self, lote):
+        # El folio se guarda en la bitácora antes de enviar: si el envío se corta a la
+        # mitad, el reintento usa el mismo folio y no duplica la venta
+        resultado = []
+        for id_local, id_venta, venta in lote:
+            if id_venta is None:
+                id_venta = folios_venta.siguiente()
+                conexion = self._abrir()
+                try:
+                    conexion.execute("UPDATE ventas SET id_venta = ? WHERE id_local = ?", (id_venta, id_local))
+                    conexion.commit()
+                finally:
+                    conexion.close()
+            resultado.append((id_local, id_venta, venta))
+        return resultado
+
+    def _enviar_lote(self, lote):
+        conexion = obtener_pool().obtener()
+        cursor = None
+        try:
+            cursor = conexion.cursor()
+
+            # Ventas que ya llegaron en un intento anterior (se cortó antes de borrarlas aquí)
+            ids = [id_venta for _, id_venta, _ in lote]
+            cursor.execute(
+                f"SELECT id_venta FROM venta WHERE id_venta IN ({', '.join(['%s'] * len(ids))})", ids)
+            existentes = {fila[0] for fila in cursor.fetchall()}
+
+            for _, id_venta, venta in lote:
+                if id_venta in existentes:
+                    continue
+                registrar_venta(
+                    cursor, id_venta, venta["fecha"], venta["total"], venta["telefono"],
+                    venta["id_empleado"], venta["metodo_pago"], venta["productos"],
+                    venta["datos_factura"], validar_existencias=False
+                )
+            conexion.commit()
+        except Exception:
+            try:
+                conexion.rollback()
+            except Exception:
+                pass
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+            conexion.close()
+
+        self._borrar([id_local for id_local, _, _ in lote])
+
+    def _borrar(self, ids_locales):
+        conexion = self._abrir()
+        try:
+            conexion.executemany("DELETE FROM ventas WHERE id_local = ?", [(i,) for i in ids_locales])
+            conexion.commit()
+        finally:
+            conexion.close()
+
+    def _contar_intento(self, lote, error):
+        conexion = self._abrir()
+        try:
+            conexion.executemany(
+                "UPDATE ventas SET intentos = intentos + 1, error = ? WHERE id_local = ?",
+                [(str(error), id_local) for id_local, _, _ in lote])
+            conexion.commit()
+        finally:
+            conexion.close()
+
+    def _marcar_fallida(self, entrada, error):
+        log.error("Venta %s rechazada al enviar la bitácora: %s", entrada[1], error)
+        conexion = self._abrir()
+        try:
+            conexion.execute(
+                "UPDATE ventas SET fallida = 1, intentos = intentos + 1, error = ? WHERE id_local = ?",
+                (str(error), entrada[0]))
+            conexion.commit()
+        finally:
+            conexion.close()
+
+    def iniciar(self):
+        if self._hilo and self._hilo.is_alive():
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._ciclo, name="envio-bitacora", daemon=True)
+        self._hilo.start()
+
+    def detener(self, espera=5):
+        self._detener.set()
+        self._despertar.set()
+        if self._hilo:
+            self._hilo.join(espera)
+
+    def _ciclo(self):
+        intervalo = INTERVALO_ENVIO
+        while not self._detener.is_set():
+            self._despertar.wait(intervalo)
+            self._despertar.clear()
+            if self._detener.is_set():
+                break
+            try:
+                self.enviar()
+                self.ultimo_error = None
+                intervalo = INTERVALO_ENVIO
+            except Exception as e:
+                # MySQL sigue sin responder: se espera cada vez más entre intentos
+                self.ultimo_error = str(e)
+                intervalo = min(intervalo * 2, ESPERA_MAXIMA)
+
+
+bitacora = BitacoraVentas()
@@ -0,0 +1,153 @@
+import sys
+import time
+import traceback
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from conexion import obtener_conexion, consultar, es_falla_de_conexion
+from ejecutor import obtener_ejecutor
+
+INTERVALO = 2000        # Milisegundos entre revisiones de la tabla cambios
+LIMITE_CAMBIOS = 2000   # Con más cambios pendientes se recargan las tablas completas
+ESPERA_HUECOS = 30      # Segundos que se sigue buscando un id_cambio que faltaba
+MAXIMO_HUECOS = 500
+CONSERVAR_HORAS = 24    # Antigüedad a partir de la cual se borran los cambios
+PURGAR_CADA = 3600      # Segundos entre purgas
+
+# tabla -> conversión de la llave, que la tabla cambios guarda como texto
+TABLAS = {
+    "articulos": str,
+    "clientes": str,
+    "empleado": int,
+    "categorias": int,
+    "proveedores": int,
+    "unidad": int,
+}
+
+MAXIMO_ID = "SELECT COALESCE(MAX(id_cambio), 0) FROM cambios"
+NUEVOS = "SELECT id_cambio, tabla, llave FROM cambios WHERE id_cambio > %s"
+
+
+class MonitorCambios(QObject):
+    # Los triggers de las tablas de catálogo anotan en la tabla cambios cada alta, cambio o
+    # baja, venga de esta terminal o de otra. El monitor lee solo los renglones nuevos:
+    # primero avisa a los cachés suscritos (en el hilo de trabajo, para que relean esas
+    # llaves) y después emite cambiaron para las pestañas y diálogos abiertos.
+    # llaves es un set, o None si hubo tantos cambios que conviene recargar la tabla completa.
+    cambiaron = pyqtSignal(str, object)
+
+    def __init__(self):
+        super().__init__()
+        self._marca = None       # Mayor id_cambio leído
+        self._huecos = {}        # id_cambio saltado -> time.monotonic() hasta el que se espera
+        self._suscriptores = {}  # tabla -> [funcion(llaves), ...]
+        self._en_curso = False
+        self._ultima_purga = time.monotonic()
+        self._temporizador = QTimer(self)
+        self._temporizador.setInterval(INTERVALO)
+        self._temporizador.timeout.connect(self.revisar)
+
+    def suscribir(self, tabla, funcion):
+        # funcion(llaves) se llama desde el hilo de trabajo
+        self._suscriptores.setdefault(tabla, []).append(funcion)
+
+    def iniciar(self):
+        self._temporizador.start()
+        self.revisar()
+
+    def detener(self):
+        self._temporizador.stop()
+
+    def revisar(self):
+        # Una sola lectura a la vez; si la anterior sigue en curso se espera al siguiente turno
+        if self._en_curso:
+            return
+        self._en_curso = True
+        obtener_ejecutor().ejecutar(self._leer, al_terminar=self._avisar, al_fallar=self._fallar)
+
+    def _leer(self):
+        if self._marca is None:
+            # Los datos se cargan completos al abrir cada pestaña: solo importa lo que siga
+            self._marca = consultar(MAXIMO_ID)[0][0]
+            return {}
+
+        ahora = time.monotonic()
+        huecos = {id_cambio: limite for id_cambio, limite in self._huecos.items() if limite > ahora}
+        consulta = NUEVOS
+        parametros = [self._marca]
+        if huecos:
+            consulta += f" OR id_cambio IN ({', '.join(['%s'] * len(huecos))})"
+            parametros.extend(huecos)
+        consulta += " ORDER BY id_cambio LIMIT %s"
+        parametros.append(LIMITE_CAMBIOS + 1)
+        filas = consultar(consulta, tuple(parametros))
+
+        marca = self._marca
+        if len(filas) > LIMITE_CAMBIOS:
+            # Importación o cambio masivo: sale más barato recargar todo
+            marca = consultar(MAXIMO_ID)[0][0]
+            cambios = dict.fromkeys(TABLAS)
+            huecos = {}
+        else:
+            cambios = {}
+            for id_cambio, tabla, llave in filas:
+                huecos.pop(id_cambio, None)
+                if id_cambio > marca:
+                    # Un id saltado puede ser de una transacción que todavía no confirma
+                    for faltante in range(max(marca + 1, id_cambio - MAXIMO_HUECOS), id_cambio):
+                        huecos[faltante] = ahora + ESPERA_HUECOS
+                    marca = id_cambio
+                convertir = TABLAS.get(tabla)
+                if convertir:
+                    cambios.setdefault(tabla, set()).add(convertir(llave))
+            if len(huecos) > MAXIMO_HUECOS:
+                huecos = dict(sorted(huecos.items())[-MAXIMO_HUECOS:])
+
+        for tabla, llaves in cambios.items():
+            for funcion in self._suscriptores.get(tabla, ()):
+                funcion(llaves)
+        # Si un suscriptor falla, la siguiente revisión vuelve a leer los mismos cambios
+        self._marca = marca
+        self._huecos = huecos
+
+        if ahora - self._ultima_purga > PURGAR_CADA:
+            self._ultima_purga = ahora
+            purgar()
+        return cambios
+
+    def _avisar(self, cambios):
+        self._en_curso = False
+        for tabla, llaves in cambios.items():
+            self.cambiaron.emit(tabla, llaves)
+
+    def _fallar(self, error):
+        self._en_curso = False
+        if es_falla_de_conexion(error):
+            return  # Se reintenta en la siguiente revisión
+        # Por ejemplo, la base de datos todavía no tiene la tabla cambios
+        traceback.print_exception(type(error), error, error.__traceback__, file=sys.stderr)
+        self.detener()
+
+
+def purgar():
+    conexion = None
+    cursor = None
+    try:
+        conexion = obtener_conexion()
+        cursor = conexion.cursor()
+        cursor.execute("DELETE FROM cambios WHERE fecha < NOW() - INTERVAL %s HOUR",
+                       (CONSERVAR_HORAS,))
+        conexion.commit()
+    finally:
+        if cursor:
+            cursor.close()
+        if conexion:
+            conexion.close()
+
+
+_monitor = None
+
+
+def obtener_monitor():
+    global _monitor
+    if _monitor is None:
+        _monitor = MonitorCambios()
+    return _monitor
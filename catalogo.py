@@ -0,0 +1,195 @@
+import threading
+import time
+from datetime import timedelta
+from conexion import consultar
+import repositorio
+from indice import IndiceTexto, LIMITE_RESULTADOS
+
+TTL_INCREMENTAL = 30     # Segundos entre consultas de artículos modificados
+TTL_COMPLETO = 600       # Segundos entre recargas completas del catálogo
+MARGEN_INCREMENTAL = 60  # Segundos de traslape para no perder transacciones lentas
+REVISAR_CADA = 5         # Segundos entre llamadas a mantener() desde el temporizador de main
+
+
+class CatalogoArticulos:
+    def __init__(self):
+        # codigo -> (nombre, precio, existencias)
+        self._articulos = {}
+        self._marca = None          # Mayor valor de 'actualizado' visto
+        self._ultima_carga = 0.0
+        self._ultima_revision = 0.0
+        self._candado = threading.RLock()
+        # Índice de búsqueda por nombre y código; se construye la primera vez que se usa
+        self._indice = None
+        self._version = 0  # Cambia con cada alta, baja o cambio de nombre
+
+    def obtener(self, codigo):
+        # Solo lee memoria: la vigencia se revisa en mantener(), desde un hilo de trabajo.
+        # Así un artículo ya cargado se vende aunque MySQL no responda. Si no está, quien
+        # escanea lo pide con cargar_uno() en segundo plano.
+        with self._candado:
+            return self._articulos.get(codigo)
+
+    def existencias(self, codigo):
+        articulo = self.obtener(codigo)
+        return articulo[2] if articulo else None
+
+    def articulos(self):
+        self.mantener()
+        with self._candado:
+            return list(self._articulos.items())
+
+    def cargar(self):
+        filas = consultar(
+            "SELECT codigo, nombre, precio, existencias, actualizado FROM articulos")
+        articulos = {}
+        marca = None
+        for codigo, nombre, precio, existencias, actualizado in filas:
+            articulos[codigo] = (nombre, precio, existencias)
+            if marca is None or actualizado > marca:
+                marca = actualizado
+
+        with self._candado:
+            if self._indice is not None:
+                self._conciliar_indice(self._indice, self._articulos, articulos)
+            self._articulos = articulos
+            self._marca = marca
+            self._ultima_carga = self._ultima_revision = time.monotonic()
+            self._version += 1
+
+    def refrescar(self):
+        with self._candado:
+            marca = self._marca
+        if marca is None:
+            self.cargar()
+            return
+
+        filas = repositorio.articulos_modificados(marca - timedelta(seconds=MARGEN_INCREMENTAL))
+        with self._candado:
+            if self._marca is None:
+                # invalidar() mientras se consultaba (p. ej. una importación): se descarta lo
+                # leído y la siguiente revisión recarga todo
+                return
+            for codigo, nombre, precio, existencias, actualizado in filas:
+                self._guardar(codigo, (nombre, precio, existencias))
+                if actualizado > self._marca:
+                    self._marca = actualizado
+            self._ultima_revision = time.monotonic()
+
+    def aplicar_cambios(self, codigos):
+        # Desde el monitor de cambios: artículos modificados en esta u otra terminal
+        if codigos is None:
+            self.cargar()  # Ya se está en el hilo de trabajo del monitor
+            return
+        with self._candado:
+            if self._marca is None:
+                return  # Todavía no se carga; la primera lectura los trae al día
+        filas = repositorio.consultar_llaves(
+            "SELECT codigo, nombre, precio, existencias FROM articulos", "codigo", codigos)
+        vigentes = set()
+        with self._candado:
+            for codigo, nombre, precio, existencias in filas:
+                self._guardar(codigo, (nombre, precio, existencias))
+                vigentes.add(codigo)
+        for codigo in codigos - vigentes:
+            self.invalidar(codigo)
+
+    def actualizar_articulo(self, codigo, nombre, precio, existencias):
+        with self._candado:
+            self._guardar(codigo, (nombre, precio, existencias))
+
+    def preparar_busqueda(self):
+        # Pensado para un hilo de trabajo: refresca el catálogo y construye el índice
+        self.mantener()
+        self._preparar_indice()
+
+    def buscar(self, texto, limite=LIMITE_RESULTADOS):
+        # Coincidencias por prefijo o subcadena del nombre y por código, sin consultar la base
+        codigos = self._preparar_indice().buscar(texto, limite)
+        with self._candado:
+            return [(codigo,) + self._articulos[codigo]
+                    for codigo in codigos if codigo in self._articulos]
+
+    def descontar_existencias(self, productos):
+        # productos: [(codigo, cantidad), ...] ya confirmados en la base de datos
+        with self._candado:
+            for codigo, cantidad in productos:
+                articulo = self._articulos.get(codigo)
+                if articulo:
+                    nombre, precio, existencias = articulo
+                    self._articulos[codigo] = (nombre, precio, existencias - cantidad)
+
+    def invalidar(self, codigo=None):
+        with self._candado:
+            if codigo is None:
+                self._marca = None
+                self._ultima_carga = self._ultima_revision = 0.0
+            else:
+                self._articulos.pop(codigo, None)
+                self._version += 1
+                if self._indice is not None:
+                    self._indice.quitar(codigo)
+
+    def mantener(self):
+        # Recarga completa o incremental cuando toca; consulta la base de datos, así que se
+        # llama desde un hilo de trabajo (temporizador de main o preparar_busqueda)
+        ahora = time.monotonic()
+        with self._candado:
+            completo = self._marca is None or ahora - self._ultima_carga > TTL_COMPLETO
+            incremental = ahora - self._ultima_revision > TTL_INCREMENTAL
+        if completo:
+            self.cargar()
+        elif incremental:
+            self.refrescar()
+
+    def cargar_uno(self, codigo):
+        # Para un hilo de trabajo: un código que no estaba en memoria, p. ej. dado de alta
+        # en otra terminal después de la última revisión. None si no existe.
+        articulo = repositorio.obtener_articulo(codigo)
+        if articulo is None:
+            return None
+        with self._candado:
+            self._guardar(codigo, articulo)
+        return articulo
+
+    def _guardar(self, codigo, articulo):
+        # Solo se reindexa si cambió el nombre o es un artículo nuevo
+        anterior = self._articulos.get(codigo)
+        self._articulos[codigo] = articulo
+        if anterior is None or anterior[0] != articulo[0]:
+            self._version += 1
+            if self._indice is not None:
+                self._indice.agregar(codigo, articulo[0], codigo)
+
+    def _preparar_indice(self):
+        with self._candado:
+            if self._indice is not None:
+                return self._indice
+            version = self._version
+            entradas = {codigo: articulo[0] for codigo, articulo in self._articulos.items()}
+
+        # La construcción se hace fuera del candado para no frenar las ventas
+        indice = IndiceTexto()
+        indice.construir((codigo, nombre, (codigo,)) for codigo, nombre in entradas.items())
+
+        with self._candado:
+            if self._indice is not None:
+                return self._indice  # Otro hilo lo terminó primero
+            if self._version != version:
+                # Artículos que cambiaron mientras se construía
+                anteriores = {codigo: (nombre,) for codigo, nombre in entradas.items()}
+                self._conciliar_indice(indice, anteriores, self._articulos)
+            self._indice = indice
+            return indice
+
+    def _conciliar_indice(self, indice, anteriores, actuales):
+        # Solo se tocan las altas, bajas y cambios de nombre
+        for codigo in anteriores.keys() - actuales.keys():
+            indice.quitar(codigo)
+        for codigo, articulo in actuales.items():
+            anterior = anteriores.get(codigo)
+            if anterior is None or anterior[0] != articulo[0]:
+                indice.agregar(codigo, articulo[0], codigo)
+
+
+catalogo = CatalogoArticulos()
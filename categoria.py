@@ -1,18 +1,27 @@
 from conexion import obtener_conexion
+from cambios import obtener_monitor
+from referencias import referencias
+from modelo_tabla import ModeloTabla, PestanaCatalogo, crear_vista
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QFormLayout,
-    QLineEdit, QPushButton, QTableWidget, QTableWidgetItem,
-    QMessageBox, QHeaderView
+    QLineEdit, QPushButton, QMessageBox
 )
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QIntValidator
-class Ventanacatego(QWidget):
-    def __init__(self, conexion):
+
+CONSULTA = "SELECT id_categorias, nombre FROM categorias"
+
+class Ventanacatego(PestanaCatalogo, QWidget):
+    TABLA = "categorias"
+    CONSULTA = CONSULTA
+    LLAVE = "id_categorias"
+
+    def __init__(self):
         super().__init__()
-        self.conexion = conexion
         
         self.init_ui()
         self.cargar_datos()
+        obtener_monitor().cambiaron.connect(self.datos_cambiados)
 
     def init_ui(self):
         self.setWindowTitle("Gestión de Categorías")
@@ -38,8 +47,10 @@ class Ventanacatego(QWidget):
         self.boton_limpiar = QPushButton("🧹 Limpiar")
         self.boton_limpiar.setStyleSheet("background-color: #FFC107; color: black;")
         
+        self.filtro_input = QLineEdit()
+        self.filtro_input.setPlaceholderText("Filtrar la tabla")
+        
         # Tabla
-        self.tabla = QTableWidget()
         self.configurar_tabla()
         
         # Layouts
@@ -56,6 +67,7 @@ class Ventanacatego(QWidget):
         main_layout = QVBoxLayout()
         main_layout.addLayout(form_layout)
         main_layout.addLayout(button_layout)
+        main_layout.addWidget(self.filtro_input)
         main_layout.addWidget(self.tabla)
         
         self.setLayout(main_layout)
@@ -65,14 +77,12 @@ class Ventanacatego(QWidget):
         self.boton_actualizar.clicked.connect(self.actualizar)
         self.boton_eliminar.clicked.connect(self.eliminar)
         self.boton_limpiar.clicked.connect(self.limpiar_campos)
-        self.tabla.itemDoubleClicked.connect(self.cargar_datos_desde_tabla)
+        self.tabla.doubleClicked.connect(self.cargar_datos_desde_tabla)
+        self.filtro_input.textChanged.connect(self.modelo.filtrar)
 
     def configurar_tabla(self):
-        self.tabla.setColumnCount(2)
-        self.tabla.setHorizontalHeaderLabels(["ID", "Nombre"])
-        self.tabla.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        self.tabla.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.tabla.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.modelo = ModeloTabla(["ID", "Nombre"])
+        self.tabla = crear_vista(self.modelo)
 
     def agregar(self):
         try:
@@ -89,9 +99,11 @@ class Ventanacatego(QWidget):
                 "INSERT INTO categorias (id_categorias, nombre) VALUES (%s, %s)",
                 (int(id_cat), nombre))
             conexion.commit()
+            referencias.invalidar("categorias")
+            
+            self.modelo.guardar((int(id_cat), nombre))
             
             QMessageBox.information(self, "Éxito", "Categoría agregada correctamente")
-            self.cargar_datos()
             self.limpiar_campos()
             
         except Exception as e:
@@ -115,9 +127,12 @@ class Ventanacatego(QWidget):
                 "UPDATE categorias SET nombre = %s WHERE id_categorias = %s",
                 (nombre, int(id_cat)))
             conexion.commit()
+            referencias.invalidar("categorias")
+            
+            if cursor.rowcount:
+                self.modelo.guardar((int(id_cat), nombre))
             
             QMessageBox.information(self, "Éxito", "Categoría actualizada correctamente")
-            self.cargar_datos()
             
         except Exception as e:
             QMessageBox.critical(self, "Error", f"No se pudo actualizar la categoría:\n{e}")
@@ -147,9 +162,11 @@ class Ventanacatego(QWidget):
                 "DELETE FROM categorias WHERE id_categorias = %s",
                 (int(id_cat),))
             conexion.commit()
+            referencias.invalidar("categorias")
+            
+            self.modelo.quitar(int(id_cat))
             
             QMessageBox.information(self, "Éxito", "Categoría eliminada correctamente")
-            self.cargar_datos()
             self.limpiar_campos()
             
         except Exception as e:
@@ -158,28 +175,10 @@ class Ventanacatego(QWidget):
             cursor.close()
             conexion.close()
 
-    def cargar_datos(self):
-        try:
-            self.tabla.setRowCount(0)
-            conexion = obtener_conexion()
-            cursor = conexion.cursor()
-            cursor.execute("SELECT id_categorias, nombre FROM categorias ORDER BY id_categorias")
-            
-            for row_idx, (id_cat, nombre) in enumerate(cursor.fetchall()):
-                self.tabla.insertRow(row_idx)
-                self.tabla.setItem(row_idx, 0, QTableWidgetItem(str(id_cat)))
-                self.tabla.setItem(row_idx, 1, QTableWidgetItem(nombre))
-                
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error al cargar datos:\n{e}")
-        finally:
-            cursor.close()
-            conexion.close()
-
-    def cargar_datos_desde_tabla(self, item):
-        row = item.row()
-        self.id_input.setText(self.tabla.item(row, 0).text())
-        self.nombre_input.setText(self.tabla.item(row, 1).text())
+    def cargar_datos_desde_tabla(self, indice):
+        id_cat, nombre = self.modelo.fila(indice)
+        self.id_input.setText(str(id_cat))
+        self.nombre_input.setText(nombre)
 
     def limpiar_campos(self):
         self.id_input.clear()
@@ -1,19 +1,31 @@
 from conexion import obtener_conexion
+from ejecutor import obtener_ejecutor
+from cambios import obtener_monitor
+from directorio import directorio
+from modelo_tabla import ModeloTabla, PestanaCatalogo, crear_vista
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QFormLayout,
-    QLineEdit, QPushButton, QTableWidget, QTableWidgetItem,
-    QMessageBox, QHeaderView
+    QLineEdit, QPushButton, QMessageBox
 )
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QIntValidator
 
-class VentanaClientes(QWidget):
-    def __init__(self, conexion):
+RESULTADOS_TABLA = 200  # Clientes que muestra la tabla por cada búsqueda
+
+CONSULTA = "SELECT telefono, nombre, direccion, rfc FROM clientes"
+
+class VentanaClientes(PestanaCatalogo, QWidget):
+    TABLA = "clientes"
+    CONSULTA = CONSULTA
+    LLAVE = "telefono"
+    AGREGAR = False  # Solo se corrigen los clientes que ya aparecen en los resultados
+
+    def __init__(self):
         super().__init__()
-        self.conexion = conexion
         
         self.init_ui()
         self.cargar_datos()
+        obtener_monitor().cambiaron.connect(self.datos_cambiados)
 
     def init_ui(self):
         self.setWindowTitle("Gestión de Clientes")
@@ -47,8 +59,10 @@ class VentanaClientes(QWidget):
         self.boton_limpiar = QPushButton("🧹 Limpiar")
         self.boton_limpiar.setStyleSheet("background-color: #FFC107; color: black;")
         
+        self.buscar_input = QLineEdit()
+        self.buscar_input.setPlaceholderText("Buscar por teléfono, nombre o RFC")
+        
         # Tabla
-        self.tabla = QTableWidget()
         self.configurar_tabla()
         
         # Layouts
@@ -67,6 +81,7 @@ class VentanaClientes(QWidget):
         main_layout = QVBoxLayout()
         main_layout.addLayout(form_layout)
         main_layout.addLayout(button_layout)
+        main_layout.addWidget(self.buscar_input)
         main_layout.addWidget(self.tabla)
         
         self.setLayout(main_layout)
@@ -76,14 +91,13 @@ class VentanaClientes(QWidget):
         self.boton_actualizar.clicked.connect(self.actualizar)
         self.boton_eliminar.clicked.connect(self.eliminar)
         self.boton_limpiar.clicked.connect(self.limpiar_campos)
-        self.tabla.itemDoubleClicked.connect(self.cargar_datos_desde_tabla)
+        self.tabla.doubleClicked.connect(self.cargar_datos_desde_tabla)
+        self.buscar_input.textChanged.connect(lambda _: self.filtrar_datos())
 
     def configurar_tabla(self):
-        self.tabla.setColumnCount(4)
-        self.tabla.setHorizontalHeaderLabels(["Teléfono", "Nombre", "Dirección", "RFC"])
-        self.tabla.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        self.tabla.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.tabla.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        # Sin orden inicial: los resultados del directorio ya vienen por relevancia
+        self.modelo = ModeloTabla(["Teléfono", "Nombre", "Dirección", "RFC"])
+        self.tabla = crear_vista(self.modelo, -1)
 
     def agregar(self):
         conexion = None
@@ -108,9 +122,10 @@ class VentanaClientes(QWidget):
                 "INSERT INTO clientes (telefono, nombre, direccion, rfc) VALUES (%s, %s, %s, %s)",
                 (telefono, nombre, direccion, rfc))
             conexion.commit()
+            directorio.actualizar_cliente(telefono, nombre, direccion, rfc)
+            self.modelo.guardar((telefono, nombre, direccion, rfc))
             
             QMessageBox.information(self, "Éxito", "Cliente agregado correctamente")
-            self.cargar_datos()
             self.limpiar_campos()
             
         except Exception as e:
@@ -142,9 +157,11 @@ class VentanaClientes(QWidget):
                 "UPDATE clientes SET nombre = %s, direccion = %s, rfc = %s WHERE telefono = %s",
                 (nombre, direccion, rfc, telefono))
             conexion.commit()
+            if cursor.rowcount:
+                directorio.actualizar_cliente(telefono, nombre, direccion, rfc)
+                self.modelo.guardar((telefono, nombre, direccion, rfc))
             
             QMessageBox.information(self, "Éxito", "Cliente actualizado correctamente")
-            self.cargar_datos()
             
         except Exception as e:
             if conexion:
@@ -180,9 +197,10 @@ class VentanaClientes(QWidget):
                 "DELETE FROM clientes WHERE telefono = %s",
                 (telefono,))
             conexion.commit()
+            directorio.quitar_cliente(telefono)
+            self.modelo.quitar(telefono)
             
             QMessageBox.information(self, "Éxito", "Cliente eliminado correctamente")
-            self.cargar_datos()
             self.limpiar_campos()
             
         except Exception as e:
@@ -196,35 +214,34 @@ class VentanaClientes(QWidget):
                 conexion.close()
 
     def cargar_datos(self):
-        conexion = None
-        cursor = None
-        try:
-            self.tabla.setRowCount(0)
-            conexion = obtener_conexion()
-            cursor = conexion.cursor()
-            cursor.execute("SELECT telefono, nombre, direccion, rfc FROM clientes ORDER BY nombre")
-            
-            for row_idx, (telefono, nombre, direccion, rfc) in enumerate(cursor.fetchall()):
-                self.tabla.insertRow(row_idx)
-                self.tabla.setItem(row_idx, 0, QTableWidgetItem(telefono))
-                self.tabla.setItem(row_idx, 1, QTableWidgetItem(nombre))
-                self.tabla.setItem(row_idx, 2, QTableWidgetItem(direccion))
-                self.tabla.setItem(row_idx, 3, QTableWidgetItem(rfc if rfc else ""))
-                
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error al cargar datos:\n{e}")
-        finally:
-            if cursor:
-                cursor.close()
-            if conexion:
-                conexion.close()
+        # La tabla muestra solo los primeros resultados de la búsqueda, no todos los clientes
+        obtener_ejecutor().ejecutar(
+            directorio.preparar_busqueda,
+            clave=(id(self), "directorio"),
+            al_terminar=lambda _: self.filtrar_datos(),
+            al_fallar=lambda e: QMessageBox.critical(self, "Error", f"Error al cargar datos:\n{e}")
+        )
+        self.filtrar_datos()
+
+    def filtrar_datos(self):
+        texto = self.buscar_input.text()
+        if directorio.lista():
+            obtener_ejecutor().cancelar((id(self), "buscar"))
+            self.mostrar_datos(directorio.buscar(texto, RESULTADOS_TABLA))
+            return
+        obtener_ejecutor().ejecutar(
+            directorio.buscar, texto, RESULTADOS_TABLA,
+            clave=(id(self), "buscar"),
+            al_terminar=self.mostrar_datos,
+            al_fallar=lambda e: QMessageBox.critical(self, "Error", f"Error al buscar clientes:\n{e}")
+        )
 
-    def cargar_datos_desde_tabla(self, item):
-        row = item.row()
-        self.telefono_input.setText(self.tabla.item(row, 0).text())
-        self.nombre_input.setText(self.tabla.item(row, 1).text())
-        self.direccion_input.setText(self.tabla.item(row, 2).text())
-        self.rfc_input.setText(self.tabla.item(row, 3).text())
+    def cargar_datos_desde_tabla(self, indice):
+        telefono, nombre, direccion, rfc = self.modelo.fila(indice)
+        self.telefono_input.setText(telefono)
+        self.nombre_input.setText(nombre)
+        self.direccion_input.setText(direccion)
+        self.rfc_input.setText(rfc or "")
 
     def limpiar_campos(self):
         self.telefono_input.clear()
@@ -0,0 +1,435 @@
+from ejecutor import obtener_ejecutor
+from cambios import obtener_monitor
+from catalogo import catalogo
+from referencias import referencias
+from servicio_compra import guardar_compra
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QFormLayout,
+    QLineEdit, QPushButton, QMessageBox, QHeaderView, QSpinBox, QLabel, QGroupBox,
+    QComboBox, QDateEdit, QTableView
+)
+from PyQt6.QtCore import Qt, QDate, QAbstractTableModel, QModelIndex, pyqtSignal
+from PyQt6.QtGui import QDoubleValidator
+
+TIPOS_DOCUMENTO = ["FACTURA", "REMISIÓN", "NOTA"]
+
+class ModeloRecepcion(QAbstractTableModel):
+    # Mercancía escaneada de una entrega, todavía sin registrar. Un código escaneado varias
+    # veces se suma a su línea, así que la compra lleva un solo renglón por artículo.
+    totales_cambiados = pyqtSignal(int, int, float)  # líneas, piezas, importe
+
+    ENCABEZADOS = ["Código", "Artículo", "Cantidad", "Costo", "Subtotal"]
+    COLUMNA_CANTIDAD = 2
+    COLUMNA_COSTO = 3
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Cada línea: [codigo, nombre, cantidad, costo]; costo None usa el costo actual del artículo
+        self._lineas = []
+        self._filas = {}  # codigo -> fila
+
+    def lineas(self):
+        return [(codigo, cantidad, costo) for codigo, _, cantidad, costo in self._lineas]
+
+    def fila_de(self, codigo):
+        return self._filas.get(codigo)
+
+    def agregar(self, codigo, nombre, cantidad, costo=None):
+        fila = self._filas.get(codigo)
+        if fila is not None:
+            linea = self._lineas[fila]
+            linea[2] += cantidad
+            if costo is not None:
+                linea[3] = costo
+            self.dataChanged.emit(self.index(fila, self.COLUMNA_CANTIDAD), self.index(fila, 4))
+        else:
+            fila = len(self._lineas)
+            self.beginInsertRows(QModelIndex(), fila, fila)
+            self._lineas.append([codigo, nombre, cantidad, costo])
+            self._filas[codigo] = fila
+            self.endInsertRows()
+        self._avisar_totales()
+        return fila
+
+    def quitar(self, fila):
+        if not 0 <= fila < len(self._lineas):
+            return
+        self.beginRemoveRows(QModelIndex(), fila, fila)
+        codigo = self._lineas.pop(fila)[0]
+        del self._filas[codigo]
+        for indice in range(fila, len(self._lineas)):
+            self._filas[self._lineas[indice][0]] = indice
+        self.endRemoveRows()
+        self._avisar_totales()
+
+    def limpiar(self):
+        self.beginResetModel()
+        self._lineas = []
+        self._filas = {}
+        self.endResetModel()
+        self._avisar_totales()
+
+    def _avisar_totales(self):
+        # El importe solo cuenta los costos capturados; los demás se completan al registrar
+        piezas = sum(linea[2] for linea in self._lineas)
+        importe = round(sum(linea[2] * linea[3] for linea in self._lineas if linea[3] is not None), 2)
+        self.totales_cambiados.emit(len(self._lineas), piezas, importe)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._lineas)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.ENCABEZADOS)
+
+    def headerData(self, seccion, orientacion, rol=Qt.ItemDataRole.DisplayRole):
+        if orientacion == Qt.Orientation.Horizontal and rol == Qt.ItemDataRole.DisplayRole:
+            return self.ENCABEZADOS[seccion]
+        return None
+
+    def flags(self, indice):
+        banderas = super().flags(indice)
+        if indice.isValid() and indice.column() in (self.COLUMNA_CANTIDAD, self.COLUMNA_COSTO):
+            banderas |= Qt.ItemFlag.ItemIsEditable
+        return banderas
+
+    def data(self, indice, rol=Qt.ItemDataRole.DisplayRole):
+        if not indice.isValid():
+            return None
+        codigo, nombre, cantidad, costo = self._lineas[indice.row()]
+        columna = indice.column()
+
+        if rol == Qt.ItemDataRole.DisplayRole:
+            if columna == 0:
+                return codigo
+            if columna == 1:
+                return nombre
+            if columna == 2:
+                return str(cantidad)
+            if columna == 3:
+                return "Actual" if costo is None else f"${costo:.2f}"
+            return "" if costo is None else f"${cantidad * costo:.2f}"
+
+        if rol == Qt.ItemDataRole.EditRole:
+            if columna == self.COLUMNA_CANTIDAD:
+                return cantidad
+            if columna == self.COLUMNA_COSTO:
+                return 0.0 if costo is None else float(costo)
+
+        if rol == Qt.ItemDataRole.TextAlignmentRole and columna >= self.COLUMNA_CANTIDAD:
+            return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+        return None
+
+    def setData(self, indice, valor, rol=Qt.ItemDataRole.EditRole):
+        if not indice.isValid() or rol != Qt.ItemDataRole.EditRole:
+            return False
+        linea = self._lineas[indice.row()]
+        if indice.column() == self.COLUMNA_CANTIDAD:
+            if int(valor) <= 0:
+                return False
+            linea[2] = int(valor)
+        elif indice.column() == self.COLUMNA_COSTO:
+            if float(valor) < 0:
+                return False
+            linea[3] = round(float(valor), 2)
+        else:
+            return False
+        self.dataChanged.emit(self.index(indice.row(), indice.column()), self.index(indice.row(), 4))
+        self._avisar_totales()
+        return True
+
+class VentanaCompras(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.recepcion = ModeloRecepcion(self)
+        self.version_proveedores = None
+        self.registrando = False
+        self.documento = None  # (proveedor, tipodoc, folio, líneas) de la compra en curso
+        self.escaneos_pendientes = {}  # codigo -> [(cantidad, costo), ...] mientras se consulta
+
+        self.init_ui()
+        self.cargar_proveedores()
+        obtener_monitor().cambiaron.connect(self.datos_cambiados)
+
+    def init_ui(self):
+        self.setWindowTitle("Recepción de Compras")
+
+        # Datos del documento del proveedor
+        self.proveedor_combo = QComboBox()
+        self.proveedor_combo.setPlaceholderText("Seleccione proveedor")
+
+        self.folio_input = QLineEdit()
+        self.folio_input.setPlaceholderText("Folio de la factura o remisión")
+        self.folio_input.setMaxLength(20)
+
+        self.tipodoc_combo = QComboBox()
+        self.tipodoc_combo.addItems(TIPOS_DOCUMENTO)
+
+        self.fecha_input = QDateEdit(QDate.currentDate())
+        self.fecha_input.setCalendarPopup(True)
+        self.fecha_input.setDisplayFormat("dd/MM/yyyy")
+
+        # Escaneo
+        self.codigo_input = QLineEdit()
+        self.codigo_input.setPlaceholderText("Código del producto (escáner)")
+        self.codigo_input.setMaxLength(13)
+
+        self.cantidad_spin = QSpinBox()
+        self.cantidad_spin.setRange(1, 99999)
+        self.cantidad_spin.setValue(1)
+
+        self.costo_input = QLineEdit()
+        self.costo_input.setPlaceholderText("Costo unitario (vacío: el actual)")
+        self.costo_input.setValidator(QDoubleValidator(0, 999999, 2))
+
+        # Botones
+        self.boton_agregar = QPushButton("➕ Agregar")
+        self.boton_agregar.setStyleSheet("background-color: #4CAF50; color: white;")
+
+        self.boton_quitar = QPushButton("➖ Quitar línea")
+        self.boton_quitar.setStyleSheet("background-color: #f44336; color: white;")
+
+        self.boton_registrar = QPushButton("📥 Registrar compra")
+        self.boton_registrar.setStyleSheet("background-color: #2196F3; color: white; font-weight: bold;")
+
+        self.boton_limpiar = QPushButton("🧹 Nueva compra")
+        self.boton_limpiar.setStyleSheet("background-color: #FFC107; color: black;")
+
+        # Tabla
+        self.tabla = QTableView()
+        self.configurar_tabla()
+
+        self.label_totales = QLabel()
+        self.label_totales.setStyleSheet("font-size: 16px; font-weight: bold; color: #2E7D32;")
+        self.mostrar_totales(0, 0, 0.0)
+
+        # Layouts
+        documento_layout = QFormLayout()
+        documento_layout.addRow("Proveedor:", self.proveedor_combo)
+        documento_layout.addRow("Folio:", self.folio_input)
+        documento_layout.addRow("Documento:", self.tipodoc_combo)
+        documento_layout.addRow("Fecha:", self.fecha_input)
+
+        documento_group = QGroupBox("Datos de la Compra")
+        documento_group.setLayout(documento_layout)
+
+        producto_layout = QHBoxLayout()
+        producto_layout.addWidget(QLabel("Código producto:"))
+        producto_layout.addWidget(self.codigo_input)
+        producto_layout.addWidget(QLabel("Cantidad:"))
+        producto_layout.addWidget(self.cantidad_spin)
+        producto_layout.addWidget(self.costo_input)
+        producto_layout.addWidget(self.boton_agregar)
+        producto_layout.addWidget(self.boton_quitar)
+
+        button_layout = QHBoxLayout()
+        button_layout.addWidget(self.label_totales)
+        button_layout.addStretch()
+        button_layout.addWidget(self.boton_registrar)
+        button_layout.addWidget(self.boton_limpiar)
+
+        main_layout = QVBoxLayout()
+        main_layout.addWidget(documento_group)
+        main_layout.addLayout(producto_layout)
+        main_layout.addWidget(self.tabla)
+        main_layout.addLayout(button_layout)
+
+        self.setLayout(main_layout)
+
+        # Conexiones
+        self.boton_agregar.clicked.connect(self.agregar_producto)
+        self.codigo_input.returnPressed.connect(self.agregar_producto)
+        self.boton_quitar.clicked.connect(self.quitar_producto)
+        self.boton_registrar.clicked.connect(self.registrar_compra)
+        self.boton_limpiar.clicked.connect(self.limpiar_compra)
+        self.recepcion.totales_cambiados.connect(self.mostrar_totales)
+
+    def configurar_tabla(self):
+        self.tabla.setModel(self.recepcion)
+        self.tabla.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.tabla.verticalHeader().setVisible(False)
+        self.tabla.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.tabla.setSelectionMode(QTableView.SelectionMode.SingleSelection)
+        self.tabla.setEditTriggers(
+            QTableView.EditTrigger.DoubleClicked |
+            QTableView.EditTrigger.SelectedClicked |
+            QTableView.EditTrigger.EditKeyPressed
+        )
+        self.tabla.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
+
+    def showEvent(self, event):
+        # Si se cambió un proveedor en otra pestaña, recargar el combo
+        super().showEvent(event)
+        if self.version_proveedores is not None and self.version_proveedores != referencias.version:
+            self.cargar_proveedores()
+
+    def cargar_proveedores(self):
+        self.version_proveedores = referencias.version
+        obtener_ejecutor().ejecutar(
+            referencias.obtener, "proveedores",
+            clave=(id(self), "cargar_proveedores"),
+            al_terminar=self.mostrar_proveedores,
+            al_fallar=lambda e: QMessageBox.critical(self, "Error", f"Error al cargar proveedores:\n{e}")
+        )
+
+    def mostrar_proveedores(self, proveedores):
+        seleccion = self.proveedor_combo.currentData()
+        self.proveedor_combo.clear()
+        self.proveedor_combo.addItem("", None)
+        for id_proveedor, nombre in proveedores:
+            self.proveedor_combo.addItem(nombre, id_proveedor)
+        self.proveedor_combo.setCurrentIndex(
+            max(self.proveedor_combo.findData(seleccion), 0) if seleccion is not None else 0)
+
+    def datos_cambiados(self, tabla, llaves):
+        if tabla == "proveedores" and self.isVisible():
+            self.cargar_proveedores()
+
+    def agregar_producto(self):
+        codigo = self.codigo_input.text().strip()
+        cantidad = self.cantidad_spin.value()
+        costo = float(self.costo_input.text()) if self.costo_input.text() else None
+
+        if not codigo:
+            QMessageBox.warning(self, "Código vacío", "Ingresa un código de producto")
+            return
+
+        try:
+            # Un código repetido solo se suma a su línea, sin consultar el catálogo
+            fila = self.recepcion.fila_de(codigo)
+            if fila is None:
+                producto = catalogo.obtener(codigo)
+                if producto is None:
+                    # No está en memoria: se consulta en segundo plano y se sigue escaneando
+                    self.codigo_input.clear()
+                    self.cantidad_spin.setValue(1)
+                    self.codigo_input.setFocus()
+                    self.consultar_producto(codigo, cantidad, costo)
+                    return
+                fila = self.recepcion.agregar(codigo, producto[0], cantidad, costo)
+            else:
+                self.recepcion.agregar(codigo, None, cantidad, costo)
+
+            self.tabla.selectRow(fila)
+            self.tabla.scrollTo(self.recepcion.index(fila, 0))
+            self.codigo_input.clear()
+            self.cantidad_spin.setValue(1)
+            self.codigo_input.setFocus()
+
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error al agregar producto:\n{e}")
+
+    def consultar_producto(self, codigo, cantidad, costo):
+        # Escaneos repetidos del mismo código mientras se consulta se guardan en orden
+        if codigo in self.escaneos_pendientes:
+            self.escaneos_pendientes[codigo].append((cantidad, costo))
+            return
+        self.escaneos_pendientes[codigo] = [(cantidad, costo)]
+        obtener_ejecutor().ejecutar(
+            catalogo.cargar_uno, codigo,
+            clave=(id(self), "escaneo", codigo),
+            al_terminar=lambda producto: self.producto_consultado(codigo, producto),
+            al_fallar=lambda e: self.producto_no_consultado(codigo, e)
+        )
+
+    def producto_consultado(self, codigo, producto):
+        escaneos = self.escaneos_pendientes.pop(codigo, None)
+        if escaneos is None:
+            return  # La compra se limpió mientras tanto
+        if not producto:
+            QMessageBox.warning(self, "No encontrado",
+                                f"Producto {codigo} no registrado; dalo de alta en la pestaña Artículos")
+            return
+        for cantidad, costo in escaneos:
+            fila = self.recepcion.agregar(codigo, producto[0], cantidad, costo)
+        self.tabla.scrollTo(self.recepcion.index(fila, 0))
+
+    def producto_no_consultado(self, codigo, error):
+        if self.escaneos_pendientes.pop(codigo, None) is None:
+            return
+        QMessageBox.critical(self, "Error", f"Error al agregar producto {codigo}:\n{error}")
+
+    def quitar_producto(self):
+        indices = self.tabla.selectionModel().selectedRows()
+        if not indices:
+            QMessageBox.warning(self, "Selección requerida", "Selecciona una línea para quitar")
+            return
+        self.recepcion.quitar(indices[0].row())
+
+    def mostrar_totales(self, lineas, piezas, importe):
+        self.label_totales.setText(f"Líneas: {lineas}   Piezas: {piezas}   Importe: ${importe:.2f}")
+
+    def registrar_compra(self):
+        if self.registrando:
+            return
+        lineas = self.recepcion.lineas()
+        id_proveedor = self.proveedor_combo.currentData()
+        folio = self.folio_input.text().strip()
+
+        if not lineas:
+            QMessageBox.warning(self, "Compra vacía", "No hay productos en la compra")
+            return
+        if id_proveedor is None:
+            QMessageBox.warning(self, "Proveedor requerido", "Seleccione el proveedor")
+            return
+        if not folio:
+            QMessageBox.warning(self, "Folio requerido", "Ingrese el folio del documento del proveedor")
+            return
+
+        respuesta = QMessageBox.question(
+            self,
+            "Registrar compra",
+            f"¿Registrar la compra de {self.proveedor_combo.currentText()} con {len(lineas)} líneas?\n"
+            "Las existencias se suman al registrar.",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        if respuesta != QMessageBox.StandardButton.Yes:
+            return
+
+        # Encabezado, detalles y existencias en una transacción, fuera del hilo de la interfaz.
+        # Si falla, la mercancía escaneada se conserva para volver a intentarlo.
+        self.registrando = True
+        self.boton_registrar.setEnabled(False)
+        self.boton_limpiar.setEnabled(False)
+        self.documento = (self.proveedor_combo.currentText(), self.tipodoc_combo.currentText(), folio,
+                          len(lineas))
+        obtener_ejecutor().ejecutar(
+            guardar_compra, folio, self.tipodoc_combo.currentText(),
+            self.fecha_input.date().toPyDate(), id_proveedor, lineas,
+            clave=(id(self), "registrar"),
+            al_terminar=self.compra_registrada,
+            al_fallar=self.compra_fallida
+        )
+
+    def compra_registrada(self, resultado):
+        id_compra, importe = resultado
+        proveedor, tipodoc, folio, lineas = self.documento
+        self.registrando = False
+        self.boton_registrar.setEnabled(True)
+        self.boton_limpiar.setEnabled(True)
+        QMessageBox.information(
+            self,
+            "Compra registrada",
+            f"COMPRA #{id_compra}\n"
+            f"Proveedor: {proveedor}\n"
+            f"{tipodoc} {folio}\n"
+            f"Líneas: {lineas}\n"
+            f"Importe: ${importe:.2f}"
+        )
+        self.limpiar_compra()
+
+    def compra_fallida(self, error):
+        self.registrando = False
+        self.boton_registrar.setEnabled(True)
+        self.boton_limpiar.setEnabled(True)
+        QMessageBox.critical(self, "Error", f"No se pudo registrar la compra:\n{error}")
+
+    def limpiar_compra(self):
+        self.folio_input.clear()
+        self.tipodoc_combo.setCurrentIndex(0)
+        self.fecha_input.setDate(QDate.currentDate())
+        self.codigo_input.clear()
+        self.cantidad_spin.setValue(1)
+        self.costo_input.clear()
+        self.recepcion.limpiar()
+        self.escaneos_pendientes.clear()
+        self.codigo_input.setFocus()
@@ -1,21 +1,332 @@
+import os
+import socket
+import threading
+import time
+from collections import deque
 import mysql.connector
 from mysql.connector import Error
+from mysql.connector.errors import (
+    InterfaceError, OperationalError, PoolError,
+    ConnectionTimeoutError, ReadTimeoutError, WriteTimeoutError
+)
+from PyQt6.QtCore import QCoreApplication, QThread
 from PyQt6.QtWidgets import QMessageBox
+import instrumentacion
+
+CONFIGURACION = {
+    "host": "localhost",
+    "user": "root",
+    "password": "",
+    "database": "BodegaAurrera",
+    "autocommit": False,
+    "connection_timeout": 5  # Segundos máximos para abrir una conexión con MySQL caído
+}
+
+# Identificador de esta caja; distingue sus ventas pausadas de las de otras terminales
+TERMINAL = os.environ.get("POS_TERMINAL") or socket.gethostname()
+
+# Parámetros del pool
+TAMANO_POOL = 5             # Conexiones máximas abiertas a la vez
+CONEXIONES_MINIMAS = 2      # Conexiones que se abren al iniciar y nunca se desalojan
+TIEMPO_ESPERA = 10          # Segundos máximos esperando una conexión libre
+TIEMPO_INACTIVIDAD = 300    # Segundos sin uso tras los que se cierra una conexión sobrante
+VERIFICAR_TRAS = 30         # Segundos sin uso tras los que se verifica la conexión al prestarla
+
+
+class ConexionPrestada:
+    # Envuelve una conexión del pool; close() la devuelve en lugar de cerrarla
+    def __init__(self, pool, conexion, espera):
+        self._pool = pool
+        self._conexion = conexion
+        self.espera = espera
+
+    def __getattr__(self, nombre):
+        if self._conexion is None:
+            raise Error("La conexión ya fue devuelta al pool")
+        return getattr(self._conexion, nombre)
+
+    def cursor(self, *args, **kwargs):
+        if self._conexion is None:
+            raise Error("La conexión ya fue devuelta al pool")
+        cursor = self._conexion.cursor(*args, **kwargs)
+        if instrumentacion.ACTIVA:
+            return instrumentacion.CursorInstrumentado(cursor, self)
+        return cursor
+
+    def preparada(self, sql):
+        # Cursor con la sentencia preparada en el servidor. Se guarda en la conexión real,
+        # así que los siguientes préstamos la ejecutan sin volver a analizarla. No se cierra:
+        # vive lo mismo que la conexión.
+        if self._conexion is None:
+            raise Error("La conexión ya fue devuelta al pool")
+        preparadas = getattr(self._conexion, "sentencias_preparadas", None)
+        if preparadas is None:
+            preparadas = self._conexion.sentencias_preparadas = {}
+        cursor = preparadas.get(sql)
+        if cursor is None:
+            cursor = preparadas[sql] = self._conexion.cursor(prepared=True)
+        if instrumentacion.ACTIVA:
+            return instrumentacion.CursorInstrumentado(cursor, self)
+        return cursor
+
+    def limitar_lectura(self, segundos):
+        # Tope por cada respuesta del servidor mientras dure el préstamo; None espera sin límite
+        if self._conexion is None:
+            raise Error("La conexión ya fue devuelta al pool")
+        self._conexion.read_timeout = segundos
+
+    def close(self):
+        if self._conexion is not None:
+            conexion, self._conexion = self._conexion, None
+            self._pool.devolver(conexion)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        self.close()
+
+
+class PoolConexiones:
+    def __init__(self, fabrica, tamano=TAMANO_POOL, minimas=CONEXIONES_MINIMAS,
+                 espera=TIEMPO_ESPERA, inactividad=TIEMPO_INACTIVIDAD,
+                 verificar_tras=VERIFICAR_TRAS):
+        self.fabrica = fabrica
+        self.tamano = tamano
+        self.minimas = min(minimas, tamano)
+        self.espera = espera
+        self.inactividad = inactividad
+        self.verificar_tras = verificar_tras
+
+        self._libres = deque()  # (conexion, ultimo_uso), la más reciente a la derecha
+        self._total = 0
+        self._condicion = threading.Condition()
+        self._estadisticas = {
+            "prestamos": 0,
+            "esperas": 0,
+            "tiempo_espera_total": 0.0,
+            "tiempo_espera_maximo": 0.0,
+            "agotado": 0,
+            "creadas": 0,
+            "descartadas": 0,
+            "desalojadas": 0
+        }
+
+    def precalentar(self):
+        nuevas = []
+        with self._condicion:
+            faltantes = max(0, self.minimas - self._total)
+            self._total += faltantes
+        try:
+            for _ in range(faltantes):
+                nuevas.append(self._crear())
+        finally:
+            with self._condicion:
+                self._total -= faltantes - len(nuevas)
+                ahora = time.monotonic()
+                for conexion in nuevas:
+                    self._libres.append((conexion, ahora))
+                self._condicion.notify_all()
+
+    def obtener(self, espera=None):
+        # espera: segundos máximos para esta solicitud en lugar del valor del pool
+        inicio = time.monotonic()
+        espera = self.espera if espera is None else espera
+        while True:
+            conexion, ultimo_uso = self._reservar(inicio, espera)
+
+            if conexion is None:
+                try:
+                    conexion = self._crear()
+                except Exception:
+                    self._liberar_lugar()
+                    raise
+                break
+
+            # Verificar la conexión si estuvo ociosa el tiempo suficiente
+            if time.monotonic() - ultimo_uso < self.verificar_tras or self._esta_sana(conexion):
+                break
+            self._descartar(conexion)
+
+        espera = time.monotonic() - inicio
+        with self._condicion:
+            self._estadisticas["prestamos"] += 1
+            self._estadisticas["tiempo_espera_total"] += espera
+            self._estadisticas["tiempo_espera_maximo"] = max(
+                self._estadisticas["tiempo_espera_maximo"], espera)
+        return ConexionPrestada(self, conexion, espera)
+
+    def devolver(self, conexion):
+        try:
+            # No dejar transacciones abiertas para el siguiente que la use
+            if getattr(conexion, "in_transaction", False):
+                conexion.rollback()
+        except Exception:
+            self._descartar(conexion)
+            return
+
+        with self._condicion:
+            self._libres.append((conexion, time.monotonic()))
+            self._condicion.notify()
+
+    def cerrar(self):
+        with self._condicion:
+            libres = [conexion for conexion, _ in self._libres]
+            self._libres.clear()
+            self._total -= len(libres)
+        for conexion in libres:
+            self._cerrar_silencioso(conexion)
+
+    def estadisticas(self):
+        with self._condicion:
+            datos = dict(self._estadisticas)
+            datos["abiertas"] = self._total
+            datos["libres"] = len(self._libres)
+        if datos["prestamos"]:
+            datos["tiempo_espera_promedio"] = datos["tiempo_espera_total"] / datos["prestamos"]
+        else:
+            datos["tiempo_espera_promedio"] = 0.0
+        return datos
+
+    def _reservar(self, inicio, espera):
+        # Devuelve una conexión libre, o (None, None) si se reservó lugar para crear una nueva
+        desalojadas = []
+        try:
+            with self._condicion:
+                ha_esperado = False
+                while True:
+                    desalojadas.extend(self._desalojar_inactivas())
+                    if self._libres:
+                        return self._libres.pop()
+                    if self._total < self.tamano:
+                        self._total += 1
+                        return None, None
+
+                    restante = espera - (time.monotonic() - inicio)
+                    if restante <= 0:
+                        self._estadisticas["agotado"] += 1
+                        raise PoolError(
+                            f"No hay conexiones libres después de {espera} segundos")
+                    if not ha_esperado:
+                        self._estadisticas["esperas"] += 1
+                        ha_esperado = True
+                    self._condicion.wait(restante)
+        finally:
+            for conexion in desalojadas:
+                self._cerrar_silencioso(conexion)
+
+    def _desalojar_inactivas(self):
+        # Las más antiguas están a la izquierda; se conservan las conexiones mínimas
+        desalojadas = []
+        limite = time.monotonic() - self.inactividad
+        while self._libres and self._total > self.minimas and self._libres[0][1] < limite:
+            conexion, _ = self._libres.popleft()
+            self._total -= 1
+            self._estadisticas["desalojadas"] += 1
+            desalojadas.append(conexion)
+        return desalojadas
+
+    def _crear(self):
+        conexion = self.fabrica()
+        with self._condicion:
+            self._estadisticas["creadas"] += 1
+        return conexion
+
+    def _esta_sana(self, conexion):
+        try:
+            return conexion.is_connected()
+        except Exception:
+            return False
+
+    def _descartar(self, conexion):
+        self._cerrar_silencioso(conexion)
+        with self._condicion:
+            self._estadisticas["descartadas"] += 1
+        self._liberar_lugar()
+
+    def _liberar_lugar(self):
+        with self._condicion:
+            self._total -= 1
+            self._condicion.notify()
+
+    def _cerrar_silencioso(self, conexion):
+        try:
+            conexion.close()
+        except Exception:
+            pass
+
+
+_pool = None
+_candado_pool = threading.Lock()
+
+
+def _conectar():
+    return mysql.connector.connect(**CONFIGURACION)
+
+
+def configurar_pool(fabrica=None, **opciones):
+    # Permite cambiar la fábrica de conexiones (p. ej. un sustituto para pruebas)
+    global _pool
+    with _candado_pool:
+        if _pool:
+            _pool.cerrar()
+        _pool = PoolConexiones(fabrica or _conectar, **opciones)
+    return _pool
+
+
+def obtener_pool():
+    global _pool
+    with _candado_pool:
+        if _pool is None:
+            _pool = PoolConexiones(_conectar)
+        return _pool
+
+
+def estadisticas_pool():
+    return obtener_pool().estadisticas()
+
+
+def cerrar_pool():
+    with _candado_pool:
+        if _pool:
+            _pool.cerrar()
+
+
+def es_falla_de_conexion(error):
+    # Errores por los que conviene reintentar más tarde en lugar de rechazar la operación
+    return isinstance(error, (InterfaceError, OperationalError, PoolError,
+                              ConnectionTimeoutError, ReadTimeoutError, WriteTimeoutError))
+
+
+def _en_hilo_principal():
+    app = QCoreApplication.instance()
+    return app is not None and QThread.currentThread() == app.thread()
+
 
 def obtener_conexion():
     try:
-        conexion = mysql.connector.connect(
-            host="localhost",
-            user="root",
-            password="",
-            database="BodegaAurrera",
-            autocommit=False
-        )
-        return conexion
+        return obtener_pool().obtener()
     except Error as e:
-        QMessageBox.critical(
-            None, 
-            "Error de conexión", 
-            f"No se pudo conectar a la base de datos:\n{str(e)}"
-        )
-        raise
\ No newline at end of file
+        # Desde un hilo de trabajo el error se entrega a quien lanzó la consulta
+        if _en_hilo_principal():
+            QMessageBox.critical(
+                None,
+                "Error de conexión",
+                f"No se pudo conectar a la base de datos:\n{str(e)}"
+            )
+        raise
+
+
+def consultar(consulta, parametros=None):
+    conexion = None
+    cursor = None
+    try:
+        conexion = obtener_conexion()
+        cursor = conexion.cursor()
+        cursor.execute(consulta, parametros)
+        return cursor.fetchall()
+    finally:
+        if cursor:
+            cursor.close()
+        if conexion:
+            conexion.close()
@@ -38,7 +38,9 @@ CREATE TABLE IF NOT EXISTS `articulos` (
   `id_categorias` INT NOT NULL,
   `id_proveedor` INT NOT NULL,
   `id_unidad` INT NOT NULL,
+  `actualizado` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
   PRIMARY KEY (`codigo`),
+  INDEX `articulos_actualizado_idx` (`actualizado`),
   INDEX `fk_articulos_categorias_idx` (`id_categorias`),
   INDEX `fk_articulos_proveedores1_idx` (`id_proveedor`),
   INDEX `fk_articulos_unidad1_idx` (`id_unidad`),
@@ -59,14 +61,16 @@ CREATE TABLE IF NOT EXISTS `articulos` (
     ON UPDATE CASCADE
 ) ENGINE=InnoDB;
 
--- Tabla clientes (sin cambios)
+-- Tabla clientes (actualizada)
 CREATE TABLE IF NOT EXISTS `clientes` (
   `telefono` CHAR(10) NOT NULL,
   `nombre` VARCHAR(75) NOT NULL,
   `direccion` VARCHAR(100) NOT NULL,
   `rfc` VARCHAR(20),
   `email` VARCHAR(100),
-  PRIMARY KEY (`telefono`)
+  PRIMARY KEY (`telefono`),
+  INDEX `clientes_nombre_idx` (`nombre`),
+  INDEX `clientes_rfc_idx` (`rfc`)
 ) ENGINE=InnoDB;
 
 -- Tabla empleado (sin cambios)
@@ -78,7 +82,7 @@ CREATE TABLE IF NOT EXISTS `empleado` (
   PRIMARY KEY (`id_empleado`)
 ) ENGINE=InnoDB;
 
--- Tabla venta (sin cambios)
+-- Tabla venta (actualizada)
 CREATE TABLE IF NOT EXISTS `venta` (
   `id_venta` INT NOT NULL,
   `fecha` DATE NOT NULL,
@@ -87,6 +91,7 @@ CREATE TABLE IF NOT EXISTS `venta` (
   `id_empleado` INT NOT NULL,
   `metodo_pago` VARCHAR(20) DEFAULT 'EFECTIVO',
   PRIMARY KEY (`id_venta`),
+  INDEX `venta_fecha_idx` (`fecha`, `id_venta`),
   INDEX `fk_venta_clientes1_idx` (`telefono`),
   INDEX `fk_venta_empleado1_idx` (`id_empleado`),
   CONSTRAINT `fk_venta_clientes1`
@@ -160,14 +165,22 @@ CREATE TABLE IF NOT EXISTS `detalles_venta` (
     ON UPDATE CASCADE
 ) ENGINE=InnoDB;
 
--- Tabla ventas_pausadas (sin cambios)
+-- Tabla ventas_pausadas (actualizada)
+-- Varias ventas pausadas por terminal y cajero; productos en forma compacta [[codigo, cantidad, precio], ...]
 CREATE TABLE IF NOT EXISTS `ventas_pausadas` (
   `id_pausa` INT AUTO_INCREMENT PRIMARY KEY,
+  `terminal` VARCHAR(64) NOT NULL,
   `telefono_cliente` VARCHAR(10),
   `cliente_info` TEXT,
   `productos` TEXT,
+  `articulos` INT NOT NULL DEFAULT 0,
+  `total` FLOAT NOT NULL DEFAULT 0,
   `id_empleado` INT,
-  `fecha_pausa` DATETIME DEFAULT CURRENT_TIMESTAMP
+  `fecha_pausa` DATETIME DEFAULT CURRENT_TIMESTAMP,
+  `expira` DATETIME NOT NULL,
+  INDEX `ventas_pausadas_terminal_idx` (`terminal`, `fecha_pausa`),
+  INDEX `ventas_pausadas_empleado_idx` (`id_empleado`, `fecha_pausa`),
+  INDEX `ventas_pausadas_expira_idx` (`expira`)
 ) ENGINE=InnoDB;
 
 -- Tabla facturas (sin cambios)
@@ -181,6 +194,146 @@ CREATE TABLE IF NOT EXISTS `facturas` (
   FOREIGN KEY (`id_venta`) REFERENCES `venta`(`id_venta`)
 ) ENGINE=InnoDB;
 
+-- Tabla secuencias (nueva)
+CREATE TABLE IF NOT EXISTS `secuencias` (
+  `nombre` VARCHAR(30) NOT NULL,
+  `siguiente` INT NOT NULL,
+  PRIMARY KEY (`nombre`)
+) ENGINE=InnoDB;
+
+-- Tabla resumen_diario_ventas (nueva)
+-- Totales por día, empleado y método de pago; se actualiza al registrar cada venta
+CREATE TABLE IF NOT EXISTS `resumen_diario_ventas` (
+  `fecha` DATE NOT NULL,
+  `id_empleado` INT NOT NULL,
+  `metodo_pago` VARCHAR(20) NOT NULL,
+  `ventas` INT NOT NULL DEFAULT 0,
+  `importe` DOUBLE NOT NULL DEFAULT 0,
+  PRIMARY KEY (`fecha`, `id_empleado`, `metodo_pago`)
+) ENGINE=InnoDB;
+
+-- Tabla resumen_diario_categorias (nueva)
+-- Unidades e importe vendidos por día y categoría
+CREATE TABLE IF NOT EXISTS `resumen_diario_categorias` (
+  `fecha` DATE NOT NULL,
+  `id_categorias` INT NOT NULL,
+  `unidades` INT NOT NULL DEFAULT 0,
+  `importe` DOUBLE NOT NULL DEFAULT 0,
+  PRIMARY KEY (`fecha`, `id_categorias`)
+) ENGINE=InnoDB;
+
+-- Tabla reservas (nueva)
+-- Existencias apartadas por el carrito abierto de cada terminal; caducan solas en 'expira'
+CREATE TABLE IF NOT EXISTS `reservas` (
+  `terminal` VARCHAR(64) NOT NULL,
+  `codigo` CHAR(13) NOT NULL,
+  `cantidad` INT NOT NULL,
+  `expira` DATETIME NOT NULL,
+  PRIMARY KEY (`terminal`, `codigo`),
+  INDEX `reservas_codigo_idx` (`codigo`, `expira`),
+  INDEX `reservas_expira_idx` (`expira`)
+) ENGINE=InnoDB;
+
+-- Tabla cambios (nueva)
+-- Altas, cambios y bajas de las tablas de catálogo; la llenan los triggers de abajo y cada
+-- terminal lee solo los renglones posteriores al último que vio
+CREATE TABLE IF NOT EXISTS `cambios` (
+  `id_cambio` BIGINT NOT NULL AUTO_INCREMENT,
+  `tabla` VARCHAR(30) NOT NULL,
+  `llave` VARCHAR(20) NOT NULL,
+  `fecha` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`id_cambio`),
+  INDEX `cambios_fecha_idx` (`fecha`)
+) ENGINE=InnoDB;
+
+-- Triggers de cambios (nuevos)
+DELIMITER $$
+DROP TRIGGER IF EXISTS `articulos_cambios_alta`$$
+CREATE TRIGGER `articulos_cambios_alta` AFTER INSERT ON `articulos` FOR EACH ROW
+  INSERT INTO `cambios` (`tabla`, `llave`) VALUES ('articulos', NEW.`codigo`)$$
+DROP TRIGGER IF EXISTS `articulos_cambios_cambio`$$
+CREATE TRIGGER `articulos_cambios_cambio` AFTER UPDATE ON `articulos` FOR EACH ROW
+BEGIN
+  INSERT INTO `cambios` (`tabla`, `llave`) VALUES ('articulos', NEW.`codigo`);
+  IF NEW.`codigo` <> OLD.`codigo` THEN
+    INSERT INTO `cambios` (`tabla`, `llave`) VALUES ('articulos', OLD.`codigo`);
+  END IF;
+END$$
+DROP TRIGGER IF EXISTS `articulos_cambios_baja`$$
+CREATE TRIGGER `articulos_cambios_baja` AFTER DELETE ON `articulos` FOR EACH ROW
+  INSERT INTO `cambios` (`tabla`, `llave`) VALUES ('articulos', OLD.`codigo`)$$
+DROP TRIGGER IF EXISTS `clientes_cambios_alta`$$
+CREATE TRIGGER `clientes_cambios_alta` AFTER INSERT ON `clientes` FOR EACH ROW
+  INSERT INTO `cambios` (`tabla`, `llave`) VALUES ('clientes', NEW.`telefono`)$$
+DROP TRIGGER IF EXISTS `clientes_cambios_cambio`$$
+CREATE TRIGGER `clientes_cambios_cambio` AFTER UPDATE ON `clientes` FOR EACH ROW
+BEGIN
+  INSERT INTO `cambios` (`tabla`, `llave`) VALUES ('clientes', NEW.`telefono`);
+  IF NEW.`telefono` <> OLD.`telefono` THEN
+    INSERT INTO `cambios` (`tabla`, `llave`) VALUES ('clientes', OLD.`telefono`);
+  END IF;
+END$$
+DROP TRIGGER IF EXISTS `clientes_cambios_baja`$$
+CREATE TRIGGER `clientes_cambios_baja` AFTER DELETE ON `clientes` FOR EACH ROW
+  INSERT INTO `cambios` (`tabla`, `llave`) VALUES ('clientes', OLD.`telefono`)$$
+DROP TRIGGER IF EXISTS `empleado_cambios_alta`$$
+CREATE TRIGGER `empleado_cambios_alta` AFTER INSERT ON `empleado` FOR EACH ROW
+  INSERT INTO `cambios` (`tabla`, `llave`) VALUES ('empleado', NEW.`id_empleado`)$$
+DROP TRIGGER IF EXISTS `empleado_cambios_cambio`$$
+CREATE TRIGGER `empleado_cambios_cambio` AFTER UPDATE ON `empleado` FOR EACH ROW
+BEGIN
+  INSERT INTO `cambios` (`tabla`, `llave`) VALUES ('empleado', NEW.`id_empleado`);
+  IF NEW.`id_empleado` <> OLD.`id_empleado` THEN
+    INSERT INTO `cambios` (`tabla`, `llave`) VALUES ('empleado', OLD.`id_empleado`);
+  END IF;
+END$$
+DROP TRIGGER IF EXISTS `empleado_cambios_baja`$$
+CREATE TRIGGER `empleado_cambios_baja` AFTER DELETE ON `empleado` FOR EACH ROW
+  INSERT INTO `cambios` (`tabla`, `llave`) VALUES ('empleado', OLD.`id_empleado`)$$
+DROP TRIGGER IF EXISTS `categorias_cambios_alta`$$
+CREATE TRIGGER `categorias_cambios_alta` AFTER INSERT ON `categorias` FOR EACH ROW
+  INSERT INTO `cambios` (`tabla`, `llave`) VALUES ('categorias', NEW.`id_categorias`)$$
+DROP TRIGGER IF EXISTS `categorias_cambios_cambio`$$
+CREATE TRIGGER `categorias_cambios_cambio` AFTER UPDATE ON `categorias` FOR EACH ROW
+BEGIN
+  INSERT INTO `cambios` (`tabla`, `llave`) VALUES ('categorias', NEW.`id_categorias`);
+  IF NEW.`id_categorias` <> OLD.`id_categorias` THEN
+    INSERT INTO `cambios` (`tabla`, `llave`) VALUES ('categorias', OLD.`id_categorias`);
+  END IF;
+END$$
+DROP TRIGGER IF EXISTS `categorias_cambios_baja`$$
+CREATE TRIGGER `categorias_cambios_baja` AFTER DELETE ON `categorias` FOR EACH ROW
+  INSERT INTO `cambios` (`tabla`, `llave`) VALUES ('categorias', OLD.`id_categorias`)$$
+DROP TRIGGER IF EXISTS `proveedores_cambios_alta`$$
+CREATE TRIGGER `proveedores_cambios_alta` AFTER INSERT ON `proveedores` FOR EACH ROW
+  INSERT INTO `cambios` (`tabla`, `llave`) VALUES ('proveedores', NEW.`id_proveedor`)$$
+DROP TRIGGER IF EXISTS `proveedores_cambios_cambio`$$
+CREATE TRIGGER `proveedores_cambios_cambio` AFTER UPDATE ON `proveedores` FOR EACH ROW
+BEGIN
+  INSERT INTO `cambios` (`tabla`, `llave`) VALUES ('proveedores', NEW.`id_proveedor`);
+  IF NEW.`id_proveedor` <> OLD.`id_proveedor` THEN
+    INSERT INTO `cambios` (`tabla`, `llave`) VALUES ('proveedores', OLD.`id_proveedor`);
+  END IF;
+END$$
+DROP TRIGGER IF EXISTS `proveedores_cambios_baja`$$
+CREATE TRIGGER `proveedores_cambios_baja` AFTER DELETE ON `proveedores` FOR EACH ROW
+  INSERT INTO `cambios` (`tabla`, `llave`) VALUES ('proveedores', OLD.`id_proveedor`)$$
+DROP TRIGGER IF EXISTS `unidad_cambios_alta`$$
+CREATE TRIGGER `unidad_cambios_alta` AFTER INSERT ON `unidad` FOR EACH ROW
+  INSERT INTO `cambios` (`tabla`, `llave`) VALUES ('unidad', NEW.`id_unidad`)$$
+DROP TRIGGER IF EXISTS `unidad_cambios_cambio`$$
+CREATE TRIGGER `unidad_cambios_cambio` AFTER UPDATE ON `unidad` FOR EACH ROW
+BEGIN
+  INSERT INTO `cambios` (`tabla`, `llave`) VALUES ('unidad', NEW.`id_unidad`);
+  IF NEW.`id_unidad` <> OLD.`id_unidad` THEN
+    INSERT INTO `cambios` (`tabla`, `llave`) VALUES ('unidad', OLD.`id_unidad`);
+  END IF;
+END$$
+DROP TRIGGER IF EXISTS `unidad_cambios_baja`$$
+CREATE TRIGGER `unidad_cambios_baja` AFTER DELETE ON `unidad` FOR EACH ROW
+  INSERT INTO `cambios` (`tabla`, `llave`) VALUES ('unidad', OLD.`id_unidad`)$$
+DELIMITER ;
+
 -- =============================================
 -- INSERCIÓN DE DATOS ACTUALIZADOS
 -- =============================================
@@ -1,16 +1,140 @@
-from conexion import obtener_conexion
+from conexion import consultar
+import repositorio
+from ejecutor import obtener_ejecutor
+from reportes import totales_periodo
+from exportador import filtros_ventas, exportar_ventas
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QFormLayout,
     QLineEdit, QPushButton, QTableWidget, QTableWidgetItem,
-    QMessageBox, QHeaderView, QDateEdit, QLabel, QGroupBox
+    QMessageBox, QHeaderView, QDateEdit, QLabel, QGroupBox,
+    QTableView, QFileDialog
 )
-from PyQt6.QtCore import Qt, QDate
+from PyQt6.QtCore import Qt, QDate, QAbstractTableModel, QModelIndex, pyqtSignal
 from PyQt6.QtGui import QDoubleValidator, QIntValidator
 
+TAMANO_PAGINA = 200
+
+class ModeloVentas(QAbstractTableModel):
+    error = pyqtSignal(str)
+
+    ENCABEZADOS = ["ID", "Fecha", "Importe", "Cliente", "Empleado", "Teléfono", "Factura"]
+
+    CONSULTA = """
+        SELECT v.id_venta, v.fecha, v.importe, 
+               IFNULL(c.nombre, 'General') AS cliente, 
+               e.nombre AS empleado,
+               v.telefono,
+               IF(f.id_venta IS NULL, 'No', 'Sí') AS facturado
+        FROM venta v
+        LEFT JOIN clientes c ON v.telefono = c.telefono
+        JOIN empleado e ON v.id_empleado = e.id_empleado
+        LEFT JOIN facturas f ON v.id_venta = f.id_venta
+        WHERE {condiciones}
+        ORDER BY v.fecha DESC, v.id_venta DESC
+        LIMIT %s
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._filas = []
+        self._condiciones = []
+        self._parametros = []
+        self._hay_mas = False
+        self._cargando = False
+
+    def establecer_filtro(self, condiciones, parametros):
+        self.beginResetModel()
+        self._filas = []
+        self._condiciones = condiciones
+        self._parametros = parametros
+        self._hay_mas = True
+        self._cargando = False
+        self.endResetModel()
+        self.fetchMore(QModelIndex())
+
+    def id_venta(self, fila):
+        return self._filas[fila][0]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._filas)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.ENCABEZADOS)
+
+    def headerData(self, seccion, orientacion, rol=Qt.ItemDataRole.DisplayRole):
+        if orientacion == Qt.Orientation.Horizontal and rol == Qt.ItemDataRole.DisplayRole:
+            return self.ENCABEZADOS[seccion]
+        return None
+
+    def data(self, indice, rol=Qt.ItemDataRole.DisplayRole):
+        if not indice.isValid():
+            return None
+        id_venta, fecha, importe, cliente, empleado, telefono, facturado = self._filas[indice.row()]
+        columna = indice.column()
+
+        if rol == Qt.ItemDataRole.DisplayRole:
+            if columna == 0:
+                return str(id_venta)
+            if columna == 1:
+                return fecha.strftime("%d/%m/%Y %H:%M")
+            if columna == 2:
+                return f"${importe:.2f}"
+            if columna == 3:
+                return cliente
+            if columna == 4:
+                return empleado
+            if columna == 5:
+                return telefono if telefono else ""
+            return facturado
+
+        if rol == Qt.ItemDataRole.TextAlignmentRole and columna == 2:
+            return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+        return None
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and self._hay_mas and not self._cargando
+
+    def fetchMore(self, parent):
+        if not self.canFetchMore(parent):
+            return
+
+        condiciones = list(self._condiciones)
+        parametros = list(self._parametros)
+
+        # Paginación por llave (fecha, id_venta): continúa después de la última fila cargada
+        if self._filas:
+            ultimo_id, ultima_fecha = self._filas[-1][0], self._filas[-1][1]
+            condiciones.append("(v.fecha < %s OR (v.fecha = %s AND v.id_venta < %s))")
+            parametros.extend([ultima_fecha, ultima_fecha, ultimo_id])
+        parametros.append(TAMANO_PAGINA)
+
+        # Un cambio de filtro reemplaza a la página que siga en camino
+        self._cargando = True
+        obtener_ejecutor().ejecutar(
+            consultar, self.CONSULTA.format(condiciones=" AND ".join(condiciones)), parametros,
+            clave=(id(self), "pagina"),
+            al_terminar=self._agregar_pagina,
+            al_fallar=self._fallo_pagina
+        )
+
+    def _agregar_pagina(self, filas):
+        self._cargando = False
+        if len(filas) < TAMANO_PAGINA:
+            self._hay_mas = False
+        if filas:
+            inicio = len(self._filas)
+            self.beginInsertRows(QModelIndex(), inicio, inicio + len(filas) - 1)
+            self._filas.extend(tuple(fila) for fila in filas)
+            self.endInsertRows()
+
+    def _fallo_pagina(self, error):
+        self._cargando = False
+        self._hay_mas = False
+        self.error.emit(str(error))
+
 class VentanaDetallesVenta(QWidget):
-    def __init__(self, conexion):
+    def __init__(self):
         super().__init__()
-        self.conexion = conexion
         
         self.init_ui()
         self.cargar_ventas()
@@ -45,13 +169,25 @@ class VentanaDetallesVenta(QWidget):
         self.boton_limpiar = QPushButton("🧹 Limpiar")
         self.boton_limpiar.setStyleSheet("background-color: #f44336; color: white;")
         
+        self.boton_exportar = QPushButton("📤 Exportar")
+        self.boton_exportar.setStyleSheet("background-color: #2196F3; color: white;")
+        
         # Tablas
-        self.tabla_ventas = QTableWidget()
+        self.modelo_ventas = ModeloVentas(self)
+        self.tabla_ventas = QTableView()
+        self.tabla_ventas.setModel(self.modelo_ventas)
         self.configurar_tabla_ventas()
         
         self.tabla_detalles = QTableWidget()
         self.configurar_tabla_detalles()
         
+        # Resumen del periodo (se lee de los resúmenes diarios)
+        self.label_resumen = QLabel("Ventas: 0    Total: $0.00")
+        self.label_resumen.setStyleSheet("font-size: 14px; font-weight: bold; color: #2E7D32;")
+        
+        self.tabla_resumen = QTableWidget()
+        self.configurar_tabla_resumen()
+        
         # Layouts
         filtros_layout = QHBoxLayout()
         filtros_layout.addWidget(QLabel("Desde:"))
@@ -64,6 +200,7 @@ class VentanaDetallesVenta(QWidget):
         filtros_layout.addWidget(self.telefono_cliente_input)
         filtros_layout.addWidget(self.boton_buscar)
         filtros_layout.addWidget(self.boton_limpiar)
+        filtros_layout.addWidget(self.boton_exportar)
         
         ventas_group = QGroupBox("Ventas")
         ventas_group.setLayout(QVBoxLayout())
@@ -73,26 +210,36 @@ class VentanaDetallesVenta(QWidget):
         detalles_group.setLayout(QVBoxLayout())
         detalles_group.layout().addWidget(self.tabla_detalles)
         
+        resumen_group = QGroupBox("Resumen del periodo")
+        resumen_group.setLayout(QVBoxLayout())
+        resumen_group.layout().addWidget(self.label_resumen)
+        resumen_group.layout().addWidget(self.tabla_resumen)
+        
+        inferior_layout = QHBoxLayout()
+        inferior_layout.addWidget(detalles_group, 3)
+        inferior_layout.addWidget(resumen_group, 2)
+        
         main_layout = QVBoxLayout()
         main_layout.addLayout(filtros_layout)
         main_layout.addWidget(ventas_group)
-        main_layout.addWidget(detalles_group)
+        main_layout.addLayout(inferior_layout)
         
         self.setLayout(main_layout)
         
         # Conexiones
         self.boton_buscar.clicked.connect(self.cargar_ventas)
         self.boton_limpiar.clicked.connect(self.limpiar_filtros)
-        self.tabla_ventas.itemSelectionChanged.connect(self.cargar_detalles_venta)
+        self.boton_exportar.clicked.connect(self.exportar_ventas)
+        self.tabla_ventas.selectionModel().selectionChanged.connect(self.cargar_detalles_venta)
+        self.modelo_ventas.error.connect(
+            lambda mensaje: QMessageBox.critical(self, "Error", f"Error al cargar ventas:\n{mensaje}"))
 
     def configurar_tabla_ventas(self):
-        self.tabla_ventas.setColumnCount(7)
-        self.tabla_ventas.setHorizontalHeaderLabels([
-            "ID", "Fecha", "Importe", "Cliente", "Empleado", "Teléfono", "Factura"
-        ])
         self.tabla_ventas.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        self.tabla_ventas.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.tabla_ventas.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.tabla_ventas.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.tabla_ventas.setSelectionMode(QTableView.SelectionMode.SingleSelection)
+        self.tabla_ventas.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+        self.tabla_ventas.verticalHeader().setVisible(False)
         
         # Ajustar ancho de columnas
         self.tabla_ventas.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
@@ -114,156 +261,178 @@ class VentanaDetallesVenta(QWidget):
         self.tabla_detalles.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)
         self.tabla_detalles.horizontalHeader().setSectionResizeMode(4, QHeaderView.ResizeMode.ResizeToContents)
 
+    def configurar_tabla_resumen(self):
+        self.tabla_resumen.setColumnCount(4)
+        self.tabla_resumen.setHorizontalHeaderLabels([
+            "Por", "Concepto", "Ventas / Unidades", "Importe"
+        ])
+        self.tabla_resumen.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.tabla_resumen.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.tabla_resumen.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.tabla_resumen.verticalHeader().setVisible(False)
+        
+        self.tabla_resumen.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
+        self.tabla_resumen.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)
+        self.tabla_resumen.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)
+
     def cargar_ventas(self):
         try:
             # Obtener parámetros de filtro
-            fecha_inicio = self.fecha_inicio.date().toString("yyyy-MM-dd")
-            fecha_fin = self.fecha_fin.date().toString("yyyy-MM-dd")
-            id_venta = self.id_venta_input.text()
-            telefono = self.telefono_cliente_input.text()
+            fecha_inicio, fecha_fin, id_venta, telefono = self.filtros()
             
-            # Construir consulta SQL con filtros
-            query = """
-                SELECT v.id_venta, v.fecha, v.importe, 
-                       IFNULL(c.nombre, 'General') AS cliente, 
-                       e.nombre AS empleado,
-                       v.telefono,
-                       IF(f.id_venta IS NULL, 'No', 'Sí') AS facturado
-                FROM venta v
-                LEFT JOIN clientes c ON v.telefono = c.telefono
-                JOIN empleado e ON v.id_empleado = e.id_empleado
-                LEFT JOIN facturas f ON v.id_venta = f.id_venta
-                WHERE v.fecha BETWEEN %s AND %s
-            """
-            params = [fecha_inicio, fecha_fin]
+            # Construir filtros SQL (los mismos que usa la exportación)
+            condiciones, params = filtros_ventas(fecha_inicio, fecha_fin, id_venta, telefono)
             
-            if id_venta:
-                query += " AND v.id_venta = %s"
-                params.append(int(id_venta))
-                
-            if telefono:
-                query += " AND v.telefono = %s"
-                params.append(telefono)
-                
-            query += " ORDER BY v.fecha DESC, v.id_venta DESC"
-            
-            # Ejecutar consulta
-            conexion = obtener_conexion()
-            cursor = conexion.cursor()
-            cursor.execute(query, params)
-            
-            # Limpiar tabla
-            self.tabla_ventas.setRowCount(0)
+            # El modelo carga la primera página y las siguientes conforme se desplaza la tabla
+            obtener_ejecutor().cancelar((id(self), "detalles"))
+            self.tabla_detalles.setRowCount(0)
+            self.modelo_ventas.establecer_filtro(condiciones, params)
             
-            # Llenar tabla
-            for row_idx, (id_venta, fecha, importe, cliente, empleado, telefono, facturado) in enumerate(cursor.fetchall()):
-                self.tabla_ventas.insertRow(row_idx)
-                
-                self.tabla_ventas.setItem(row_idx, 0, QTableWidgetItem(str(id_venta)))
-                self.tabla_ventas.setItem(row_idx, 1, QTableWidgetItem(fecha.strftime("%d/%m/%Y %H:%M")))
-                
-                item_importe = QTableWidgetItem(f"${importe:.2f}")
-                item_importe.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-                self.tabla_ventas.setItem(row_idx, 2, item_importe)
-                
-                self.tabla_ventas.setItem(row_idx, 3, QTableWidgetItem(cliente))
-                self.tabla_ventas.setItem(row_idx, 4, QTableWidgetItem(empleado))
-                self.tabla_ventas.setItem(row_idx, 5, QTableWidgetItem(telefono if telefono else ""))
-                self.tabla_ventas.setItem(row_idx, 6, QTableWidgetItem(facturado))
+            # El resumen solo depende del rango de fechas
+            obtener_ejecutor().ejecutar(
+                totales_periodo, fecha_inicio, fecha_fin,
+                clave=(id(self), "resumen"),
+                al_terminar=self.mostrar_resumen,
+                al_fallar=lambda e: self.label_resumen.setText(f"No se pudo calcular el resumen: {e}")
+            )
                 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Error al cargar ventas:\n{e}")
-        finally:
-            cursor.close()
-            conexion.close()
+
+    def filtros(self):
+        return (
+            self.fecha_inicio.date().toString("yyyy-MM-dd"),
+            self.fecha_fin.date().toString("yyyy-MM-dd"),
+            self.id_venta_input.text(),
+            self.telefono_cliente_input.text()
+        )
+
+    def exportar_ventas(self):
+        archivo, filtro = QFileDialog.getSaveFileName(
+            self, "Exportar ventas", "ventas.csv",
+            "CSV (*.csv);;CSV comprimido (*.csv.gz);;JSON Lines (*.jsonl);;JSON Lines comprimido (*.jsonl.gz)"
+        )
+        if not archivo:
+            return
+        
+        # La exportación se escribe por bloques en segundo plano; la tabla sigue disponible
+        self.boton_exportar.setEnabled(False)
+        self.boton_exportar.setText("Exportando...")
+        obtener_ejecutor().ejecutar(
+            exportar_ventas, archivo, *self.filtros(),
+            clave=(id(self), "exportar"),
+            al_terminar=lambda filas: self.exportacion_terminada(archivo, filas),
+            al_fallar=self.exportacion_fallida
+        )
+
+    def exportacion_terminada(self, archivo, filas):
+        self.boton_exportar.setEnabled(True)
+        self.boton_exportar.setText("📤 Exportar")
+        QMessageBox.information(self, "Exportación", f"{filas} renglones exportados a:\n{archivo}")
+
+    def exportacion_fallida(self, error):
+        self.boton_exportar.setEnabled(True)
+        self.boton_exportar.setText("📤 Exportar")
+        QMessageBox.critical(self, "Error", f"Error al exportar ventas:\n{error}")
+
+    def mostrar_resumen(self, totales):
+        self.label_resumen.setText(
+            f"Ventas: {totales['ventas']}    Total: ${totales['importe']:.2f}")
+        
+        filas = []
+        for metodo, ventas, importe in totales['por_metodo']:
+            filas.append(("Método de pago", metodo, ventas, importe))
+        for empleado, ventas, importe in totales['por_empleado']:
+            filas.append(("Empleado", empleado, ventas, importe))
+        for categoria, unidades, importe in totales['por_categoria']:
+            filas.append(("Categoría", categoria, unidades, importe))
+        for fecha, ventas, importe in totales['por_dia']:
+            filas.append(("Día", fecha.strftime("%d/%m/%Y"), ventas, importe))
+        
+        self.tabla_resumen.setRowCount(len(filas))
+        for row_idx, (grupo, concepto, cantidad, importe) in enumerate(filas):
+            self.tabla_resumen.setItem(row_idx, 0, QTableWidgetItem(grupo))
+            self.tabla_resumen.setItem(row_idx, 1, QTableWidgetItem(str(concepto)))
+            
+            item_cantidad = QTableWidgetItem(str(int(cantidad)))
+            item_cantidad.setTextAlignment(Qt.AlignmentFlag.AlignCenter | Qt.AlignmentFlag.AlignVCenter)
+            self.tabla_resumen.setItem(row_idx, 2, item_cantidad)
+            
+            item_importe = QTableWidgetItem(f"${importe:.2f}")
+            item_importe.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            self.tabla_resumen.setItem(row_idx, 3, item_importe)
 
     def cargar_detalles_venta(self):
-        selected = self.tabla_ventas.currentRow()
+        selected = self.tabla_ventas.currentIndex()
         
-        if selected < 0:
+        if not selected.isValid():
             return
             
-        id_venta = self.tabla_ventas.item(selected, 0).text()
+        id_venta = self.modelo_ventas.id_venta(selected.row())
         
-        try:
-            conexion = obtener_conexion()
-            cursor = conexion.cursor()
+        # Si el cajero recorre la lista rápido, sólo se muestra la última venta seleccionada
+        obtener_ejecutor().ejecutar(
+            repositorio.detalles_de_venta, id_venta,
+            clave=(id(self), "detalles"),
+            al_terminar=self.mostrar_detalles_venta,
+            al_fallar=lambda e: QMessageBox.critical(self, "Error", f"Error al cargar detalles:\n{e}")
+        )
+
+    def mostrar_detalles_venta(self, resultado):
+        detalles, factura = resultado
+        
+        # Limpiar tabla
+        self.tabla_detalles.setRowCount(0)
+        
+        # Llenar tabla
+        for row_idx, (codigo, nombre, cantidad, precio) in enumerate(detalles):
+            self.tabla_detalles.insertRow(row_idx)
             
-            # Cargar detalles de los productos
-            cursor.execute("""
-                SELECT a.codigo, a.nombre, dv.cantidad, dv.precio
-                FROM detalles_venta dv
-                JOIN articulos a ON dv.codigo = a.codigo
-                WHERE dv.id_venta = %s
-                ORDER BY a.nombre
-            """, (int(id_venta),))
+            self.tabla_detalles.setItem(row_idx, 0, QTableWidgetItem(codigo))
+            self.tabla_detalles.setItem(row_idx, 1, QTableWidgetItem(nombre))
             
-            # Limpiar tabla
-            self.tabla_detalles.setRowCount(0)
+            item_cantidad = QTableWidgetItem(str(cantidad))
+            item_cantidad.setTextAlignment(Qt.AlignmentFlag.AlignCenter | Qt.AlignmentFlag.AlignVCenter)
+            self.tabla_detalles.setItem(row_idx, 2, item_cantidad)
             
-            # Llenar tabla
-            for row_idx, (codigo, nombre, cantidad, precio) in enumerate(cursor.fetchall()):
-                self.tabla_detalles.insertRow(row_idx)
-                
-                self.tabla_detalles.setItem(row_idx, 0, QTableWidgetItem(codigo))
-                self.tabla_detalles.setItem(row_idx, 1, QTableWidgetItem(nombre))
-                
-                item_cantidad = QTableWidgetItem(str(cantidad))
-                item_cantidad.setTextAlignment(Qt.AlignmentFlag.AlignCenter | Qt.AlignmentFlag.AlignVCenter)
-                self.tabla_detalles.setItem(row_idx, 2, item_cantidad)
-                
-                item_precio = QTableWidgetItem(f"${precio:.2f}")
-                item_precio.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-                self.tabla_detalles.setItem(row_idx, 3, item_precio)
-                
-                subtotal = cantidad * precio
-                item_subtotal = QTableWidgetItem(f"${subtotal:.2f}")
-                item_subtotal.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-                self.tabla_detalles.setItem(row_idx, 4, item_subtotal)
+            item_precio = QTableWidgetItem(f"${precio:.2f}")
+            item_precio.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            self.tabla_detalles.setItem(row_idx, 3, item_precio)
             
-            # Cargar datos de factura si existe
-            cursor.execute("""
-                SELECT rfc, razon_social, direccion_fiscal, email
-                FROM facturas
-                WHERE id_venta = %s
-            """, (int(id_venta),))
+            subtotal = cantidad * precio
+            item_subtotal = QTableWidgetItem(f"${subtotal:.2f}")
+            item_subtotal.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            self.tabla_detalles.setItem(row_idx, 4, item_subtotal)
+        
+        if factura:
+            # Agregar fila con datos de factura
+            row_idx = self.tabla_detalles.rowCount()
+            self.tabla_detalles.insertRow(row_idx)
             
-            factura = cursor.fetchone()
-            if factura:
-                # Agregar fila con datos de factura
-                row_idx = self.tabla_detalles.rowCount()
-                self.tabla_detalles.insertRow(row_idx)
-                
-                self.tabla_detalles.setItem(row_idx, 0, QTableWidgetItem("DATOS DE FACTURA:"))
-                self.tabla_detalles.setSpan(row_idx, 0, 1, 5)
-                
-                rfc, razon_social, direccion, email = factura
-                
-                row_idx += 1
-                self.tabla_detalles.insertRow(row_idx)
-                self.tabla_detalles.setItem(row_idx, 0, QTableWidgetItem(f"RFC: {rfc}"))
-                self.tabla_detalles.setSpan(row_idx, 0, 1, 5)
-                
-                row_idx += 1
-                self.tabla_detalles.insertRow(row_idx)
-                self.tabla_detalles.setItem(row_idx, 0, QTableWidgetItem(f"Razón Social: {razon_social}"))
-                self.tabla_detalles.setSpan(row_idx, 0, 1, 5)
-                
-                row_idx += 1
-                self.tabla_detalles.insertRow(row_idx)
-                self.tabla_detalles.setItem(row_idx, 0, QTableWidgetItem(f"Dirección: {direccion}"))
-                self.tabla_detalles.setSpan(row_idx, 0, 1, 5)
-                
-                row_idx += 1
-                self.tabla_detalles.insertRow(row_idx)
-                self.tabla_detalles.setItem(row_idx, 0, QTableWidgetItem(f"Email: {email}"))
-                self.tabla_detalles.setSpan(row_idx, 0, 1, 5)
-                
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error al cargar detalles:\n{e}")
-        finally:
-            cursor.close()
-            conexion.close()
+            self.tabla_detalles.setItem(row_idx, 0, QTableWidgetItem("DATOS DE FACTURA:"))
+            self.tabla_detalles.setSpan(row_idx, 0, 1, 5)
+            
+            rfc, razon_social, direccion, email = factura
+            
+            row_idx += 1
+            self.tabla_detalles.insertRow(row_idx)
+            self.tabla_detalles.setItem(row_idx, 0, QTableWidgetItem(f"RFC: {rfc}"))
+            self.tabla_detalles.setSpan(row_idx, 0, 1, 5)
+            
+            row_idx += 1
+            self.tabla_detalles.insertRow(row_idx)
+            self.tabla_detalles.setItem(row_idx, 0, QTableWidgetItem(f"Razón Social: {razon_social}"))
+            self.tabla_detalles.setSpan(row_idx, 0, 1, 5)
+            
+            row_idx += 1
+            self.tabla_detalles.insertRow(row_idx)
+            self.tabla_detalles.setItem(row_idx, 0, QTableWidgetItem(f"Dirección: {direccion}"))
+            self.tabla_detalles.setSpan(row_idx, 0, 1, 5)
+            
+            row_idx += 1
+            self.tabla_detalles.insertRow(row_idx)
+            self.tabla_detalles.setItem(row_idx, 0, QTableWidgetItem(f"Email: {email}"))
+            self.tabla_detalles.setSpan(row_idx, 0, 1, 5)
 
     def limpiar_filtros(self):
         self.fecha_inicio.setDate(QDate.currentDate().addMonths(-1))
@@ -0,0 +1,100 @@
+from conexion import estadisticas_pool
+import instrumentacion
+from instrumentacion import registro
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QTableWidget, QTableWidgetItem, QHeaderView
+)
+from PyQt6.QtCore import Qt
+
+class DiagnosticoDialog(QDialog):
+    COLUMNAS = [
+        ("Manejador", None), ("Consulta", None), ("Llamadas", "llamadas"),
+        ("Total ms", "total_ms"), ("Prom. ms", "promedio_ms"), ("p95 ms", "p95_ms"),
+        ("Máx. ms", "maximo_ms"), ("Filas", "filas"), ("Espera ms", "espera_ms"),
+        ("Lentas", "lentas")
+    ]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Diagnóstico de consultas")
+        self.resize(1000, 500)
+
+        self.label_estado = QLabel()
+        self.label_estado.setWordWrap(True)
+
+        self.label_pool = QLabel()
+
+        self.tabla_consultas = QTableWidget()
+        self.tabla_consultas.setColumnCount(len(self.COLUMNAS))
+        self.tabla_consultas.setHorizontalHeaderLabels([titulo for titulo, _ in self.COLUMNAS])
+        self.tabla_consultas.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.tabla_consultas.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        self.tabla_consultas.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.tabla_consultas.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.tabla_consultas.verticalHeader().setVisible(False)
+        self.tabla_consultas.setWordWrap(False)
+
+        self.boton_actualizar = QPushButton("🔄 Actualizar")
+        self.boton_actualizar.clicked.connect(self.actualizar)
+
+        self.boton_reiniciar = QPushButton("🧹 Reiniciar contadores")
+        self.boton_reiniciar.clicked.connect(self.reiniciar)
+
+        self.boton_guardar = QPushButton("💾 Guardar resumen")
+        self.boton_guardar.clicked.connect(self.guardar)
+
+        self.boton_cerrar = QPushButton("Cerrar")
+        self.boton_cerrar.clicked.connect(self.accept)
+
+        botones_layout = QHBoxLayout()
+        botones_layout.addWidget(self.boton_actualizar)
+        botones_layout.addWidget(self.boton_reiniciar)
+        botones_layout.addWidget(self.boton_guardar)
+        botones_layout.addStretch()
+        botones_layout.addWidget(self.boton_cerrar)
+
+        layout = QVBoxLayout()
+        layout.addWidget(self.label_estado)
+        layout.addWidget(self.label_pool)
+        layout.addWidget(self.tabla_consultas)
+        layout.addLayout(botones_layout)
+        self.setLayout(layout)
+
+        self.actualizar()
+
+    def actualizar(self):
+        if instrumentacion.ACTIVA:
+            self.label_estado.setText(
+                f"Consultas de {instrumentacion.UMBRAL_LENTA_MS:.0f} ms o más se escriben en "
+                f"{instrumentacion.ARCHIVO_LENTAS}")
+        else:
+            self.label_estado.setText(
+                "La instrumentación está apagada. Iniciar con la variable de entorno "
+                "POS_INSTRUMENTAR=1 para registrar las consultas.")
+
+        pool = estadisticas_pool()
+        self.label_pool.setText(
+            f"Pool: {pool['abiertas']} abiertas, {pool['libres']} libres, {pool['prestamos']} préstamos, "
+            f"espera promedio {pool['tiempo_espera_promedio'] * 1000:.1f} ms, "
+            f"máxima {pool['tiempo_espera_maximo'] * 1000:.1f} ms, agotado {pool['agotado']} veces")
+
+        filas = registro.resumen()
+        self.tabla_consultas.setRowCount(len(filas))
+        for row_idx, (manejador, texto, datos) in enumerate(filas):
+            self.tabla_consultas.setItem(row_idx, 0, QTableWidgetItem(manejador))
+            item_consulta = QTableWidgetItem(texto)
+            item_consulta.setToolTip(texto)
+            self.tabla_consultas.setItem(row_idx, 1, item_consulta)
+            for col_idx, (_, campo) in enumerate(self.COLUMNAS[2:], start=2):
+                item = QTableWidgetItem(str(datos[campo]))
+                item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.tabla_consultas.setItem(row_idx, col_idx, item)
+
+    def reiniciar(self):
+        registro.reiniciar()
+        self.actualizar()
+
+    def guardar(self):
+        registro.volcar()
+        self.label_estado.setText(f"Resumen guardado en {instrumentacion.ARCHIVO_RESUMEN}")
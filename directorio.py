@@ -0,0 +1,121 @@
+import threading
+import time
+from conexion import consultar
+import repositorio
+from indice import IndiceCompacto, LIMITE_RESULTADOS
+
+TTL_COMPLETO = 600  # Segundos entre recargas completas; cubre clientes dados de alta en otra caja
+
+
+class DirectorioClientes:
+    # Búsqueda de clientes por teléfono, nombre o RFC para la caja y la pestaña de clientes.
+    # El índice vive en memoria; mientras se construye por primera vez, buscar() usa los
+    # índices de la base de datos (solo por prefijo).
+    def __init__(self):
+        # telefono -> (nombre, direccion, rfc)
+        self._clientes = {}
+        self._indice = None
+        self._ultima_carga = 0.0
+        self._cambios = None  # telefono -> cliente o None; se juntan mientras se construye
+        self._candado = threading.RLock()
+        self._construccion = threading.Lock()  # Una sola carga a la vez
+
+    def lista(self):
+        # True si buscar() responde desde memoria, sin consultar la base de datos
+        with self._candado:
+            return self._indice is not None
+
+    def preparar_busqueda(self):
+        # Pensado para un hilo de trabajo: carga todos los clientes y construye el índice
+        with self._construccion:
+            with self._candado:
+                if self._indice is not None and time.monotonic() - self._ultima_carga < TTL_COMPLETO:
+                    return
+                self._cambios = {}
+
+            try:
+                filas = consultar("SELECT telefono, nombre, direccion, rfc FROM clientes")
+                clientes = {telefono: (nombre, direccion, rfc)
+                            for telefono, nombre, direccion, rfc in filas}
+                del filas
+                # La construcción se hace fuera del candado para no frenar las búsquedas
+                indice = IndiceCompacto()
+                indice.construir((telefono, (nombre, telefono, rfc))
+                                 for telefono, (nombre, _, rfc) in clientes.items())
+            except Exception:
+                with self._candado:
+                    self._cambios = None
+                raise
+
+            with self._candado:
+                # Altas, cambios y bajas hechos en esta caja mientras se leía
+                for telefono, cliente in self._cambios.items():
+                    self._guardar(clientes, indice, telefono, cliente)
+                self._cambios = None
+                self._clientes = clientes
+                self._indice = indice
+                self._ultima_carga = time.monotonic()
+
+    def buscar(self, texto, limite=LIMITE_RESULTADOS):
+        # [(telefono, nombre, direccion, rfc), ...]
+        with self._candado:
+            indice = self._indice
+        if indice is None:
+            return [tuple(fila) for fila in repositorio.buscar_clientes(texto, limite)]
+        telefonos = indice.buscar(texto, limite)
+        with self._candado:
+            return [(telefono,) + self._clientes[telefono]
+                    for telefono in telefonos if telefono in self._clientes]
+
+    def actualizar_cliente(self, telefono, nombre, direccion, rfc):
+        with self._candado:
+            self._registrar(telefono, (nombre, direccion, rfc))
+
+    def quitar_cliente(self, telefono):
+        with self._candado:
+            self._registrar(telefono, None)
+
+    def aplicar_cambios(self, telefonos):
+        # Desde el monitor de cambios: clientes modificados en esta u otra terminal
+        if telefonos is None:
+            with self._candado:
+                self._ultima_carga = 0.0  # La siguiente preparación recarga todo
+            return
+        with self._candado:
+            if self._indice is None and self._cambios is None:
+                return  # Nada en memoria que corregir
+        filas = repositorio.consultar_llaves(
+            "SELECT telefono, nombre, direccion, rfc FROM clientes", "telefono", telefonos)
+        with self._candado:
+            vigentes = set()
+            for telefono, nombre, direccion, rfc in filas:
+                self._registrar(telefono, (nombre, direccion, rfc))
+                vigentes.add(telefono)
+            for telefono in telefonos - vigentes:
+                self._registrar(telefono, None)
+
+    def invalidar(self):
+        # Hasta la siguiente preparación se vuelve a buscar en la base de datos
+        with self._candado:
+            self._clientes = {}
+            self._indice = None
+
+    def _registrar(self, telefono, cliente):
+        if self._cambios is not None:
+            self._cambios[telefono] = cliente
+        if self._indice is not None:
+            self._guardar(self._clientes, self._indice, telefono, cliente)
+
+    def _guardar(self, clientes, indice, telefono, cliente):
+        if cliente is None:
+            clientes.pop(telefono, None)
+            indice.quitar(telefono)
+            return
+        anterior = clientes.get(telefono)
+        clientes[telefono] = cliente
+        # Solo se reindexa si cambió el nombre o el RFC
+        if anterior is None or anterior[0] != cliente[0] or anterior[2] != cliente[2]:
+            indice.agregar(telefono, cliente[0], telefono, cliente[2])
+
+
+directorio = DirectorioClientes()
@@ -0,0 +1,114 @@
+import itertools
+import sys
+import traceback
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+import instrumentacion
+
+HILOS_CONSULTA = 4  # No debe superar el tamaño del pool de conexiones
+
+
+class _Tarea(QRunnable):
+    def __init__(self, ejecutor, ticket, funcion, args, kwargs):
+        super().__init__()
+        self.ejecutor = ejecutor
+        self.ticket = ticket
+        self.funcion = funcion
+        self.args = args
+        self.kwargs = kwargs
+        self.cancelada = False
+        # Ventana o método que pidió la consulta, para atribuirle sus sentencias
+        self.origen = instrumentacion.manejador_actual() if instrumentacion.ACTIVA else None
+
+    def run(self):
+        # Si fue reemplazada mientras esperaba turno no se toca la base de datos
+        if self.cancelada:
+            return
+        if self.origen:
+            instrumentacion.establecer_origen(self.origen)
+        try:
+            resultado = self.funcion(*self.args, **self.kwargs)
+            error = None
+        except Exception as e:
+            resultado = None
+            error = e
+        finally:
+            if self.origen:
+                instrumentacion.establecer_origen(None)
+        self.ejecutor._terminada.emit(self.ticket, resultado, error)
+
+
+class EjecutorConsultas(QObject):
+    # Se emite desde el hilo de trabajo y se atiende en el hilo de la interfaz
+    _terminada = pyqtSignal(int, object, object)
+    # Se emite cuando ya no queda ninguna consulta pendiente
+    inactivo = pyqtSignal()
+
+    def __init__(self, hilos=HILOS_CONSULTA):
+        super().__init__()
+        self._hilos = QThreadPool()
+        self._hilos.setMaxThreadCount(hilos)
+        self._tickets = itertools.count(1)
+        self._pendientes = {}  # ticket -> (tarea, clave, al_terminar, al_fallar)
+        self._vigentes = {}    # clave -> ticket más reciente
+        self._terminada.connect(self._despachar)
+
+    def ejecutar(self, funcion, *args, clave=None, al_terminar=None, al_fallar=None, **kwargs):
+        # Una petición con la misma clave que otra pendiente la reemplaza
+        if clave is not None:
+            self._quitar(clave)
+
+        ticket = next(self._tickets)
+        tarea = _Tarea(self, ticket, funcion, args, kwargs)
+        self._pendientes[ticket] = (tarea, clave, al_terminar, al_fallar)
+        if clave is not None:
+            self._vigentes[clave] = ticket
+        self._hilos.start(tarea)
+        return ticket
+
+    def cancelar(self, clave):
+        # Una tarea cancelada ya no llega a _despachar, así que aquí se avisa si era la última
+        if self._quitar(clave) and not self._pendientes:
+            self.inactivo.emit()
+
+    def _quitar(self, clave):
+        ticket = self._vigentes.pop(clave, None)
+        pendiente = self._pendientes.pop(ticket, None)
+        if pendiente:
+            pendiente[0].cancelada = True
+        return pendiente is not None
+
+    def pendientes(self):
+        return len(self._pendientes)
+
+    def esperar(self, milisegundos=-1):
+        return self._hilos.waitForDone(milisegundos)
+
+    def _despachar(self, ticket, resultado, error):
+        pendiente = self._pendientes.pop(ticket, None)
+        if pendiente is None:
+            return  # Cancelada o reemplazada: el resultado se descarta
+
+        _, clave, al_terminar, al_fallar = pendiente
+        if clave is not None and self._vigentes.get(clave) == ticket:
+            del self._vigentes[clave]
+
+        if error is not None:
+            if al_fallar:
+                al_fallar(error)
+            else:
+                traceback.print_exception(type(error), error, error.__traceback__, file=sys.stderr)
+        elif al_terminar:
+            al_terminar(resultado)
+
+        if not self._pendientes:
+            self.inactivo.emit()
+
+
+_ejecutor = None
+
+
+def obtener_ejecutor():
+    global _ejecutor
+    if _ejecutor is None:
+        _ejecutor = EjecutorConsultas()
+    return _ejecutor
@@ -1,19 +1,28 @@
 from conexion import obtener_conexion
+from cambios import obtener_monitor
+from sesion import sesiones
+from modelo_tabla import ModeloTabla, PestanaCatalogo, crear_vista
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QFormLayout,
-    QLineEdit, QPushButton, QTableWidget, QTableWidgetItem,
-    QMessageBox, QHeaderView, QComboBox
+    QLineEdit, QPushButton, QMessageBox, QComboBox
 )
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QIntValidator
 
-class VentanaEmpleados(QWidget):
-    def __init__(self, conexion):
+
+CONSULTA = "SELECT id_empleado, nombre, genero, puesto FROM empleado"
+
+class VentanaEmpleados(PestanaCatalogo, QWidget):
+    TABLA = "empleado"
+    CONSULTA = CONSULTA
+    LLAVE = "id_empleado"
+
+    def __init__(self):
         super().__init__()
-        self.conexion = conexion
         
         self.init_ui()
         self.cargar_datos()
+        obtener_monitor().cambiaron.connect(self.datos_cambiados)
 
     def init_ui(self):
         self.setWindowTitle("Gestión de Empleados")
@@ -45,8 +54,10 @@ class VentanaEmpleados(QWidget):
         self.boton_limpiar = QPushButton("🧹 Limpiar")
         self.boton_limpiar.setStyleSheet("background-color: #FFC107; color: black;")
         
+        self.filtro_input = QLineEdit()
+        self.filtro_input.setPlaceholderText("Filtrar la tabla")
+        
         # Tabla
-        self.tabla = QTableWidget()
         self.configurar_tabla()
         
         # Layouts
@@ -65,6 +76,7 @@ class VentanaEmpleados(QWidget):
         main_layout = QVBoxLayout()
         main_layout.addLayout(form_layout)
         main_layout.addLayout(button_layout)
+        main_layout.addWidget(self.filtro_input)
         main_layout.addWidget(self.tabla)
         
         self.setLayout(main_layout)
@@ -74,14 +86,17 @@ class VentanaEmpleados(QWidget):
         self.boton_actualizar.clicked.connect(self.actualizar)
         self.boton_eliminar.clicked.connect(self.eliminar)
         self.boton_limpiar.clicked.connect(self.limpiar_campos)
-        self.tabla.itemDoubleClicked.connect(self.cargar_datos_desde_tabla)
+        self.tabla.doubleClicked.connect(self.cargar_datos_desde_tabla)
+        self.filtro_input.textChanged.connect(self.modelo.filtrar)
 
     def configurar_tabla(self):
-        self.tabla.setColumnCount(4)
-        self.tabla.setHorizontalHeaderLabels(["ID", "Nombre", "Género", "Puesto"])
-        self.tabla.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        self.tabla.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.tabla.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.modelo = ModeloTabla(
+            ["ID", "Nombre", "Género", "Puesto"],
+            formatos={
+                2: lambda genero: "Masculino" if genero == "M" else "Femenino",
+                3: lambda puesto: puesto.capitalize()
+            })
+        self.tabla = crear_vista(self.modelo)
 
     def agregar(self):
         conexion = None
@@ -104,8 +119,9 @@ class VentanaEmpleados(QWidget):
                 (int(id_emp), nombre, genero, puesto))
             conexion.commit()
             
+            self.modelo.guardar((int(id_emp), nombre, genero, puesto))
+            
             QMessageBox.information(self, "Éxito", "Empleado agregado correctamente")
-            self.cargar_datos()
             self.limpiar_campos()
             
         except Exception as e:
@@ -138,9 +154,11 @@ class VentanaEmpleados(QWidget):
                 "UPDATE empleado SET nombre = %s, genero = %s, puesto = %s WHERE id_empleado = %s",
                 (nombre, genero, puesto, int(id_emp)))
             conexion.commit()
+            sesiones.invalidar(int(id_emp))
+            if cursor.rowcount:
+                self.modelo.guardar((int(id_emp), nombre, genero, puesto))
             
             QMessageBox.information(self, "Éxito", "Empleado actualizado correctamente")
-            self.cargar_datos()
             
         except Exception as e:
             if conexion:
@@ -176,9 +194,10 @@ class VentanaEmpleados(QWidget):
                 "DELETE FROM empleado WHERE id_empleado = %s",
                 (int(id_emp),))
             conexion.commit()
+            sesiones.invalidar(int(id_emp))
+            self.modelo.quitar(int(id_emp))
             
             QMessageBox.information(self, "Éxito", "Empleado eliminado correctamente")
-            self.cargar_datos()
             self.limpiar_campos()
             
         except Exception as e:
@@ -191,42 +210,16 @@ class VentanaEmpleados(QWidget):
             if conexion:
                 conexion.close()
 
-    def cargar_datos(self):
-        conexion = None
-        cursor = None
-        try:
-            self.tabla.setRowCount(0)
-            conexion = obtener_conexion()
-            cursor = conexion.cursor()
-            cursor.execute("SELECT id_empleado, nombre, genero, puesto FROM empleado ORDER BY id_empleado")
-            
-            for row_idx, (id_emp, nombre, genero, puesto) in enumerate(cursor.fetchall()):
-                self.tabla.insertRow(row_idx)
-                self.tabla.setItem(row_idx, 0, QTableWidgetItem(str(id_emp)))
-                self.tabla.setItem(row_idx, 1, QTableWidgetItem(nombre))
-                self.tabla.setItem(row_idx, 2, QTableWidgetItem("Masculino" if genero == "M" else "Femenino"))
-                self.tabla.setItem(row_idx, 3, QTableWidgetItem(puesto.capitalize()))
-                
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error al cargar datos:\n{e}")
-        finally:
-            if cursor:
-                cursor.close()
-            if conexion:
-                conexion.close()
-
-    def cargar_datos_desde_tabla(self, item):
-        row = item.row()
-        self.id_input.setText(self.tabla.item(row, 0).text())
-        self.nombre_input.setText(self.tabla.item(row, 1).text())
+    def cargar_datos_desde_tabla(self, indice):
+        id_emp, nombre, genero, puesto = self.modelo.fila(indice)
+        self.id_input.setText(str(id_emp))
+        self.nombre_input.setText(nombre)
         
-        genero = self.tabla.item(row, 2).text()
-        index = self.genero_combo.findText(genero)
+        index = self.genero_combo.findText("Masculino" if genero == "M" else "Femenino")
         if index >= 0:
             self.genero_combo.setCurrentIndex(index)
             
-        puesto = self.tabla.item(row, 3).text()
-        index = self.puesto_combo.findText(puesto)
+        index = self.puesto_combo.findText(puesto.capitalize())
         if index >= 0:
             self.puesto_combo.setCurrentIndex(index)
 
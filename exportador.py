@@ -0,0 +1,135 @@
+import argparse
+import csv
+import gzip
+import json
+import sys
+from mysql.connector import Error
+from conexion import obtener_conexion
+
+# Exportación de ventas con sus detalles y factura. Las filas se leen con un cursor sin
+# búfer en bloques de tamaño fijo y se escriben conforme llegan, así que la memoria
+# no crece con el número de filas.
+TAMANO_BLOQUE = 5000
+
+COLUMNAS = [
+    "id_venta", "fecha", "telefono", "cliente", "id_empleado", "empleado", "metodo_pago",
+    "importe", "codigo", "articulo", "cantidad", "precio", "subtotal", "rfc", "razon_social"
+]
+
+CONSULTA = """
+    SELECT v.id_venta, v.fecha, v.telefono, IFNULL(c.nombre, 'General'),
+           v.id_empleado, e.nombre, v.metodo_pago, v.importe,
+           dv.codigo, a.nombre, dv.cantidad, dv.precio, dv.cantidad * dv.precio,
+           f.rfc, f.razon_social
+    FROM venta v
+    JOIN detalles_venta dv ON dv.id_venta = v.id_venta
+    JOIN articulos a ON a.codigo = dv.codigo
+    JOIN empleado e ON e.id_empleado = v.id_empleado
+    LEFT JOIN clientes c ON c.telefono = v.telefono
+    LEFT JOIN facturas f ON f.id_venta = v.id_venta
+    WHERE {condiciones}
+    ORDER BY v.fecha, v.id_venta
+"""
+
+
+def filtros_ventas(desde, hasta, id_venta=None, telefono=None):
+    # Los mismos filtros que la pestaña Detalles Ventas
+    condiciones = ["v.fecha BETWEEN %s AND %s"]
+    parametros = [desde, hasta]
+    if id_venta:
+        condiciones.append("v.id_venta = %s")
+        parametros.append(int(id_venta))
+    if telefono:
+        condiciones.append("v.telefono = %s")
+        parametros.append(telefono)
+    return condiciones, parametros
+
+
+def formato_de(archivo):
+    nombre = archivo.lower()
+    if nombre.endswith(".gz"):
+        nombre = nombre[:-3]
+    return "jsonl" if nombre.endswith((".jsonl", ".json")) else "csv"
+
+
+def _abrir_salida(archivo, comprimir):
+    if comprimir:
+        return gzip.open(archivo, "wt", encoding="utf-8", newline="")
+    return open(archivo, "w", encoding="utf-8", newline="")
+
+
+def _valor_json(valor):
+    if valor is None or isinstance(valor, (str, int, float)):
+        return valor
+    return str(valor)  # Fechas y decimales
+
+
+def exportar_ventas(archivo, desde, hasta, id_venta=None, telefono=None, formato=None,
+                    comprimir=None, tamano_bloque=TAMANO_BLOQUE, al_avanzar=None):
+    formato = formato or formato_de(archivo)
+    comprimir = archivo.lower().endswith(".gz") if comprimir is None else comprimir
+    condiciones, parametros = filtros_ventas(desde, hasta, id_venta, telefono)
+
+    conexion = None
+    cursor = None
+    filas = 0
+    try:
+        conexion = obtener_conexion()
+        # Sin búfer: el servidor envía las filas conforme se piden con fetchmany
+        cursor = conexion.cursor(buffered=False)
+        cursor.execute(CONSULTA.format(condiciones=" AND ".join(condiciones)), parametros)
+
+        with _abrir_salida(archivo, comprimir) as salida:
+            if formato == "csv":
+                escritor = csv.writer(salida)
+                escritor.writerow(COLUMNAS)
+            while True:
+                bloque = cursor.fetchmany(tamano_bloque)
+                if not bloque:
+                    break
+                if formato == "csv":
+                    escritor.writerows(bloque)
+                else:
+                    for fila in bloque:
+                        salida.write(json.dumps(
+                            dict(zip(COLUMNAS, map(_valor_json, fila))), ensure_ascii=False))
+                        salida.write("\n")
+                filas += len(bloque)
+                if al_avanzar:
+                    al_avanzar(filas)
+        return filas
+    finally:
+        try:
+            if cursor:
+                cursor.close()
+        except Error:
+            # Se cortó a la mitad (error al escribir o cancelación) y quedaron filas sin
+            # leer: se descartan para devolver la conexión limpia sin tapar el error original
+            try:
+                conexion.consume_results()
+                cursor.close()
+            except Error:
+                pass
+        finally:
+            if conexion:
+                conexion.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporta ventas con sus detalles a CSV o JSON Lines")
+    parser.add_argument("archivo", help="archivo de salida (.csv, .jsonl; agregar .gz para comprimir)")
+    parser.add_argument("--desde", required=True, help="fecha inicial AAAA-MM-DD")
+    parser.add_argument("--hasta", required=True, help="fecha final AAAA-MM-DD")
+    parser.add_argument("--id-venta", help="solo esta venta")
+    parser.add_argument("--telefono", help="solo ventas de este cliente")
+    parser.add_argument("--formato", choices=["csv", "jsonl"], help="por defecto, según la extensión")
+    parser.add_argument("--gzip", action="store_true", help="comprimir aunque el nombre no termine en .gz")
+    argumentos = parser.parse_args()
+
+    total = exportar_ventas(
+        argumentos.archivo, argumentos.desde, argumentos.hasta,
+        argumentos.id_venta, argumentos.telefono, argumentos.formato,
+        True if argumentos.gzip else None,
+        al_avanzar=lambda filas: print(f"\r{filas} filas exportadas", end="", file=sys.stderr))
+    print(file=sys.stderr)
+    print(f"{total} filas exportadas a {argumentos.archivo}")
@@ -0,0 +1,219 @@
+import argparse
+import csv
+import sys
+from conexion import obtener_conexion, es_falla_de_conexion
+from catalogo import catalogo
+from indice import normalizar
+
+# Importación masiva de articulos desde CSV. El archivo se lee por lotes, así que la
+# memoria no depende de su tamaño; cada lote se guarda con un solo INSERT de varias filas.
+TAMANO_LOTE = 1000          # Filas por sentencia y por transacción
+ERRORES_EN_MEMORIA = 100    # Errores que se conservan para mostrarlos; el resto solo se cuenta
+
+OBLIGATORIAS = ["codigo", "nombre", "precio", "costo", "categoria", "proveedor", "unidad"]
+OPCIONALES = ["descripcion", "existencias", "reorden"]
+# Valores para columnas opcionales ausentes en el archivo (solo al dar de alta)
+VALORES_NUEVO = {"descripcion": None, "existencias": 0, "reorden": "0"}
+
+# Columna del CSV -> (tabla, llave, columna de articulos)
+REFERENCIAS = {
+    "categoria": ("categorias", "id_categorias", "id_categorias"),
+    "proveedor": ("proveedores", "id_proveedor", "id_proveedor"),
+    "unidad": ("unidad", "id_unidad", "id_unidad"),
+}
+
+
+class ErrorFila(Exception):
+    pass
+
+
+class ResultadoImportacion:
+    def __init__(self):
+        self.leidas = 0
+        self.guardadas = 0
+        self.con_error = 0
+        self.errores = []  # [(linea, codigo, mensaje), ...] hasta ERRORES_EN_MEMORIA
+
+    def agregar_error(self, linea, codigo, mensaje):
+        self.con_error += 1
+        if len(self.errores) < ERRORES_EN_MEMORIA:
+            self.errores.append((linea, codigo, mensaje))
+
+    def resumen(self):
+        texto = f"Filas leídas: {self.leidas}\nGuardadas: {self.guardadas}\nCon error: {self.con_error}"
+        for linea, codigo, mensaje in self.errores[:20]:
+            texto += f"\nLínea {linea} ({codigo}): {mensaje}"
+        if self.con_error > 20:
+            texto += f"\n... y {self.con_error - 20} errores más"
+        return texto
+
+
+def _normalizar(texto):
+    # Sin acentos ni espacios repetidos: "Lácteos " y "lacteos" son la misma categoría
+    return " ".join(normalizar(texto).split())
+
+
+def cargar_referencias(cursor):
+    # Las tablas de referencia son chicas: se cargan una vez por importación
+    # y se aceptan tanto el nombre como el ID numérico
+    referencias = {}
+    for columna, (tabla, llave, _) in REFERENCIAS.items():
+        cursor.execute(f"SELECT {llave}, nombre FROM {tabla}")
+        ids = {}
+        for id_referencia, nombre in cursor.fetchall():
+            ids[_normalizar(nombre)] = id_referencia
+            ids[str(id_referencia)] = id_referencia
+        referencias[columna] = ids
+    return referencias
+
+
+def _convertir(fila, columnas, referencias):
+    fila = fila + [""] * (len(columnas) - len(fila))
+    valores = dict(zip(columnas, fila))
+    codigo = (valores.get("codigo") or "").strip()
+    if not codigo or len(codigo) > 13:
+        raise ErrorFila("código vacío o de más de 13 caracteres")
+    nombre = (valores.get("nombre") or "").strip()
+    if not nombre:
+        raise ErrorFila("nombre vacío")
+
+    articulo = {"codigo": codigo, "nombre": nombre[:70]}
+    try:
+        articulo["precio"] = float(valores["precio"].replace("$", "").replace(",", ""))
+        articulo["costo"] = float(valores["costo"].replace("$", "").replace(",", ""))
+        if "existencias" in valores:
+            articulo["existencias"] = int(valores["existencias"] or 0)
+    except (TypeError, ValueError):
+        raise ErrorFila("precio, costo o existencias no numéricos")
+    if articulo["precio"] < 0 or articulo["costo"] < 0:
+        raise ErrorFila("precio o costo negativo")
+
+    if "descripcion" in valores:
+        articulo["descripcion"] = valores["descripcion"] or None
+    if "reorden" in valores:
+        articulo["reorden"] = (valores["reorden"] or "0").strip()[:45]
+
+    for columna, (_, _, destino) in REFERENCIAS.items():
+        texto = valores.get(columna) or ""
+        id_referencia = referencias[columna].get(_normalizar(texto))
+        if id_referencia is None:
+            raise ErrorFila(f"{columna} '{texto}' no existe")
+        articulo[destino] = id_referencia
+    return articulo
+
+
+def _sentencia(columnas_csv):
+    # Se actualizan solo las columnas que trae el archivo; las demás conservan su valor
+    destino = ["codigo", "nombre", "precio", "costo"]
+    destino += [columna for columna in OPCIONALES if columna in columnas_csv]
+    destino += [referencia[2] for referencia in REFERENCIAS.values()]
+    faltantes = [columna for columna in OPCIONALES if columna not in columnas_csv]
+
+    todas = destino + faltantes
+    sql = (
+        f"INSERT INTO articulos ({', '.join(todas)}) "
+        f"VALUES ({', '.join(['%s'] * len(todas))}) "
+        f"ON DUPLICATE KEY UPDATE "
+        + ", ".join(f"{columna} = VALUES({columna})" for columna in destino if columna != "codigo")
+    )
+    return sql, destino, faltantes
+
+
+def importar_articulos(archivo, delimitador=",", tamano_lote=TAMANO_LOTE, al_avanzar=None):
+    resultado = ResultadoImportacion()
+    conexion = None
+    cursor = None
+    try:
+        conexion = obtener_conexion()
+        cursor = conexion.cursor()
+        referencias = cargar_referencias(cursor)
+
+        with open(archivo, newline="", encoding="utf-8-sig") as entrada:
+            lector = csv.reader(entrada, delimiter=delimitador)
+            encabezado = next(lector, None)
+            if not encabezado:
+                raise ValueError("El archivo está vacío")
+            columnas = [_normalizar(columna) for columna in encabezado]
+            ausentes = [columna for columna in OBLIGATORIAS if columna not in columnas]
+            if ausentes:
+                raise ValueError(f"Faltan columnas en el encabezado: {', '.join(ausentes)}")
+
+            sql, destino, faltantes = _sentencia(columnas)
+            lote = []  # [(linea, valores), ...]
+            for fila in lector:
+                if not any(campo.strip() for campo in fila):
+                    continue
+                resultado.leidas += 1
+                linea = lector.line_num
+                try:
+                    articulo = _convertir(fila, columnas, referencias)
+                except ErrorFila as e:
+                    resultado.agregar_error(linea, fila[0] if fila else "", str(e))
+                    continue
+                valores = tuple(articulo[columna] for columna in destino)
+                valores += tuple(VALORES_NUEVO[columna] for columna in faltantes)
+                lote.append((linea, valores))
+
+                if len(lote) >= tamano_lote:
+                    _guardar_lote(conexion, cursor, sql, lote, resultado)
+                    lote = []
+                    if al_avanzar:
+                        al_avanzar(resultado)
+
+            if lote:
+                _guardar_lote(conexion, cursor, sql, lote, resultado)
+                if al_avanzar:
+                    al_avanzar(resultado)
+
+        # Precios y nombres cambiaron: el catálogo de la caja se recarga completo
+        catalogo.invalidar()
+        return resultado
+
+    except Exception:
+        if conexion:
+            conexion.rollback()
+        raise
+    finally:
+        if cursor:
+            cursor.close()
+        if conexion:
+            conexion.close()
+
+
+def _guardar_lote(conexion, cursor, sql, lote, resultado):
+    try:
+        # executemany convierte el INSERT en una sola sentencia de varias filas
+        cursor.executemany(sql, [valores for _, valores in lote])
+        conexion.commit()
+        resultado.guardadas += len(lote)
+        return
+    except Exception:
+        conexion.rollback()
+
+    # Alguna fila falló (p. ej. un dato que MySQL rechaza): se repite fila por fila
+    # para guardar las válidas y reportar solo las que fallan
+    for linea, valores in lote:
+        try:
+            cursor.execute(sql, valores)
+            resultado.guardadas += 1
+        except Exception as e:
+            if es_falla_de_conexion(e):
+                raise
+            resultado.agregar_error(linea, valores[0], str(e))
+    conexion.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Importa o actualiza artículos desde un archivo CSV")
+    parser.add_argument("archivo", help="CSV con encabezado: " + ", ".join(OBLIGATORIAS + OPCIONALES))
+    parser.add_argument("--delimitador", default=",", help="separador de columnas (por defecto ',')")
+    parser.add_argument("--lote", type=int, default=TAMANO_LOTE, help="filas por transacción")
+    argumentos = parser.parse_args()
+
+    resultado = importar_articulos(
+        argumentos.archivo, argumentos.delimitador, argumentos.lote,
+        al_avanzar=lambda r: print(f"\r{r.leidas} filas leídas, {r.guardadas} guardadas, "
+                                   f"{r.con_error} con error", end="", file=sys.stderr))
+    print(file=sys.stderr)
+    print(resultado.resumen())
+    sys.exit(1 if resultado.con_error else 0)
@@ -0,0 +1,242 @@
+import bisect
+import heapq
+import re
+import threading
+from array import array
+from collections import defaultdict
+from itertools import islice
+import unicodedata
+
+LIMITE_RESULTADOS = 50  # Resultados máximos por búsqueda
+
+
+_ACENTOS = re.compile("[\u0300-\u036f]")  # Marcas combinables del español y demás latinos
+
+
+def normalizar(texto):
+    # Minúsculas y sin acentos, para que "cafe" encuentre "Café"
+    texto = str(texto).lower()
+    if texto.isascii():
+        return texto
+    texto = _ACENTOS.sub("", unicodedata.normalize("NFKD", texto))
+    if texto.isascii():
+        return texto
+    # Quedan otros caracteres: se revisa uno por uno
+    return "".join(c for c in texto if not unicodedata.combining(c))
+
+
+def trigramas(texto):
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+class IndiceTexto:
+    # Índice en memoria para búsqueda incremental:
+    #  - lista ordenada de (texto, clave) para buscar por prefijo con bisect
+    #  - trigramas -> claves para buscar por subcadena sin recorrer todo
+    # Cada clave tiene un texto principal (prefijo y subcadena) y textos extra que
+    # solo se buscan por prefijo, como el código de barras.
+    def __init__(self):
+        self._textos = {}      # clave -> [texto principal, extras...] normalizados
+        self._ordenados = []   # [(texto, clave), ...] ordenada
+        self._trigramas = {}   # trigrama -> {claves}
+        self._candado = threading.RLock()
+
+    def __len__(self):
+        return len(self._textos)
+
+    def construir(self, entradas):
+        # entradas: [(clave, texto, (extra, ...)), ...]; reemplaza todo el contenido
+        textos = {}
+        ordenados = []
+        indice_trigramas = defaultdict(set)
+        for clave, texto, extras in entradas:
+            normalizados = [normalizar(valor) for valor in (texto, *extras)]
+            textos[clave] = normalizados
+            ordenados.extend((valor, clave) for valor in normalizados if valor)
+            for trigrama in trigramas(normalizados[0]):
+                indice_trigramas[trigrama].add(clave)
+        ordenados.sort()
+
+        with self._candado:
+            self._textos = textos
+            self._ordenados = ordenados
+            self._trigramas = dict(indice_trigramas)
+
+    def agregar(self, clave, texto, *extras):
+        with self._candado:
+            self.quitar(clave)
+            normalizados = [normalizar(valor) for valor in (texto, *extras)]
+            self._textos[clave] = normalizados
+            for valor in normalizados:
+                if valor:
+                    bisect.insort(self._ordenados, (valor, clave))
+            for trigrama in trigramas(normalizados[0]):
+                self._trigramas.setdefault(trigrama, set()).add(clave)
+
+    def quitar(self, clave):
+        with self._candado:
+            normalizados = self._textos.pop(clave, None)
+            if not normalizados:
+                return
+            for valor in normalizados:
+                posicion = bisect.bisect_left(self._ordenados, (valor, clave))
+                if posicion < len(self._ordenados) and self._ordenados[posicion] == (valor, clave):
+                    del self._ordenados[posicion]
+            for trigrama in trigramas(normalizados[0]):
+                claves = self._trigramas.get(trigrama)
+                if claves:
+                    claves.discard(clave)
+                    if not claves:
+                        del self._trigramas[trigrama]
+
+    def buscar(self, consulta, limite=LIMITE_RESULTADOS):
+        # Primero las coincidencias por prefijo (en orden alfabético) y después
+        # las de subcadena en el texto principal, ordenadas por dónde aparece la consulta
+        consulta = normalizar(consulta).strip()
+        with self._candado:
+            if not consulta:
+                return self._por_prefijo("", limite)
+
+            resultados = self._por_prefijo(consulta, limite)
+            if len(resultados) >= limite or len(consulta) < 3:
+                return resultados
+
+            vistas = set(resultados)
+            candidatos = []
+            for clave in self._por_trigramas(consulta):
+                if clave in vistas:
+                    continue
+                texto = self._textos[clave][0]
+                posicion = texto.find(consulta)
+                if posicion >= 0:
+                    candidatos.append((posicion, texto, clave))
+
+        mejores = heapq.nsmallest(limite - len(resultados), candidatos)
+        return resultados + [clave for _, _, clave in mejores]
+
+    def _por_prefijo(self, consulta, limite):
+        posicion = bisect.bisect_left(self._ordenados, (consulta,))
+        claves = []
+        vistas = set()
+        while posicion < len(self._ordenados) and len(claves) < limite:
+            texto, clave = self._ordenados[posicion]
+            if not texto.startswith(consulta):
+                break
+            if clave not in vistas:
+                vistas.add(clave)
+                claves.append(clave)
+            posicion += 1
+        return claves
+
+    def _por_trigramas(self, consulta):
+        # Se intersectan de la más chica a la más grande para descartar pronto
+        conjuntos = [self._trigramas.get(t) for t in trigramas(consulta)]
+        if not all(conjuntos):
+            return set()
+        conjuntos.sort(key=len)
+        resultado = set(conjuntos[0])
+        for conjunto in conjuntos[1:]:
+            resultado &= conjunto
+            if not resultado:
+                break
+        return resultado
+
+
+
+
+class IndiceCompacto:
+    # Variante de IndiceTexto para colecciones grandes que cambian poco, como el
+    # directorio de clientes. Los textos se ordenan y se unen en un solo bloque
+    # ("\n texto1\n texto2\n...", campos separados por espacios) donde str.find
+    # recorre cientos de miles de claves en C; construirlo cuesta un sort y un join,
+    # sin las decenas de millones de entradas de un índice de trigramas.
+    # Todos los campos se buscan por prefijo y por subcadena. Las bajas solo vacían
+    # la posición y las altas quedan aparte hasta la siguiente construcción.
+    def __init__(self):
+        self._bloque = "\n"
+        self._inicios = array("I", [1])  # posición -> inicio de su texto; al final uno de más
+        self._claves = []       # posición -> clave, None si se quitó
+        self._posiciones = {}   # clave -> posición en el bloque
+        self._agregadas = {}    # clave -> texto, altas y cambios desde la construcción
+        self._candado = threading.RLock()
+
+    def __len__(self):
+        return len(self._posiciones) + len(self._agregadas)
+
+    def construir(self, entradas):
+        # entradas: [(clave, (campo, ...)), ...]; reemplaza todo el contenido
+        ordenadas = sorted((self._unir(campos), clave) for clave, campos in entradas)
+        claves = [clave for _, clave in ordenadas]
+        textos = [texto for texto, _ in ordenadas]
+        del ordenadas
+        # Cada texto empieza con un espacio: " " + consulta encuentra el inicio de
+        # cualquier campo o palabra con una sola búsqueda
+        inicios = array("I", [1])
+        for texto in textos:
+            inicios.append(inicios[-1] + len(texto) + 2)
+        bloque = "\n " + "\n ".join(textos) + "\n"
+        del textos
+
+        with self._candado:
+            self._bloque = bloque
+            self._inicios = inicios
+            self._claves = claves
+            self._posiciones = {clave: posicion for posicion, clave in enumerate(claves)}
+            self._agregadas = {}
+
+    def agregar(self, clave, *campos):
+        texto = self._unir(campos)
+        with self._candado:
+            self.quitar(clave)
+            self._agregadas[clave] = texto
+
+    def quitar(self, clave):
+        with self._candado:
+            self._agregadas.pop(clave, None)
+            posicion = self._posiciones.pop(clave, None)
+            if posicion is not None:
+                self._claves[posicion] = None
+
+    def buscar(self, consulta, limite=LIMITE_RESULTADOS):
+        # Primero lo que tiene la consulta al inicio de un campo o de una palabra y después
+        # el resto, cada grupo en orden alfabético. Cada recorrido se detiene al juntar
+        # el límite; solo una consulta con pocas coincidencias recorre todo el bloque.
+        consulta = normalizar(consulta).strip()
+        with self._candado:
+            al_inicio = list(islice(self._coincidencias(" " + consulta), limite))
+            encontradas = [(0, self._texto(posicion), self._claves[posicion])
+                           for posicion in al_inicio]
+            if consulta and len(al_inicio) < limite:
+                vistas = set(al_inicio)
+                resto = (posicion for posicion in self._coincidencias(consulta)
+                         if posicion not in vistas)
+                encontradas.extend((1, self._texto(posicion), self._claves[posicion])
+                                   for posicion in islice(resto, limite - len(al_inicio)))
+
+            for clave, texto in self._agregadas.items():
+                grupo = self._grupo(" " + texto, consulta)
+                if grupo is not None:
+                    encontradas.append((grupo, texto, clave))
+        return [clave for _, _, clave in heapq.nsmallest(limite, encontradas)]
+
+    def _unir(self, campos):
+        return " ".join(normalizar(campo).replace("\n", " ") for campo in campos if campo)
+
+    def _texto(self, posicion):
+        return self._bloque[self._inicios[posicion] + 1:self._inicios[posicion + 1] - 1]
+
+    def _coincidencias(self, patron):
+        # Posiciones vigentes que contienen el patrón, en orden y sin repetir
+        inicio = self._bloque.find(patron)
+        while inicio >= 0:
+            posicion = bisect.bisect_right(self._inicios, inicio) - 1
+            if self._claves[posicion] is not None:
+                yield posicion
+            inicio = self._bloque.find(patron, self._inicios[posicion + 1])
+
+    def _grupo(self, texto, consulta):
+        if " " + consulta in texto:
+            return 0
+        if consulta in texto:
+            return 1
+        return None
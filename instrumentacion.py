@@ -0,0 +1,247 @@
+import atexit
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from logging.handlers import RotatingFileHandler
+
+# Registro de cada sentencia SQL: huella, quién la lanzó, duración, filas y espera por
+# la conexión. Se activa con POS_INSTRUMENTAR=1; apagado, conexion.py entrega los
+# cursores sin envolver y el costo es una comparación por cursor.
+ACTIVA = os.environ.get("POS_INSTRUMENTAR") == "1"
+UMBRAL_LENTA_MS = float(os.environ.get("POS_CONSULTA_LENTA_MS", "200"))
+CARPETA = os.path.dirname(os.path.abspath(__file__))
+ARCHIVO_LENTAS = os.path.join(CARPETA, "consultas_lentas.log")
+ARCHIVO_RESUMEN = os.path.join(CARPETA, "consultas_resumen.json")
+TAMANO_LOG = 1024 * 1024    # Bytes por archivo del log de consultas lentas
+ARCHIVOS_LOG = 5            # Archivos anteriores que se conservan al rotar
+MUESTRAS = 500              # Duraciones recientes por huella para calcular percentiles
+
+# Módulos que no cuentan como "quien lanzó la consulta"
+MODULOS_INTERNOS = ("conexion", "instrumentacion", "ejecutor", "repositorio", "threading")
+
+_RE_CADENAS = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"")
+_RE_NUMEROS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_RE_LISTAS = re.compile(r"\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))+\s*\)")
+_RE_ESPACIOS = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def huella(sql):
+    # Misma huella para la misma consulta con distintos valores: literales -> ?,
+    # listas IN (%s, %s, ...) -> (...)
+    if isinstance(sql, bytes):
+        sql = sql.decode("utf-8", "replace")
+    texto = _RE_CADENAS.sub("?", sql)
+    texto = _RE_NUMEROS.sub("?", texto)
+    texto = _RE_LISTAS.sub("(...)", texto)
+    return _RE_ESPACIOS.sub(" ", texto).strip()
+
+
+_contexto = threading.local()
+
+
+def manejador_actual():
+    # Primer marco de la pila fuera de la capa de conexión, p. ej. VentanaVenta.procesar_pago
+    marco = sys._getframe(1)
+    while marco is not None:
+        modulo = marco.f_globals.get("__name__", "")
+        if not (modulo in MODULOS_INTERNOS or modulo.startswith("mysql")):
+            instancia = marco.f_locals.get("self")
+            if instancia is not None:
+                return f"{type(instancia).__name__}.{marco.f_code.co_name}"
+            return f"{modulo}.{marco.f_code.co_name}"
+        marco = marco.f_back
+    return None
+
+
+def establecer_origen(origen):
+    # El ejecutor indica en el hilo de trabajo quién pidió la consulta
+    _contexto.origen = origen
+
+
+def _manejador():
+    origen = getattr(_contexto, "origen", None)
+    propio = manejador_actual()
+    if origen and propio:
+        return f"{origen} > {propio}"
+    return origen or propio or "?"
+
+
+class _Acumulado:
+    __slots__ = ("llamadas", "total", "maximo", "filas", "espera", "lentas", "duraciones")
+
+    def __init__(self):
+        self.llamadas = 0
+        self.total = 0.0
+        self.maximo = 0.0
+        self.filas = 0
+        self.espera = 0.0
+        self.lentas = 0
+        self.duraciones = deque(maxlen=MUESTRAS)
+
+
+class Registro:
+    def __init__(self):
+        self._candado = threading.Lock()
+        self._datos = {}  # (manejador, huella) -> _Acumulado
+        self._log = None
+
+    def agregar(self, manejador, texto, duracion, filas, espera):
+        lenta = duracion * 1000 >= UMBRAL_LENTA_MS
+        with self._candado:
+            acumulado = self._datos.get((manejador, texto))
+            if acumulado is None:
+                acumulado = self._datos[(manejador, texto)] = _Acumulado()
+            acumulado.llamadas += 1
+            acumulado.total += duracion
+            acumulado.maximo = max(acumulado.maximo, duracion)
+            acumulado.filas += max(filas, 0)
+            acumulado.espera += espera
+            acumulado.duraciones.append(duracion)
+            if lenta:
+                acumulado.lentas += 1
+        if lenta:
+            self._registrar_lenta(manejador, texto, duracion, filas, espera)
+
+    def _registrar_lenta(self, manejador, texto, duracion, filas, espera):
+        if self._log is None:
+            log = logging.getLogger("pos.consultas_lentas")
+            log.propagate = False
+            if not log.handlers:
+                manejador_log = RotatingFileHandler(
+                    ARCHIVO_LENTAS, maxBytes=TAMANO_LOG, backupCount=ARCHIVOS_LOG, encoding="utf-8")
+                manejador_log.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+                log.addHandler(manejador_log)
+                log.setLevel(logging.INFO)
+            self._log = log
+        self._log.info(
+            f"{duracion * 1000:.1f} ms | espera {espera * 1000:.1f} ms | {filas} filas | "
+            f"{manejador} | {texto}")
+
+    def resumen(self):
+        # [(manejador, huella, datos), ...] de mayor a menor tiempo total
+        with self._candado:
+            copia = [(clave, acumulado, sorted(acumulado.duraciones))
+                     for clave, acumulado in self._datos.items()]
+        filas = []
+        for (manejador, texto), acumulado, ordenadas in copia:
+            filas.append((manejador, texto, {
+                "llamadas": acumulado.llamadas,
+                "total_ms": round(acumulado.total * 1000, 1),
+                "promedio_ms": round(acumulado.total / acumulado.llamadas * 1000, 2),
+                "p95_ms": round(ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * 0.95))] * 1000, 2),
+                "maximo_ms": round(acumulado.maximo * 1000, 2),
+                "filas": acumulado.filas,
+                "espera_ms": round(acumulado.espera * 1000, 1),
+                "lentas": acumulado.lentas
+            }))
+        filas.sort(key=lambda fila: fila[2]["total_ms"], reverse=True)
+        return filas
+
+    def reiniciar(self):
+        with self._candado:
+            self._datos = {}
+
+    def volcar(self, archivo=ARCHIVO_RESUMEN):
+        filas = self.resumen()
+        if not filas:
+            return
+        with open(archivo, "w", encoding="utf-8") as salida:
+            json.dump([dict(datos, manejador=manejador, huella=texto) for manejador, texto, datos in filas],
+                      salida, indent=2, ensure_ascii=False)
+        print(f"[consultas] {len(filas)} consultas distintas; resumen en {archivo}", file=sys.stderr)
+        for manejador, texto, datos in filas[:10]:
+            print(f"[consultas] {datos['total_ms']:10.1f} ms {datos['llamadas']:6} x  "
+                  f"{manejador}  {texto[:80]}", file=sys.stderr)
+
+
+registro = Registro()
+
+
+class CursorInstrumentado:
+    # Mide desde execute hasta la última lectura de filas: con cursores sin búfer la
+    # mayor parte del tiempo se va en los fetch
+    def __init__(self, cursor, conexion):
+        self._cursor = cursor
+        self._conexion = conexion
+        self._actual = None  # [manejador, huella, duracion, filas, espera]
+
+    def __getattr__(self, nombre):
+        return getattr(self._cursor, nombre)
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def _medir(self, metodo, *args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return metodo(*args, **kwargs)
+        finally:
+            if self._actual is not None:
+                self._actual[2] += time.perf_counter() - inicio
+
+    def _iniciar(self, sql):
+        self.terminar()
+        # La espera por la conexión se atribuye a la primera sentencia que la usa
+        espera = getattr(self._conexion, "espera", 0.0) or 0.0
+        self._conexion.espera = 0.0
+        self._actual = [_manejador(), huella(sql), 0.0, 0, espera]
+
+    def terminar(self):
+        # Registra la sentencia en curso. close() lo hace solo; los cursores preparados
+        # no se cierran, así que quien los usa lo llama tras leer las filas
+        if self._actual is None:
+            return
+        manejador, texto, duracion, filas, espera = self._actual
+        self._actual = None
+        try:
+            filas = max(filas, self._cursor.rowcount)
+        except Exception:
+            pass
+        registro.agregar(manejador, texto, duracion, filas, espera)
+
+    def execute(self, operacion, parametros=None, *args, **kwargs):
+        self._iniciar(operacion)
+        return self._medir(self._cursor.execute, operacion, parametros, *args, **kwargs)
+
+    def executemany(self, operacion, secuencia, *args, **kwargs):
+        self._iniciar(operacion)
+        return self._medir(self._cursor.executemany, operacion, secuencia, *args, **kwargs)
+
+    def fetchone(self):
+        fila = self._medir(self._cursor.fetchone)
+        if fila is not None and self._actual is not None:
+            self._actual[3] += 1
+        return fila
+
+    def fetchmany(self, *args, **kwargs):
+        filas = self._medir(self._cursor.fetchmany, *args, **kwargs)
+        if self._actual is not None:
+            self._actual[3] += len(filas)
+        return filas
+
+    def fetchall(self):
+        filas = self._medir(self._cursor.fetchall)
+        if self._actual is not None:
+            self._actual[3] += len(filas)
+        return filas
+
+    def close(self):
+        self.terminar()
+        return self._cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        self.close()
+
+
+if ACTIVA:
+    atexit.register(registro.volcar)
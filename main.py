@@ -1,7 +1,19 @@
+import time
+_inicio_imports = time.perf_counter()
+
 import sys
-from conexion import obtener_conexion
+import traceback
+from conexion import obtener_conexion, obtener_pool, cerrar_pool, es_falla_de_conexion
+from ejecutor import obtener_ejecutor
+from bitacora import bitacora
+from cambios import obtener_monitor
+from catalogo import catalogo, REVISAR_CADA as REVISAR_CATALOGO_CADA
+from directorio import directorio
+from referencias import referencias, TABLAS as TABLAS_REFERENCIA
+from sesion import sesiones
 from PyQt6.QtWidgets import QApplication, QTabWidget, QWidget, QVBoxLayout
-from PyQt6.QtGui import QIcon
+from PyQt6.QtGui import QIcon, QKeySequence, QShortcut
+from PyQt6.QtCore import Qt, QTimer
 from empleado import VentanaEmpleados  
 from categoria import Ventanacatego
 from cliente import VentanaClientes
@@ -10,6 +22,24 @@ from unidad import VentanaUnidad
 from articulo import VentanaArticulos
 from venta import VentanaVenta
 from detalles_venta import VentanaDetallesVenta
+from compra import VentanaCompras
+from diagnostico import DiagnosticoDialog
+
+TIEMPO_IMPORTS = time.perf_counter() - _inicio_imports
+
+# Las pestañas se construyen la primera vez que se activan
+PESTANAS = [
+    (VentanaEmpleados, "👨‍💼 Empleados"),
+    (Ventanacatego, "📁 Categorías"),
+    (VentanaClientes, "👥 Clientes"),
+    (VentanaProveedores, "🏭 Proveedores"),
+    (VentanaUnidad, "📏 Unidades"),
+    (VentanaArticulos, "🛒 Artículos"),
+    (VentanaVenta, "💰 Ventas"),
+    (VentanaDetallesVenta, "📋 Detalles Ventas"),
+    (VentanaCompras, "📦 Compras"),
+]
+PESTANA_INICIAL = 6  # Ventas
 
 class VentanaPrincipal(QWidget):
     def __init__(self):
@@ -18,11 +48,42 @@ class VentanaPrincipal(QWidget):
         self.setWindowIcon(QIcon('icon.png'))
         self.resize(1100, 650)
         
+        self.mostrar_tiempos = "--tiempos" in sys.argv
+        self.tiempos = [("imports", TIEMPO_IMPORTS, None)]
+        
+        inicio = time.perf_counter()
         try:
-            self.conexion = obtener_conexion()
+            # Solo comprueba que MySQL responde; cada consulta pide su propia conexión al pool
+            obtener_conexion().close()
         except Exception as e:
             self.mostrar_error(f"No se pudo conectar a la base de datos:\n{str(e)}")
             sys.exit(1)
+        self.tiempos.append(("conexión", time.perf_counter() - inicio, None))
+        
+        # El resto de las conexiones del pool se abren sin detener el arranque
+        obtener_ejecutor().ejecutar(obtener_pool().precalentar)
+        
+        # Envía en segundo plano las ventas que quedaron en la bitácora local
+        bitacora.iniciar()
+        
+        # El catálogo se carga y se mantiene al día en segundo plano; los escaneos solo leen memoria
+        self.temporizador_catalogo = QTimer(self)
+        self.temporizador_catalogo.timeout.connect(self.mantener_catalogo)
+        self.temporizador_catalogo.start(REVISAR_CATALOGO_CADA * 1000)
+        self.mantener_catalogo()
+        
+        # Cambios hechos en otras pestañas o terminales: los cachés releen solo esas filas
+        monitor = obtener_monitor()
+        monitor.suscribir("articulos", catalogo.aplicar_cambios)
+        monitor.suscribir("clientes", directorio.aplicar_cambios)
+        for tabla in TABLAS_REFERENCIA:
+            monitor.suscribir(tabla, lambda llaves, tabla=tabla: referencias.invalidar(tabla))
+        monitor.cambiaron.connect(self.datos_cambiados)
+        monitor.iniciar()
+        
+        # Consultas registradas por la instrumentación y estado del pool
+        self.atajo_diagnostico = QShortcut(QKeySequence("Ctrl+Shift+D"), self)
+        self.atajo_diagnostico.activated.connect(lambda: DiagnosticoDialog(self).exec())
 
         self.tabs = QTabWidget()
         self.tabs.setStyleSheet("""
@@ -37,20 +98,74 @@ class VentanaPrincipal(QWidget):
             }
         """)
         
-        self.tabs.addTab(VentanaEmpleados(self.conexion), "👨‍💼 Empleados")
-        self.tabs.addTab(Ventanacatego(self.conexion), "📁 Categorías")
-        self.tabs.addTab(VentanaClientes(self.conexion), "👥 Clientes")
-        self.tabs.addTab(VentanaProveedores(self.conexion), "🏭 Proveedores")
-        self.tabs.addTab(VentanaUnidad(self.conexion), "📏 Unidades")
-        self.tabs.addTab(VentanaArticulos(self.conexion), "🛒 Artículos")
-        self.tabs.addTab(VentanaVenta(self.conexion), "💰 Ventas")
-        self.tabs.addTab(VentanaDetallesVenta(self.conexion), "📋 Detalles Ventas")
+        self.pestanas = {}
+        for clase, titulo in PESTANAS:
+            contenedor = QWidget()
+            contenedor.setLayout(QVBoxLayout())
+            contenedor.layout().setContentsMargins(0, 0, 0, 0)
+            self.tabs.addTab(contenedor, titulo)
+        
+        self.tabs.currentChanged.connect(self.construir_pestana)
+        self.tabs.setCurrentIndex(PESTANA_INICIAL)
+        self.construir_pestana(PESTANA_INICIAL)
 
         layout = QVBoxLayout()
         layout.setContentsMargins(5, 5, 5, 5)
         layout.addWidget(self.tabs)
         self.setLayout(layout)
 
+    def construir_pestana(self, indice):
+        if indice < 0 or indice in self.pestanas:
+            return
+            
+        clase, titulo = PESTANAS[indice]
+        inicio = time.perf_counter()
+        pestana = clase()
+        self.tabs.widget(indice).layout().addWidget(pestana)
+        self.pestanas[indice] = pestana
+        construccion = time.perf_counter() - inicio
+        
+        # Las cargas de datos ya van en segundo plano; se mide hasta que terminan
+        ejecutor = obtener_ejecutor()
+        if ejecutor.pendientes():
+            ejecutor.inactivo.connect(
+                lambda: self.registrar_tiempo(titulo, construccion, time.perf_counter() - inicio),
+                type=Qt.ConnectionType.SingleShotConnection)
+        else:
+            self.registrar_tiempo(titulo, construccion, None)
+
+    def mantener_catalogo(self):
+        obtener_ejecutor().ejecutar(
+            catalogo.mantener, clave=(id(self), "catalogo"), al_fallar=self.catalogo_fallido)
+
+    def catalogo_fallido(self, error):
+        # Sin conexión se reintenta en el siguiente turno; mientras, se vende con lo que hay en memoria
+        if not es_falla_de_conexion(error):
+            traceback.print_exception(type(error), error, error.__traceback__, file=sys.stderr)
+
+    def datos_cambiados(self, tabla, llaves):
+        # Un empleado editado o eliminado se vuelve a verificar en su siguiente venta
+        if tabla != "empleado":
+            return
+        if llaves is None:
+            sesiones.invalidar()
+            return
+        for id_empleado in llaves:
+            sesiones.invalidar(id_empleado)
+
+    def registrar_tiempo(self, nombre, segundos, total):
+        self.tiempos.append((nombre, segundos, total))
+        if self.mostrar_tiempos:
+            self.imprimir_tiempos()
+
+    def imprimir_tiempos(self):
+        for nombre, segundos, total in self.tiempos:
+            linea = f"[tiempos] {nombre:<20} {segundos * 1000:8.1f} ms"
+            if total is not None:
+                linea += f"  (con datos: {total * 1000:.1f} ms)"
+            print(linea, file=sys.stderr)
+        self.tiempos = []
+
     def mostrar_error(self, mensaje):
         from PyQt6.QtWidgets import QMessageBox
         msg = QMessageBox()
@@ -62,6 +177,9 @@ class VentanaPrincipal(QWidget):
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     app.setStyle('Fusion')
+    app.aboutToQuit.connect(bitacora.detener)
+    app.aboutToQuit.connect(lambda: obtener_monitor().detener())
+    app.aboutToQuit.connect(cerrar_pool)
     ventana = VentanaPrincipal()
     ventana.show()
     sys.exit(app.exec())
\ No newline at end of file
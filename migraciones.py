@@ -0,0 +1,328 @@
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+from conexion import CONFIGURACION, configurar_pool, cerrar_pool, obtener_conexion
+
+# Actualiza en su lugar una base de datos creada con una versión anterior de db23270637.sql.
+# Cada migración tiene un número de versión y se anota en migraciones_aplicadas al terminar,
+# así que se aplica una sola vez y en orden. MySQL confirma solo cada ALTER y CREATE, así que
+# los pasos revisan antes si ya están hechos: una migración interrumpida se puede repetir, y
+# en una base creada con el script actual todas se anotan sin cambiar nada.
+ARCHIVO_ESQUEMA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "db23270637.sql")
+CANDADO = "migraciones_bodega"  # GET_LOCK: dos cajas que actualizan a la vez no se pisan
+ESPERA_CANDADO = 60
+MINIMO_FILAS = 1000  # Una tabla más chica que esto se lee completa más rápido que por índice
+
+CREAR_REGISTRO = """
+    CREATE TABLE IF NOT EXISTS `migraciones_aplicadas` (
+      `version` INT NOT NULL,
+      `nombre` VARCHAR(100) NOT NULL,
+      `aplicada` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+      `segundos` FLOAT NOT NULL DEFAULT 0,
+      PRIMARY KEY (`version`)
+    ) ENGINE=InnoDB
+"""
+
+
+def sentencias_sql(texto):
+    # Separa un script como lo haría el cliente mysql, respetando DELIMITER (triggers)
+    delimitador = ";"
+    sentencias = []
+    actual = []
+    for linea in texto.splitlines():
+        limpia = linea.strip()
+        if limpia.startswith("--"):
+            continue
+        if limpia.upper().startswith("DELIMITER "):
+            delimitador = limpia.split()[1]
+            continue
+        actual.append(linea)
+        if limpia.endswith(delimitador):
+            sentencia = "\n".join(actual).strip()[:-len(delimitador)]
+            if sentencia.strip():
+                sentencias.append(sentencia)
+            actual = []
+    if "\n".join(actual).strip():
+        sentencias.append("\n".join(actual))
+    return sentencias
+
+
+def seccion_esquema(titulo):
+    # Las sentencias de una sección de db23270637.sql ("-- Tabla cambios (nueva)" hasta la
+    # siguiente línea en blanco), para no repetir aquí las tablas y triggers completos
+    with open(ARCHIVO_ESQUEMA, encoding="utf-8") as archivo:
+        lineas = archivo.read().splitlines()
+    encabezado = f"-- {titulo} ("
+    for numero, linea in enumerate(lineas):
+        if linea.startswith(encabezado):
+            fin = numero + 1
+            while fin < len(lineas) and lineas[fin].strip():
+                fin += 1
+            return sentencias_sql("\n".join(lineas[numero:fin]))
+    raise ValueError(f"db23270637.sql no tiene la sección '{titulo}'")
+
+
+def _tabla_existe(cursor, tabla):
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s",
+        (tabla,))
+    return cursor.fetchone()[0] > 0
+
+
+def _columna_existe(cursor, tabla, columna):
+    cursor.execute(
+        """SELECT COUNT(*) FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s""",
+        (tabla, columna))
+    return cursor.fetchone()[0] > 0
+
+
+def _indice_existe(cursor, tabla, indice):
+    cursor.execute(
+        """SELECT COUNT(*) FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s""",
+        (tabla, indice))
+    return cursor.fetchone()[0] > 0
+
+
+def _agregar_columna(cursor, tabla, columna, definicion):
+    if not _columna_existe(cursor, tabla, columna):
+        cursor.execute(f"ALTER TABLE `{tabla}` ADD COLUMN `{columna}` {definicion}")
+
+
+def _agregar_indices(cursor, tabla, indices):
+    # indices: [(nombre, columnas), ...]; los que faltan se crean en un solo ALTER,
+    # que recorre la tabla una vez. InnoDB los crea sin bloquear las escrituras.
+    faltantes = [(nombre, columnas) for nombre, columnas in indices
+                 if not _indice_existe(cursor, tabla, nombre)]
+    if faltantes:
+        cursor.execute(f"ALTER TABLE `{tabla}` " + ", ".join(
+            f"ADD INDEX `{nombre}` ({columnas})" for nombre, columnas in faltantes))
+
+
+def _ejecutar_secciones(cursor, *titulos):
+    for titulo in titulos:
+        for sentencia in seccion_esquema(titulo):
+            cursor.execute(sentencia)
+
+
+def _articulos_actualizado(cursor):
+    # El caché del catálogo relee solo los artículos modificados
+    _agregar_columna(cursor, "articulos", "actualizado",
+                     "TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP")
+    _agregar_indices(cursor, "articulos", [("articulos_actualizado_idx", "`actualizado`")])
+
+
+def _busqueda_clientes(cursor):
+    # Cada rama de CLIENTES_POR_PREFIJO recorre su índice y se detiene en el límite
+    _agregar_indices(cursor, "clientes", [("clientes_nombre_idx", "`nombre`"),
+                                          ("clientes_rfc_idx", "`rfc`")])
+
+
+def _secuencias(cursor):
+    _ejecutar_secciones(cursor, "Tabla secuencias")
+
+
+def _resumenes(cursor):
+    nuevas = not _tabla_existe(cursor, "resumen_diario_ventas")
+    _ejecutar_secciones(cursor, "Tabla resumen_diario_ventas", "Tabla resumen_diario_categorias")
+    if nuevas:
+        # Las ventas registradas antes de existir los resúmenes
+        from reportes import reconstruir_resumenes
+        reconstruir_resumenes()
+
+
+def _ventas_pausadas_por_terminal(cursor):
+    # La versión anterior guardaba los productos en otro formato y no tenía terminal ni
+    # vigencia: la tabla se vuelve a crear y las ventas pausadas que había se descartan
+    if _tabla_existe(cursor, "ventas_pausadas") and not _columna_existe(cursor, "ventas_pausadas", "terminal"):
+        cursor.execute("DROP TABLE `ventas_pausadas`")
+    _ejecutar_secciones(cursor, "Tabla ventas_pausadas")
+
+
+def _cambios(cursor):
+    _ejecutar_secciones(cursor, "Tabla cambios", "Triggers de cambios")
+
+
+def _reservas(cursor):
+    _ejecutar_secciones(cursor, "Tabla reservas")
+
+
+def _indices_ventas(cursor):
+    # La lista de Detalles Ventas, la exportación y la reconstrucción de resúmenes filtran
+    # por rango de fecha y ordenan por (fecha, id_venta); con este índice leen solo el
+    # periodo, ya en orden, y la página siguiente continúa desde la última fila vista
+    _agregar_indices(cursor, "venta", [("venta_fecha_idx", "`fecha`, `id_venta`")])
+
+
+# (versión, nombre, función); las nuevas se agregan al final con el siguiente número
+MIGRACIONES = [
+    (1, "articulos.actualizado", _articulos_actualizado),
+    (2, "Índices de búsqueda de clientes", _busqueda_clientes),
+    (3, "Tabla secuencias", _secuencias),
+    (4, "Resúmenes diarios de ventas", _resumenes),
+    (5, "Ventas pausadas por terminal", _ventas_pausadas_por_terminal),
+    (6, "Tabla cambios y triggers", _cambios),
+    (7, "Tabla reservas", _reservas),
+    (8, "Índice de ventas por fecha", _indices_ventas),
+]
+
+
+def aplicadas(cursor):
+    cursor.execute(CREAR_REGISTRO)
+    cursor.execute("SELECT version FROM migraciones_aplicadas")
+    return {fila[0] for fila in cursor.fetchall()}
+
+
+def aplicar(avisar=print):
+    # Devuelve las versiones aplicadas en esta llamada
+    conexion = None
+    cursor = None
+    hechas = []
+    try:
+        conexion = obtener_conexion()
+        cursor = conexion.cursor()
+        cursor.execute("SELECT GET_LOCK(%s, %s)", (CANDADO, ESPERA_CANDADO))
+        if cursor.fetchone()[0] != 1:
+            raise RuntimeError("Otra terminal está actualizando la base de datos; intenta más tarde")
+        try:
+            anteriores = aplicadas(cursor)
+            for version, nombre, migrar in MIGRACIONES:
+                if version in anteriores:
+                    continue
+                avisar(f"Aplicando {version}: {nombre}...")
+                inicio = time.perf_counter()
+                migrar(cursor)
+                cursor.execute(
+                    "INSERT INTO migraciones_aplicadas (version, nombre, segundos) VALUES (%s, %s, %s)",
+                    (version, nombre, round(time.perf_counter() - inicio, 3)))
+                conexion.commit()
+                hechas.append(version)
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (CANDADO,))
+            cursor.fetchone()
+        return hechas
+    except Exception:
+        if conexion:
+            conexion.rollback()
+        raise
+    finally:
+        if cursor:
+            cursor.close()
+        if conexion:
+            conexion.close()
+
+
+def pendientes():
+    conexion = None
+    cursor = None
+    try:
+        conexion = obtener_conexion()
+        cursor = conexion.cursor()
+        anteriores = aplicadas(cursor)
+        return [(version, nombre) for version, nombre, _ in MIGRACIONES if version not in anteriores]
+    finally:
+        if cursor:
+            cursor.close()
+        if conexion:
+            conexion.close()
+
+
+def consultas_frecuentes():
+    # (nombre, sql, parámetros) de las consultas de cada escaneo, búsqueda o página, con
+    # valores representativos; se importan de sus módulos para revisar exactamente esas
+    from detalles_venta import ModeloVentas, TAMANO_PAGINA
+    from exportador import CONSULTA as EXPORTAR_VENTAS, filtros_ventas
+    from repositorio import CLIENTES_POR_PREFIJO, DETALLES_VENTA, ARTICULOS_MODIFICADOS
+    from pausadas import LISTADO as PAUSADAS, LIMITE_LISTADO
+    from reservas import APARTADO_OTRAS
+    from cambios import NUEVOS as CAMBIOS_NUEVOS, LIMITE_CAMBIOS
+    from conexion import TERMINAL
+
+    hoy = date.today()
+    mes = hoy - timedelta(days=30)
+    condiciones, parametros = filtros_ventas(mes, hoy)
+    siguiente = condiciones + ["(v.fecha < %s OR (v.fecha = %s AND v.id_venta < %s))"]
+    por_telefono, parametros_telefono = filtros_ventas(mes, hoy, telefono="5512345678")
+    return [
+        ("Detalles Ventas: primera página", ModeloVentas.CONSULTA.format(condiciones=" AND ".join(condiciones)),
+         parametros + [TAMANO_PAGINA]),
+        ("Detalles Ventas: página siguiente", ModeloVentas.CONSULTA.format(condiciones=" AND ".join(siguiente)),
+         parametros + [hoy, hoy, 2 ** 30, TAMANO_PAGINA]),
+        ("Detalles Ventas: por teléfono", ModeloVentas.CONSULTA.format(condiciones=" AND ".join(por_telefono)),
+         parametros_telefono + [TAMANO_PAGINA]),
+        ("Exportar ventas del mes", EXPORTAR_VENTAS.format(condiciones=" AND ".join(condiciones)), parametros),
+        ("Reconstruir resúmenes del mes", """
+            SELECT v.fecha, v.id_empleado, v.metodo_pago, COUNT(*), SUM(v.importe)
+            FROM venta v
+            WHERE v.fecha >= %s AND v.fecha <= %s
+            GROUP BY v.fecha, v.id_empleado, v.metodo_pago
+        """, [mes, hoy]),
+        ("Buscar clientes por prefijo", CLIENTES_POR_PREFIJO, ("Mar%", 20) * 3 + (20,)),
+        ("Detalle de una venta", DETALLES_VENTA, (1,)),
+        ("Artículos modificados", ARTICULOS_MODIFICADOS, (hoy,)),
+        ("Ventas pausadas de la caja", PAUSADAS.format(condiciones="p.terminal = %s AND p.expira > NOW()"),
+         (TERMINAL, LIMITE_LISTADO)),
+        ("Apartado de las demás cajas", APARTADO_OTRAS, ("7500000000000", TERMINAL)),
+        ("Cambios nuevos", CAMBIOS_NUEVOS + " ORDER BY id_cambio LIMIT %s", (0, LIMITE_CAMBIOS + 1)),
+    ]
+
+
+def verificar_planes():
+    # EXPLAIN de cada consulta frecuente. Devuelve [(consulta, tabla, filas), ...] de las que
+    # recorren completa (type ALL) una tabla con al menos MINIMO_FILAS filas. Las tablas
+    # derivadas (<union...>, <derived...>) no son tablas de la base y no se cuentan.
+    # Con pocas filas el optimizador prefiere leer todo: conviene revisar una base con datos
+    # reales o la que deja python benchmark.py.
+    conexion = None
+    cursor = None
+    fallas = []
+    try:
+        conexion = obtener_conexion()
+        cursor = conexion.cursor(dictionary=True)
+        for nombre, sql, parametros in consultas_frecuentes():
+            cursor.execute("EXPLAIN " + sql, tuple(parametros))
+            for paso in cursor.fetchall():
+                tabla = paso["table"] or ""
+                if paso["type"] == "ALL" and not tabla.startswith("<") and (paso["rows"] or 0) >= MINIMO_FILAS:
+                    fallas.append((nombre, tabla, paso["rows"]))
+        return fallas
+    finally:
+        if cursor:
+            cursor.close()
+        if conexion:
+            conexion.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Actualiza la base de datos a la versión actual del esquema")
+    parser.add_argument("--base", default=CONFIGURACION["database"])
+    parser.add_argument("--estado", action="store_true", help="solo listar las migraciones pendientes")
+    parser.add_argument("--verificar", action="store_true",
+                        help="revisar con EXPLAIN que ninguna consulta frecuente recorra una tabla completa")
+    argumentos = parser.parse_args()
+
+    CONFIGURACION["database"] = argumentos.base
+    configurar_pool(tamano=2, minimas=1)
+    try:
+        if argumentos.estado:
+            faltan = pendientes()
+            for version, nombre in faltan:
+                print(f"Pendiente {version}: {nombre}")
+            print("Base de datos al día" if not faltan else f"{len(faltan)} migraciones pendientes")
+            sys.exit(1 if faltan else 0)
+
+        if argumentos.verificar:
+            fallas = verificar_planes()
+            for nombre, tabla, filas in fallas:
+                print(f"FALLA {nombre}: recorre completa la tabla {tabla} (~{filas} filas)")
+            if not fallas:
+                print("Todas las consultas frecuentes usan índices")
+            sys.exit(1 if fallas else 0)
+
+        hechas = aplicar()
+        print(f"{len(hechas)} migraciones aplicadas" if hechas else "Base de datos al día")
+    finally:
+        cerrar_pool()
@@ -0,0 +1,292 @@
+import bisect
+from indice import normalizar
+from conexion import consultar
+from ejecutor import obtener_ejecutor
+from repositorio import consultar_llaves
+from PyQt6.QtWidgets import QTableView, QHeaderView, QAbstractItemView, QMessageBox
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+class ModeloTabla(QAbstractTableModel):
+    # Filas de las pestañas de catálogo (artículos, clientes, empleados...), con la llave en
+    # la primera columna. Se llena una vez con la consulta completa; después de cada alta,
+    # cambio o baja la pestaña solo toca la fila afectada.
+    # El filtro y el orden se resuelven aquí sobre listas de Python: un proxy de Qt pediría
+    # cada celda a data() por separado, y con 100 mil filas eso tarda segundos.
+    def __init__(self, encabezados, formatos=None, derecha=(), parent=None):
+        super().__init__(parent)
+        self._encabezados = encabezados
+        self._formatos = formatos or {}  # columna -> función que convierte el valor en texto
+        self._derecha = set(derecha)     # Columnas alineadas a la derecha (importes)
+        self._filas = []
+        self._posiciones = {}  # llave -> número de fila en self._filas
+        self._busqueda = []    # número de fila -> texto normalizado, se calcula al filtrar
+        self._orden = None     # (columna, Qt.SortOrder) elegido en la vista
+        self._filtro = ""
+        self._visibles = None  # Números de fila que pasan el filtro, en orden; None sin filtro
+
+    def establecer_filas(self, filas):
+        self.beginResetModel()
+        self._filas = [tuple(fila) for fila in filas]
+        self._busqueda = [None] * len(self._filas)
+        self._ordenar()
+        self._filtrar()
+        self.endResetModel()
+
+    def filtrar(self, texto):
+        filtro = normalizar(texto).strip()
+        if filtro == self._filtro:
+            return
+        self.beginResetModel()
+        self._filtro = filtro
+        self._filtrar()
+        self.endResetModel()
+
+    def fila(self, indice):
+        # Fila original (valores sin formato) de un índice de la vista
+        return self._filas[self._numero(indice.row())]
+
+    def buscar(self, llave):
+        numero = self._posiciones.get(llave)
+        return None if numero is None else self._filas[numero]
+
+    def guardar(self, fila):
+        # Alta o cambio de una sola fila; las altas van al final
+        fila = tuple(fila)
+        numero = self._posiciones.get(fila[0])
+        if numero is None:
+            numero = len(self._filas)
+            if self._visibles is None:
+                self.beginInsertRows(QModelIndex(), numero, numero)
+            self._filas.append(fila)
+            self._busqueda.append(None)
+            self._posiciones[fila[0]] = numero
+            if self._visibles is None:
+                self.endInsertRows()
+            elif self._coincide(numero):
+                self.beginInsertRows(QModelIndex(), len(self._visibles), len(self._visibles))
+                self._visibles.append(numero)
+                self.endInsertRows()
+            return
+
+        self._filas[numero] = fila
+        self._busqueda[numero] = None
+        if self._visibles is None:
+            self._avisar_cambio(numero)
+            return
+        posicion = bisect.bisect_left(self._visibles, numero)
+        visible = posicion < len(self._visibles) and self._visibles[posicion] == numero
+        if visible and self._coincide(numero):
+            self._avisar_cambio(posicion)
+        elif visible:
+            self.beginRemoveRows(QModelIndex(), posicion, posicion)
+            del self._visibles[posicion]
+            self.endRemoveRows()
+        elif self._coincide(numero):
+            self.beginInsertRows(QModelIndex(), posicion, posicion)
+            self._visibles.insert(posicion, numero)
+            self.endInsertRows()
+
+    def quitar(self, llave):
+        numero = self._posiciones.get(llave)
+        if numero is None:
+            return
+        posicion = numero
+        if self._visibles is not None:
+            posicion = bisect.bisect_left(self._visibles, numero)
+            if posicion == len(self._visibles) or self._visibles[posicion] != numero:
+                posicion = None
+        if posicion is not None:
+            self.beginRemoveRows(QModelIndex(), posicion, posicion)
+
+        del self._filas[numero]
+        del self._busqueda[numero]
+        del self._posiciones[llave]
+        for siguiente in range(numero, len(self._filas)):
+            self._posiciones[self._filas[siguiente][0]] = siguiente
+        if self._visibles is not None:
+            self._visibles = [n if n < numero else n - 1 for n in self._visibles if n != numero]
+
+        if posicion is not None:
+            self.endRemoveRows()
+
+    def aplicar_cambios(self, llaves, filas, agregar=True):
+        # filas: las releídas de la base de datos para esas llaves; las que faltan se borraron.
+        # agregar=False solo corrige las filas que ya se muestran (p. ej. resultados de búsqueda)
+        vigentes = set()
+        for fila in filas:
+            vigentes.add(fila[0])
+            if agregar or fila[0] in self._posiciones:
+                self.guardar(fila)
+        for llave in llaves:
+            if llave not in vigentes:
+                self.quitar(llave)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._filas) if self._visibles is None else len(self._visibles)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._encabezados)
+
+    def headerData(self, seccion, orientacion, rol=Qt.ItemDataRole.DisplayRole):
+        if orientacion == Qt.Orientation.Horizontal and rol == Qt.ItemDataRole.DisplayRole:
+            return self._encabezados[seccion]
+        return None
+
+    def data(self, indice, rol=Qt.ItemDataRole.DisplayRole):
+        if not indice.isValid():
+            return None
+        if rol == Qt.ItemDataRole.DisplayRole:
+            return self._texto(self._filas[self._numero(indice.row())], indice.column())
+        if rol == Qt.ItemDataRole.TextAlignmentRole and indice.column() in self._derecha:
+            return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+        return None
+
+    def sort(self, columna, orden=Qt.SortOrder.AscendingOrder):
+        # Columna -1: se conserva el orden en que llegaron las filas
+        if columna < 0 or columna >= len(self._encabezados):
+            self._orden = None
+            return
+        self._orden = (columna, orden)
+        self.beginResetModel()
+        self._ordenar()
+        self._filtrar()
+        self.endResetModel()
+
+    def _numero(self, fila_vista):
+        return fila_vista if self._visibles is None else self._visibles[fila_vista]
+
+    def _avisar_cambio(self, fila_vista):
+        self.dataChanged.emit(self.index(fila_vista, 0), self.index(fila_vista, len(self._encabezados) - 1))
+
+    def _texto(self, fila, columna):
+        valor = fila[columna]
+        if valor is None:
+            return ""
+        formato = self._formatos.get(columna)
+        return formato(valor) if formato else str(valor)
+
+    def _coincide(self, numero):
+        texto = self._busqueda[numero]
+        if texto is None:
+            texto = self._busqueda[numero] = normalizar(self._texto_fila(self._filas[numero]))
+        return self._filtro in texto
+
+    def _filtrar(self):
+        if not self._filtro:
+            self._visibles = None
+            return
+        faltantes = [numero for numero, texto in enumerate(self._busqueda) if texto is None]
+        if faltantes:
+            # Se normaliza un solo bloque con todas las filas: mucho menos trabajo por fila
+            bloque = normalizar("\n".join(self._texto_fila(self._filas[numero]) for numero in faltantes))
+            for numero, texto in zip(faltantes, bloque.split("\n")):
+                self._busqueda[numero] = texto
+        filtro = self._filtro
+        self._visibles = [numero for numero, texto in enumerate(self._busqueda) if filtro in texto]
+
+    def _texto_fila(self, fila):
+        formatos = [self._formatos.get(columna, str) for columna in range(len(fila))]
+        return " ".join([formato(valor).replace("\n", " ") for formato, valor in zip(formatos, fila)
+                         if valor is not None])
+
+    def _llave_orden(self, valor):
+        # Los vacíos al final; los textos sin distinguir mayúsculas
+        if valor is None:
+            return (1, 0, "")
+        if isinstance(valor, str):
+            return (0, 1, valor.lower())
+        return (0, 0, valor)
+
+    def _ordenar(self):
+        # Las filas llegan ya ordenadas por la consulta: timsort las recorre una vez
+        if self._orden is not None:
+            columna, orden = self._orden
+            valores = [fila[columna] for fila in self._filas]
+            try:
+                if valores and isinstance(valores[0], str):
+                    valores = [valor.lower() for valor in valores]
+                orden_filas = sorted(range(len(valores)), key=valores.__getitem__,
+                                     reverse=orden == Qt.SortOrder.DescendingOrder)
+            except (TypeError, AttributeError):
+                # Hay vacíos o tipos mezclados en la columna
+                llaves = [self._llave_orden(fila[columna]) for fila in self._filas]
+                orden_filas = sorted(range(len(llaves)), key=llaves.__getitem__,
+                                     reverse=orden == Qt.SortOrder.DescendingOrder)
+            self._filas = [self._filas[numero] for numero in orden_filas]
+            self._busqueda = [self._busqueda[numero] for numero in orden_filas]
+        self._posiciones = {fila[0]: numero for numero, fila in enumerate(self._filas)}
+
+class PestanaCatalogo:
+    # Carga y sincronización de una pestaña que muestra su tabla en self.modelo; se mezcla
+    # antes de QWidget. La subclase define TABLA (el nombre que avisa el monitor de cambios),
+    # CONSULTA (sin WHERE ni ORDER BY) y LLAVE (su primera columna).
+    # La carga completa y la relectura de lo avisado comparten clave en el ejecutor, así que
+    # una relectura vieja nunca se aplica encima de una carga más nueva; las llaves de una
+    # relectura reemplazada se suman a la siguiente.
+    TABLA = None
+    CONSULTA = None
+    LLAVE = None
+    ORDEN = None    # Columna del ORDER BY de la carga completa; sin ella, LLAVE
+    AGREGAR = True  # False: los cambios solo corrigen las filas que ya se muestran
+    _por_releer = frozenset()  # Llaves avisadas sin aplicar; None si hay una carga completa pendiente
+
+    def cargar_datos(self):
+        self._por_releer = None
+        obtener_ejecutor().ejecutar(
+            self.consultar_datos,
+            clave=(id(self), "cargar_datos"),
+            al_terminar=self._datos_cargados,
+            al_fallar=lambda e: QMessageBox.critical(self, "Error", f"Error al cargar datos:\n{e}")
+        )
+
+    def consultar_datos(self, llaves=None):
+        # Se ejecuta en un hilo de trabajo; sin llaves lee la tabla completa
+        if llaves is None:
+            return consultar(f"{self.CONSULTA} ORDER BY {self.ORDEN or self.LLAVE}")
+        return consultar_llaves(self.CONSULTA, self.LLAVE, llaves)
+
+    def mostrar_datos(self, filas):
+        self.modelo.establecer_filas(filas)
+
+    def datos_cambiados(self, tabla, llaves):
+        # Altas, cambios y bajas hechos en otra pestaña o en otra terminal
+        if tabla != self.TABLA:
+            return
+        if llaves is not None and not self.AGREGAR:
+            llaves = {llave for llave in llaves if self.modelo.buscar(llave) is not None}
+            if not llaves:
+                return
+        if llaves is None or self._por_releer is None:
+            # La carga pendiente pudo leer antes del cambio: se pide de nuevo
+            self.cargar_datos()
+            return
+        llaves = self._por_releer = self._por_releer | set(llaves)
+        obtener_ejecutor().ejecutar(
+            self.consultar_datos, llaves,
+            clave=(id(self), "cargar_datos"),
+            al_terminar=lambda filas: self._cambios_releidos(llaves, filas)
+        )
+
+    def _datos_cargados(self, filas):
+        self._por_releer = frozenset()
+        self.mostrar_datos(filas)
+
+    def _cambios_releidos(self, llaves, filas):
+        self._por_releer = frozenset()
+        self.modelo.aplicar_cambios(llaves, filas, agregar=self.AGREGAR)
+
+
+def crear_vista(modelo, columna_orden=0):
+    # columna_orden: la del ORDER BY de la consulta, para que el indicador coincida;
+    # -1 conserva el orden de las filas (p. ej. resultados ya ordenados por relevancia)
+    vista = QTableView()
+    vista.setModel(modelo)
+    vista.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+    vista.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+    vista.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+    vista.verticalHeader().setVisible(False)
+    vista.setSortingEnabled(True)
+    vista.sortByColumn(columna_orden, Qt.SortOrder.AscendingOrder)
+    return vista
@@ -0,0 +1,144 @@
+import json
+from conexion import obtener_conexion, consultar, TERMINAL
+
+HORAS_VIGENCIA = 24     # Una venta pausada más vieja que esto se descarta
+LIMITE_LISTADO = 50     # Ventas pausadas que se muestran por terminal
+LOTE_PURGA = 500        # Filas borradas por sentencia al purgar
+INTERVALO_PURGA = 3600  # Segundos entre purgas de ventas pausadas expiradas
+
+LISTADO = """
+    SELECT p.id_pausa, p.fecha_pausa, p.id_empleado, e.nombre,
+           IFNULL(c.nombre, 'General'), p.articulos, p.total
+    FROM ventas_pausadas p
+    LEFT JOIN empleado e ON e.id_empleado = p.id_empleado
+    LEFT JOIN clientes c ON c.telefono = p.telefono_cliente
+    WHERE {condiciones}
+    ORDER BY p.fecha_pausa DESC
+    LIMIT %s
+"""
+
+
+def serializar_productos(productos):
+    # Forma compacta: [[codigo, cantidad, precio], ...]; el nombre sale del catálogo al reanudar
+    return json.dumps([[codigo, cantidad, precio] for codigo, _, cantidad, precio in productos],
+                      separators=(",", ":"))
+
+
+def deserializar_productos(texto, nombre_de):
+    return [(codigo, nombre_de(codigo), cantidad, precio)
+            for codigo, cantidad, precio in json.loads(texto)]
+
+
+def pausar(productos, cliente, id_empleado, terminal=TERMINAL):
+    # cliente: dict de cliente_actual o None
+    total = round(sum(cantidad * precio for _, _, cantidad, precio in productos), 2)
+    conexion = None
+    cursor = None
+    try:
+        conexion = obtener_conexion()
+        cursor = conexion.cursor()
+        # Las fechas salen del reloj del servidor, el mismo con el que listar y purgar comparan
+        cursor.execute(
+            """INSERT INTO ventas_pausadas
+            (terminal, telefono_cliente, cliente_info, productos, articulos, total,
+             id_empleado, fecha_pausa, expira)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, NOW(), NOW() + INTERVAL %s HOUR)""",
+            (terminal,
+             cliente['telefono'] if cliente else None,
+             json.dumps(cliente, separators=(",", ":")) if cliente else None,
+             serializar_productos(productos),
+             sum(cantidad for _, _, cantidad, _ in productos),
+             total,
+             id_empleado,
+             HORAS_VIGENCIA)
+        )
+        conexion.commit()
+        return cursor.lastrowid
+    except Exception:
+        if conexion:
+            conexion.rollback()
+        raise
+    finally:
+        if cursor:
+            cursor.close()
+        if conexion:
+            conexion.close()
+
+
+def listar(terminal=TERMINAL, id_empleado=None):
+    # Recorre el índice (terminal, fecha_pausa) y corta en LIMITE_LISTADO; no lee los productos
+    condiciones = ["p.terminal = %s", "p.expira > NOW()"]
+    parametros = [terminal]
+    if id_empleado is not None:
+        condiciones.append("p.id_empleado = %s")
+        parametros.append(id_empleado)
+    parametros.append(LIMITE_LISTADO)
+
+    return consultar(LISTADO.format(condiciones=" AND ".join(condiciones)), parametros)
+
+
+def tomar(id_pausa):
+    # Lee y borra la venta pausada en una sola transacción: si dos cajeros intentan
+    # reanudarla a la vez, solo uno la obtiene. Devuelve None si ya no existe.
+    conexion = None
+    cursor = None
+    try:
+        conexion = obtener_conexion()
+        cursor = conexion.cursor()
+        cursor.execute(
+            """SELECT telefono_cliente, cliente_info, productos, id_empleado
+            FROM ventas_pausadas
+            WHERE id_pausa = %s
+            FOR UPDATE""",
+            (id_pausa,)
+        )
+        fila = cursor.fetchone()
+        if fila is None:
+            conexion.rollback()
+            return None
+
+        cursor.execute("DELETE FROM ventas_pausadas WHERE id_pausa = %s", (id_pausa,))
+        conexion.commit()
+
+        telefono, cliente_info, productos, id_empleado = fila
+        return {
+            'telefono': telefono,
+            'cliente': json.loads(cliente_info) if cliente_info else None,
+            'productos': productos,
+            'id_empleado': id_empleado
+        }
+    except Exception:
+        if conexion:
+            conexion.rollback()
+        raise
+    finally:
+        if cursor:
+            cursor.close()
+        if conexion:
+            conexion.close()
+
+
+def purgar_expiradas():
+    # Borra por lotes usando el índice de expira para no bloquear la tabla mucho tiempo
+    conexion = None
+    cursor = None
+    borradas = 0
+    try:
+        conexion = obtener_conexion()
+        cursor = conexion.cursor()
+        while True:
+            cursor.execute(
+                "DELETE FROM ventas_pausadas WHERE expira <= NOW() LIMIT %s", (LOTE_PURGA,))
+            conexion.commit()
+            borradas += cursor.rowcount
+            if cursor.rowcount < LOTE_PURGA:
+                return borradas
+    except Exception:
+        if conexion:
+            conexion.rollback()
+        raise
+    finally:
+        if cursor:
+            cursor.close()
+        if conexion:
+            conexion.close()
@@ -1,19 +1,28 @@
 from conexion import obtener_conexion
+from cambios import obtener_monitor
+from referencias import referencias
+from modelo_tabla import ModeloTabla, PestanaCatalogo, crear_vista
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QFormLayout,
-    QLineEdit, QPushButton, QTableWidget, QTableWidgetItem,
-    QMessageBox, QHeaderView
+    QLineEdit, QPushButton, QMessageBox
 )
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QIntValidator
 
-class VentanaProveedores(QWidget):
-    def __init__(self, conexion):
+
+CONSULTA = "SELECT id_proveedor, nombre, telefono FROM proveedores"
+
+class VentanaProveedores(PestanaCatalogo, QWidget):
+    TABLA = "proveedores"
+    CONSULTA = CONSULTA
+    LLAVE = "id_proveedor"
+
+    def __init__(self):
         super().__init__()
-        self.conexion = conexion
         
         self.init_ui()
         self.cargar_datos()
+        obtener_monitor().cambiaron.connect(self.datos_cambiados)
 
     def init_ui(self):
         self.setWindowTitle("Gestión de Proveedores")
@@ -43,8 +52,10 @@ class VentanaProveedores(QWidget):
         self.boton_limpiar = QPushButton("🧹 Limpiar")
         self.boton_limpiar.setStyleSheet("background-color: #FFC107; color: black;")
         
+        self.filtro_input = QLineEdit()
+        self.filtro_input.setPlaceholderText("Filtrar la tabla")
+        
         # Tabla
-        self.tabla = QTableWidget()
         self.configurar_tabla()
         
         # Layouts
@@ -62,6 +73,7 @@ class VentanaProveedores(QWidget):
         main_layout = QVBoxLayout()
         main_layout.addLayout(form_layout)
         main_layout.addLayout(button_layout)
+        main_layout.addWidget(self.filtro_input)
         main_layout.addWidget(self.tabla)
         
         self.setLayout(main_layout)
@@ -71,14 +83,12 @@ class VentanaProveedores(QWidget):
         self.boton_actualizar.clicked.connect(self.actualizar)
         self.boton_eliminar.clicked.connect(self.eliminar)
         self.boton_limpiar.clicked.connect(self.limpiar_campos)
-        self.tabla.itemDoubleClicked.connect(self.cargar_datos_desde_tabla)
+        self.tabla.doubleClicked.connect(self.cargar_datos_desde_tabla)
+        self.filtro_input.textChanged.connect(self.modelo.filtrar)
 
     def configurar_tabla(self):
-        self.tabla.setColumnCount(3)
-        self.tabla.setHorizontalHeaderLabels(["ID", "Nombre", "Teléfono"])
-        self.tabla.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        self.tabla.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.tabla.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.modelo = ModeloTabla(["ID", "Nombre", "Teléfono"])
+        self.tabla = crear_vista(self.modelo)
 
     def agregar(self):
         conexion = None
@@ -98,9 +108,10 @@ class VentanaProveedores(QWidget):
                 "INSERT INTO proveedores (id_proveedor, nombre, telefono) VALUES (%s, %s, %s)",
                 (int(id_prov), nombre, telefono))
             conexion.commit()
+            referencias.invalidar("proveedores")
+            self.modelo.guardar((int(id_prov), nombre, telefono))
             
             QMessageBox.information(self, "Éxito", "Proveedor agregado correctamente")
-            self.cargar_datos()
             self.limpiar_campos()
             
         except Exception as e:
@@ -131,9 +142,11 @@ class VentanaProveedores(QWidget):
                 "UPDATE proveedores SET nombre = %s, telefono = %s WHERE id_proveedor = %s",
                 (nombre, telefono, int(id_prov)))
             conexion.commit()
+            referencias.invalidar("proveedores")
+            if cursor.rowcount:
+                self.modelo.guardar((int(id_prov), nombre, telefono))
             
             QMessageBox.information(self, "Éxito", "Proveedor actualizado correctamente")
-            self.cargar_datos()
             
         except Exception as e:
             if conexion:
@@ -169,9 +182,10 @@ class VentanaProveedores(QWidget):
                 "DELETE FROM proveedores WHERE id_proveedor = %s",
                 (int(id_prov),))
             conexion.commit()
+            referencias.invalidar("proveedores")
+            self.modelo.quitar(int(id_prov))
             
             QMessageBox.information(self, "Éxito", "Proveedor eliminado correctamente")
-            self.cargar_datos()
             self.limpiar_campos()
             
         except Exception as e:
@@ -184,34 +198,11 @@ class VentanaProveedores(QWidget):
             if conexion:
                 conexion.close()
 
-    def cargar_datos(self):
-        conexion = None
-        cursor = None
-        try:
-            self.tabla.setRowCount(0)
-            conexion = obtener_conexion()
-            cursor = conexion.cursor()
-            cursor.execute("SELECT id_proveedor, nombre, telefono FROM proveedores ORDER BY id_proveedor")
-            
-            for row_idx, (id_prov, nombre, telefono) in enumerate(cursor.fetchall()):
-                self.tabla.insertRow(row_idx)
-                self.tabla.setItem(row_idx, 0, QTableWidgetItem(str(id_prov)))
-                self.tabla.setItem(row_idx, 1, QTableWidgetItem(nombre))
-                self.tabla.setItem(row_idx, 2, QTableWidgetItem(telefono))
-                
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error al cargar datos:\n{e}")
-        finally:
-            if cursor:
-                cursor.close()
-            if conexion:
-                conexion.close()
-
-    def cargar_datos_desde_tabla(self, item):
-        row = item.row()
-        self.id_input.setText(self.tabla.item(row, 0).text())
-        self.nombre_input.setText(self.tabla.item(row, 1).text())
-        self.telefono_input.setText(self.tabla.item(row, 2).text())
+    def cargar_datos_desde_tabla(self, indice):
+        id_prov, nombre, telefono = self.modelo.fila(indice)
+        self.id_input.setText(str(id_prov))
+        self.nombre_input.setText(nombre)
+        self.telefono_input.setText(telefono or "")
 
     def limpiar_campos(self):
         self.id_input.clear()
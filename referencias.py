@@ -0,0 +1,85 @@
+import threading
+import time
+from conexion import obtener_conexion
+
+VIGENCIA = 600  # Segundos; cubre cambios hechos desde otra terminal
+
+# tabla -> (llave, columna con el nombre)
+TABLAS = {
+    "categorias": ("id_categorias", "nombre"),
+    "proveedores": ("id_proveedor", "nombre"),
+    "unidad": ("id_unidad", "nombre"),
+}
+
+
+class CacheReferencias:
+    # Tablas chicas de referencia compartidas por todo el proceso. Las pestañas que las
+    # modifican llaman a invalidar() después del commit; la siguiente lectura las recarga.
+    def __init__(self):
+        self._filas = {}    # tabla -> [(id, nombre), ...] ordenadas por id
+        self._nombres = {}  # tabla -> {id: nombre}
+        self._cargadas = {}  # tabla -> time.monotonic() de la carga
+        self._candado = threading.Lock()
+        self.version = 0    # Cambia con cada invalidación; sirve para saber si un combo está viejo
+
+    def obtener(self, tabla):
+        self._revisar([tabla])
+        with self._candado:
+            return list(self._filas[tabla])
+
+    def nombres(self, tabla):
+        self._revisar([tabla])
+        with self._candado:
+            return self._nombres[tabla]
+
+    def todas(self):
+        # Para llenar los combos de artículos: (categorias, proveedores, unidades)
+        self._revisar(list(TABLAS))
+        with self._candado:
+            return tuple(list(self._filas[tabla]) for tabla in TABLAS)
+
+    def invalidar(self, tabla=None):
+        with self._candado:
+            for nombre in ([tabla] if tabla else list(TABLAS)):
+                self._cargadas.pop(nombre, None)
+            self.version += 1
+
+    def _revisar(self, tablas):
+        ahora = time.monotonic()
+        with self._candado:
+            vencidas = [tabla for tabla in tablas
+                        if ahora - self._cargadas.get(tabla, -VIGENCIA) >= VIGENCIA]
+        if vencidas:
+            self._cargar(vencidas)
+
+    def _cargar(self, tablas):
+        # Todas las tablas vencidas con una sola conexión
+        with self._candado:
+            version = self.version
+        conexion = None
+        cursor = None
+        try:
+            conexion = obtener_conexion()
+            cursor = conexion.cursor()
+            cargadas = {}
+            for tabla in tablas:
+                llave, nombre = TABLAS[tabla]
+                cursor.execute(f"SELECT {llave}, {nombre} FROM {tabla} ORDER BY {llave}")
+                cargadas[tabla] = [tuple(fila) for fila in cursor.fetchall()]
+        finally:
+            if cursor:
+                cursor.close()
+            if conexion:
+                conexion.close()
+
+        ahora = time.monotonic()
+        with self._candado:
+            for tabla, filas in cargadas.items():
+                self._filas[tabla] = filas
+                self._nombres[tabla] = dict(filas)
+                # Si se invalidó mientras se leía, la siguiente lectura vuelve a cargar
+                if self.version == version:
+                    self._cargadas[tabla] = ahora
+
+
+referencias = CacheReferencias()
@@ -0,0 +1,170 @@
+import argparse
+import sys
+from conexion import obtener_conexion
+
+# Los resúmenes diarios se actualizan dentro de la misma transacción que registra la
+# venta, así que los reportes por periodo leen O(días) filas en lugar de O(ventas).
+
+ACUMULAR_VENTA = """
+    INSERT INTO resumen_diario_ventas (fecha, id_empleado, metodo_pago, ventas, importe)
+    VALUES (%s, %s, %s, 1, %s)
+    ON DUPLICATE KEY UPDATE ventas = ventas + 1, importe = importe + VALUES(importe)
+"""
+
+ACUMULAR_CATEGORIAS = """
+    INSERT INTO resumen_diario_categorias (fecha, id_categorias, unidades, importe)
+    SELECT %s, a.id_categorias, SUM(dv.cantidad), SUM(dv.cantidad * dv.precio)
+    FROM detalles_venta dv
+    JOIN articulos a ON a.codigo = dv.codigo
+    WHERE dv.id_venta = %s
+    GROUP BY a.id_categorias
+    ON DUPLICATE KEY UPDATE
+        unidades = unidades + VALUES(unidades),
+        importe = importe + VALUES(importe)
+"""
+
+
+def acumular_venta(cursor, id_venta, fecha, total, id_empleado, metodo_pago):
+    # Se llama desde registrar_venta, después de insertar los detalles
+    cursor.execute(ACUMULAR_VENTA, (fecha, id_empleado, metodo_pago, total))
+    cursor.execute(ACUMULAR_CATEGORIAS, (fecha, id_venta))
+
+
+def totales_periodo(desde, hasta):
+    conexion = None
+    cursor = None
+    try:
+        conexion = obtener_conexion()
+        cursor = conexion.cursor()
+        rango = (desde, hasta)
+
+        cursor.execute("""
+            SELECT IFNULL(SUM(ventas), 0), IFNULL(SUM(importe), 0)
+            FROM resumen_diario_ventas
+            WHERE fecha BETWEEN %s AND %s
+        """, rango)
+        ventas, importe = cursor.fetchone()
+
+        cursor.execute("""
+            SELECT metodo_pago, SUM(ventas), SUM(importe)
+            FROM resumen_diario_ventas
+            WHERE fecha BETWEEN %s AND %s
+            GROUP BY metodo_pago
+            ORDER BY SUM(importe) DESC
+        """, rango)
+        por_metodo = cursor.fetchall()
+
+        cursor.execute("""
+            SELECT e.nombre, SUM(r.ventas), SUM(r.importe)
+            FROM resumen_diario_ventas r
+            JOIN empleado e ON e.id_empleado = r.id_empleado
+            WHERE r.fecha BETWEEN %s AND %s
+            GROUP BY r.id_empleado, e.nombre
+            ORDER BY SUM(r.importe) DESC
+        """, rango)
+        por_empleado = cursor.fetchall()
+
+        cursor.execute("""
+            SELECT c.nombre, SUM(r.unidades), SUM(r.importe)
+            FROM resumen_diario_categorias r
+            JOIN categorias c ON c.id_categorias = r.id_categorias
+            WHERE r.fecha BETWEEN %s AND %s
+            GROUP BY r.id_categorias, c.nombre
+            ORDER BY SUM(r.importe) DESC
+        """, rango)
+        por_categoria = cursor.fetchall()
+
+        cursor.execute("""
+            SELECT fecha, SUM(ventas), SUM(importe)
+            FROM resumen_diario_ventas
+            WHERE fecha BETWEEN %s AND %s
+            GROUP BY fecha
+            ORDER BY fecha
+        """, rango)
+        por_dia = cursor.fetchall()
+
+        return {
+            "ventas": int(ventas),
+            "importe": float(importe),
+            "por_metodo": por_metodo,
+            "por_empleado": por_empleado,
+            "por_categoria": por_categoria,
+            "por_dia": por_dia
+        }
+    finally:
+        if cursor:
+            cursor.close()
+        if conexion:
+            conexion.close()
+
+
+def reconstruir_resumenes(desde=None, hasta=None):
+    # Recalcula los resúmenes a partir de venta y detalles_venta. Sirve para poblarlos
+    # en una base con ventas anteriores o para corregirlos si se editaron ventas a mano.
+    condiciones = []
+    parametros = []
+    if desde:
+        condiciones.append("fecha >= %s")
+        parametros.append(desde)
+    if hasta:
+        condiciones.append("fecha <= %s")
+        parametros.append(hasta)
+    filtro = " AND ".join(condiciones) or "1 = 1"
+    filtro_venta = filtro.replace("fecha", "v.fecha")
+
+    conexion = None
+    cursor = None
+    try:
+        conexion = obtener_conexion()
+        cursor = conexion.cursor()
+
+        cursor.execute(f"DELETE FROM resumen_diario_ventas WHERE {filtro}", parametros)
+        cursor.execute(f"DELETE FROM resumen_diario_categorias WHERE {filtro}", parametros)
+
+        cursor.execute(f"""
+            INSERT INTO resumen_diario_ventas (fecha, id_empleado, metodo_pago, ventas, importe)
+            SELECT v.fecha, v.id_empleado, v.metodo_pago, COUNT(*), SUM(v.importe)
+            FROM venta v
+            WHERE {filtro_venta}
+            GROUP BY v.fecha, v.id_empleado, v.metodo_pago
+        """, parametros)
+        dias = cursor.rowcount
+
+        cursor.execute(f"""
+            INSERT INTO resumen_diario_categorias (fecha, id_categorias, unidades, importe)
+            SELECT v.fecha, a.id_categorias, SUM(dv.cantidad), SUM(dv.cantidad * dv.precio)
+            FROM venta v
+            JOIN detalles_venta dv ON dv.id_venta = v.id_venta
+            JOIN articulos a ON a.codigo = dv.codigo
+            WHERE {filtro_venta}
+            GROUP BY v.fecha, a.id_categorias
+        """, parametros)
+
+        conexion.commit()
+        return dias
+
+    except Exception:
+        if conexion:
+            conexion.rollback()
+        raise
+    finally:
+        if cursor:
+            cursor.close()
+        if conexion:
+            conexion.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mantenimiento de los resúmenes diarios de ventas")
+    parser.add_argument("--reconstruir", action="store_true",
+                        help="recalcular los resúmenes a partir de las ventas registradas")
+    parser.add_argument("--desde", help="fecha inicial AAAA-MM-DD (opcional)")
+    parser.add_argument("--hasta", help="fecha final AAAA-MM-DD (opcional)")
+    argumentos = parser.parse_args()
+
+    if not argumentos.reconstruir:
+        parser.print_help()
+        sys.exit(1)
+
+    filas = reconstruir_resumenes(argumentos.desde, argumentos.hasta)
+    print(f"Resúmenes reconstruidos ({filas} filas por día, empleado y método de pago)")
@@ -0,0 +1,124 @@
+from conexion import obtener_conexion, obtener_pool
+import instrumentacion
+
+# Consultas de lectura que se repiten en cada escaneo o tecla. Se ejecutan como sentencias
+# preparadas guardadas por conexión del pool: el servidor analiza cada una una sola vez y
+# después solo recibe los parámetros por el protocolo binario.
+# Cada constante debe pasarse tal cual (el mismo objeto) para que se reutilice la sentencia.
+
+ARTICULO = "SELECT nombre, precio, existencias FROM articulos WHERE codigo = %s"
+
+ARTICULOS_MODIFICADOS = """
+    SELECT codigo, nombre, precio, existencias, actualizado
+    FROM articulos
+    WHERE actualizado >= %s
+"""
+
+NOMBRE_EMPLEADO = "SELECT nombre FROM empleado WHERE id_empleado = %s"
+
+CLIENTE = "SELECT nombre, direccion, rfc FROM clientes WHERE telefono = %s"
+
+# Prefijo de teléfono, nombre o RFC: cada rama usa su índice y se detiene en el límite
+CLIENTES_POR_PREFIJO = """
+    (SELECT telefono, nombre, direccion, rfc FROM clientes
+     WHERE nombre LIKE %s ORDER BY nombre LIMIT %s)
+    UNION
+    (SELECT telefono, nombre, direccion, rfc FROM clientes
+     WHERE telefono LIKE %s ORDER BY telefono LIMIT %s)
+    UNION
+    (SELECT telefono, nombre, direccion, rfc FROM clientes
+     WHERE rfc LIKE %s ORDER BY rfc LIMIT %s)
+    ORDER BY nombre
+    LIMIT %s
+"""
+
+DETALLES_VENTA = """
+    SELECT a.codigo, a.nombre, dv.cantidad, dv.precio
+    FROM detalles_venta dv
+    JOIN articulos a ON dv.codigo = a.codigo
+    WHERE dv.id_venta = %s
+    ORDER BY a.nombre
+"""
+
+FACTURA_VENTA = """
+    SELECT rfc, razon_social, direccion_fiscal, email
+    FROM facturas
+    WHERE id_venta = %s
+"""
+
+
+def ejecutar(conexion, sql, parametros=()):
+    # Dentro de una conexión ya prestada (p. ej. varias consultas en la misma transacción)
+    cursor = conexion.preparada(sql)
+    try:
+        cursor.execute(sql, parametros)
+        # Se leen todas las filas: la conexión no acepta otra sentencia con resultados pendientes
+        return cursor.fetchall()
+    finally:
+        if instrumentacion.ACTIVA:
+            # El cursor preparado no se cierra; la medición termina aquí
+            cursor.terminar()
+
+
+def consultar(sql, parametros=(), espera=None):
+    # espera: segundos máximos por una conexión; sin ella se usa obtener_conexion y su aviso
+    conexion = obtener_conexion() if espera is None else obtener_pool().obtener(espera=espera)
+    try:
+        return ejecutar(conexion, sql, parametros)
+    finally:
+        conexion.close()
+
+
+def consultar_llaves(consulta, columna, llaves, lote=500):
+    # Filas de 'consulta' (sin WHERE ni ORDER BY) para un conjunto de llaves, en lotes.
+    # El número de llaves varía en cada llamada: no se guarda como sentencia preparada.
+    llaves = list(llaves)
+    filas = []
+    conexion = obtener_conexion()
+    cursor = None
+    try:
+        cursor = conexion.cursor()
+        for inicio in range(0, len(llaves), lote):
+            parte = llaves[inicio:inicio + lote]
+            marcas = ", ".join(["%s"] * len(parte))
+            cursor.execute(f"{consulta} WHERE {columna} IN ({marcas})", tuple(parte))
+            filas.extend(cursor.fetchall())
+        return filas
+    finally:
+        if cursor:
+            cursor.close()
+        conexion.close()
+
+
+def obtener_articulo(codigo):
+    filas = consultar(ARTICULO, (codigo,))
+    return tuple(filas[0]) if filas else None
+
+
+def articulos_modificados(desde):
+    return consultar(ARTICULOS_MODIFICADOS, (desde,))
+
+
+def nombre_empleado(id_empleado, espera=None):
+    filas = consultar(NOMBRE_EMPLEADO, (id_empleado,), espera)
+    return filas[0][0] if filas else None
+
+
+def buscar_cliente(telefono):
+    return consultar(CLIENTE, (telefono,))
+
+
+def buscar_clientes(texto, limite):
+    # Los comodines que escriba el usuario se buscan como texto
+    patron = texto.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    return consultar(CLIENTES_POR_PREFIJO, (patron, limite) * 3 + (limite,))
+
+
+def detalles_de_venta(id_venta):
+    conexion = obtener_conexion()
+    try:
+        detalles = ejecutar(conexion, DETALLES_VENTA, (id_venta,))
+        facturas = ejecutar(conexion, FACTURA_VENTA, (id_venta,))
+        return detalles, (facturas[0] if facturas else None)
+    finally:
+        conexion.close()
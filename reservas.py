@@ -0,0 +1,136 @@
+import threading
+from conexion import obtener_conexion, TERMINAL
+
+VIGENCIA = 900       # Segundos que dura un apartado sin renovarse (caja cerrada o colgada)
+RENOVAR_CADA = 300   # Segundos entre renovaciones de los apartados del carrito abierto
+
+# Lo apartado por las demás cajas; el artículo ya está bloqueado cuando se lee
+APARTADO_OTRAS = """
+    SELECT COALESCE(SUM(cantidad), 0) FROM reservas
+    WHERE codigo = %s AND terminal <> %s AND expira > NOW()
+"""
+
+APARTAR = """
+    INSERT INTO reservas (terminal, codigo, cantidad, expira)
+    VALUES (%s, %s, %s, NOW() + INTERVAL %s SECOND)
+    ON DUPLICATE KEY UPDATE cantidad = VALUES(cantidad), expira = VALUES(expira)
+"""
+
+
+class ReservasCaja:
+    # Existencias apartadas por el carrito de esta terminal. Cada línea escaneada aparta su
+    # cantidad si las existencias, menos lo apartado por otras cajas, alcanzan. El artículo
+    # se bloquea solo mientras se aparta (una transacción corta por código), nunca durante
+    # toda la venta; si la caja se cierra sin cobrar, el apartado caduca en VIGENCIA.
+    # cambiar() se llama desde la interfaz; sincronizar() desde un hilo de trabajo.
+    def __init__(self, terminal=TERMINAL):
+        self.terminal = terminal
+        self._cantidades = {}    # codigo -> cantidad en el carrito
+        self._pendientes = set()  # Códigos que cambiaron desde la última sincronización
+        self._candado = threading.Lock()
+        self._escritura = threading.Lock()  # Una sincronización a la vez
+
+    def cambiar(self, codigo, cantidad):
+        with self._candado:
+            self._cantidades[codigo] = cantidad
+            self._pendientes.add(codigo)
+
+    def hay_pendientes(self):
+        with self._candado:
+            return bool(self._pendientes)
+
+    def sincronizar(self):
+        # Devuelve [(codigo, cantidad, disponible), ...] de lo que no se pudo apartar
+        with self._escritura:
+            with self._candado:
+                cambios = {codigo: self._cantidades.get(codigo, 0) for codigo in self._pendientes}
+                self._pendientes.clear()
+            if not cambios:
+                return []
+            try:
+                rechazados = self._aplicar(cambios)
+            except Exception:
+                with self._candado:
+                    self._pendientes.update(cambios)  # Se reintentan en la siguiente
+                raise
+            with self._candado:
+                for codigo, cantidad in cambios.items():
+                    if cantidad <= 0 and self._cantidades.get(codigo) == cantidad:
+                        del self._cantidades[codigo]
+            return rechazados
+
+    def renovar(self):
+        # Extiende los apartados del carrito abierto y borra los caducados de todas las cajas
+        self._ejecutar(
+            ("UPDATE reservas SET expira = NOW() + INTERVAL %s SECOND WHERE terminal = %s",
+             (VIGENCIA, self.terminal)),
+            ("DELETE FROM reservas WHERE expira < NOW()", ()))
+
+    def liberar_todo(self):
+        # Al abrir la caja: apartados que quedaron de una sesión anterior sin cobrar
+        with self._escritura:
+            self._ejecutar(("DELETE FROM reservas WHERE terminal = %s", (self.terminal,)))
+
+    def _aplicar(self, cambios):
+        conexion = None
+        cursor = None
+        try:
+            conexion = obtener_conexion()
+            cursor = conexion.cursor()
+
+            liberar = [codigo for codigo, cantidad in cambios.items() if cantidad <= 0]
+            if liberar:
+                cursor.execute(
+                    f"DELETE FROM reservas WHERE terminal = %s "
+                    f"AND codigo IN ({', '.join(['%s'] * len(liberar))})",
+                    (self.terminal, *liberar))
+                conexion.commit()
+
+            rechazados = []
+            for codigo, cantidad in cambios.items():
+                if cantidad <= 0:
+                    continue
+                # FOR UPDATE pone en fila a las cajas que apartan o cobran el mismo artículo;
+                # lo apartado por las demás se lee ya con el bloqueo tomado
+                cursor.execute("SELECT existencias FROM articulos WHERE codigo = %s FOR UPDATE", (codigo,))
+                fila = cursor.fetchone()
+                cursor.execute(APARTADO_OTRAS, (codigo, self.terminal))
+                disponible = (fila[0] if fila else 0) - cursor.fetchone()[0]
+                if disponible >= cantidad:
+                    cursor.execute(APARTAR, (self.terminal, codigo, cantidad, VIGENCIA))
+                else:
+                    # Se conserva el apartado anterior, si había
+                    rechazados.append((codigo, cantidad, disponible))
+                conexion.commit()
+            return rechazados
+        except Exception:
+            if conexion:
+                conexion.rollback()
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+            if conexion:
+                conexion.close()
+
+    def _ejecutar(self, *sentencias):
+        conexion = None
+        cursor = None
+        try:
+            conexion = obtener_conexion()
+            cursor = conexion.cursor()
+            for sql, parametros in sentencias:
+                cursor.execute(sql, parametros)
+            conexion.commit()
+        except Exception:
+            if conexion:
+                conexion.rollback()
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+            if conexion:
+                conexion.close()
+
+
+reservas = ReservasCaja()
@@ -0,0 +1,82 @@
+import threading
+from conexion import obtener_conexion
+
+TAMANO_BLOQUE = 20  # Folios que cada terminal reserva de una sola vez
+
+
+class AsignadorFolios:
+    # Reparte folios consecutivos a partir de bloques reservados en la tabla secuencias.
+    # Cada terminal consume su bloque sin tocar la base de datos; los folios de un
+    # bloque que no se usen antes de cerrar la aplicación quedan como huecos.
+    def __init__(self, secuencia, tabla, columna, tamano_bloque=TAMANO_BLOQUE):
+        self.secuencia = secuencia
+        self.tabla = tabla
+        self.columna = columna
+        self.tamano_bloque = tamano_bloque
+        self._siguiente = 0
+        self._limite = 0
+        self._candado = threading.Lock()
+
+    def siguiente(self):
+        with self._candado:
+            if self._siguiente >= self._limite:
+                self._siguiente, self._limite = self._reservar_bloque()
+            folio = self._siguiente
+            self._siguiente += 1
+            return folio
+
+    def reservado(self):
+        # Siguiente folio del bloque ya reservado, sin tocar la base de datos; None si se agotó
+        with self._candado:
+            if self._siguiente >= self._limite:
+                return None
+            folio = self._siguiente
+            self._siguiente += 1
+            return folio
+
+    def reiniciar(self):
+        # Descarta el bloque reservado; el siguiente folio se pide de nuevo a la base de datos
+        with self._candado:
+            self._siguiente = self._limite = 0
+
+    def _reservar_bloque(self):
+        conexion = None
+        cursor = None
+        try:
+            conexion = obtener_conexion()
+            cursor = conexion.cursor()
+
+            # LAST_INSERT_ID(expr) deja el nuevo límite en la sesión sin otra lectura bloqueante
+            cursor.execute(
+                "UPDATE secuencias SET siguiente = LAST_INSERT_ID(siguiente + %s) WHERE nombre = %s",
+                (self.tamano_bloque, self.secuencia))
+
+            if cursor.rowcount == 0:
+                # Primera vez: iniciar la secuencia después del folio más alto existente
+                cursor.execute(
+                    f"INSERT IGNORE INTO secuencias (nombre, siguiente) "
+                    f"SELECT %s, IFNULL(MAX({self.columna}), 0) + 1 FROM {self.tabla}",
+                    (self.secuencia,))
+                cursor.execute(
+                    "UPDATE secuencias SET siguiente = LAST_INSERT_ID(siguiente + %s) WHERE nombre = %s",
+                    (self.tamano_bloque, self.secuencia))
+
+            cursor.execute("SELECT LAST_INSERT_ID()")
+            limite = cursor.fetchone()[0]
+            conexion.commit()
+            return limite - self.tamano_bloque, limite
+
+        except Exception:
+            if conexion:
+                conexion.rollback()
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+            if conexion:
+                conexion.close()
+
+
+folios_venta = AsignadorFolios("venta", "venta", "id_venta")
+# Las compras son pocas al día: un folio por reserva para no dejar huecos al cerrar
+folios_compra = AsignadorFolios("compra", "compra", "id_compra", tamano_bloque=1)
@@ -0,0 +1,78 @@
+from conexion import obtener_conexion
+from secuencia import folios_compra
+
+LOTE_COSTOS = 500  # Códigos por consulta al completar los costos que no se capturaron
+
+
+def costos_actuales(cursor, codigos):
+    # codigo -> costo registrado en articulos, en lotes de IN (...)
+    codigos = list(codigos)
+    costos = {}
+    for inicio in range(0, len(codigos), LOTE_COSTOS):
+        parte = codigos[inicio:inicio + LOTE_COSTOS]
+        cursor.execute(
+            f"SELECT codigo, costo FROM articulos WHERE codigo IN ({', '.join(['%s'] * len(parte))})",
+            tuple(parte))
+        costos.update(cursor.fetchall())
+    return costos
+
+
+def registrar_compra(cursor, id_compra, folio, tipodoc, fecha, id_proveedor, lineas):
+    # lineas: [(codigo, cantidad, costo), ...] con un solo renglón por código; costo None
+    # toma el costo actual del artículo. Se ejecuta dentro de la transacción del llamador,
+    # que hace commit o rollback. Devuelve el importe de la compra.
+    sin_costo = [codigo for codigo, _, costo in lineas if costo is None]
+    costos = costos_actuales(cursor, sin_costo) if sin_costo else {}
+    faltantes = [codigo for codigo in sin_costo if codigo not in costos]
+    if faltantes:
+        raise ValueError(f"Artículos no registrados: {', '.join(faltantes[:10])}")
+
+    # Ordenadas por código, como las recorre el UPDATE por la llave (id_compra, codigo)
+    detalles = sorted(
+        (id_compra, codigo, cantidad, costos[codigo] if costo is None else costo)
+        for codigo, cantidad, costo in lineas)
+    importe = round(sum(cantidad * costo for _, _, cantidad, costo in detalles), 2)
+
+    cursor.execute(
+        """INSERT INTO compra (id_compra, folio, tipodoc, fecha, importe, id_proveedor)
+        VALUES (%s, %s, %s, %s, %s, %s)""",
+        (id_compra, folio, tipodoc, fecha, importe, id_proveedor)
+    )
+
+    # Todas las líneas en un solo INSERT de varias filas
+    cursor.executemany(
+        "INSERT INTO detalles_comp (id_compra, codigo, cantidad, costo) VALUES (%s, %s, %s, %s)",
+        detalles
+    )
+
+    # Todas las existencias en una sola sentencia, a partir de lo recién insertado
+    cursor.execute(
+        """UPDATE articulos a
+        JOIN detalles_comp dc ON dc.codigo = a.codigo
+        SET a.existencias = a.existencias + dc.cantidad
+        WHERE dc.id_compra = %s""",
+        (id_compra,)
+    )
+    return importe
+
+
+def guardar_compra(folio, tipodoc, fecha, id_proveedor, lineas):
+    # Encabezado, detalles y existencias en una transacción; devuelve (id_compra, importe)
+    id_compra = folios_compra.siguiente()
+    conexion = None
+    cursor = None
+    try:
+        conexion = obtener_conexion()
+        cursor = conexion.cursor()
+        importe = registrar_compra(cursor, id_compra, folio, tipodoc, fecha, id_proveedor, lineas)
+        conexion.commit()
+        return id_compra, importe
+    except Exception:
+        if conexion:
+            conexion.rollback()
+        raise
+    finally:
+        if cursor:
+            cursor.close()
+        if conexion:
+            conexion.close()
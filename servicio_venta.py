@@ -0,0 +1,91 @@
+from conexion import TERMINAL
+from reportes import acumular_venta
+
+
+# Existencias de un artículo menos lo apartado por las demás cajas (parámetro: terminal)
+DISPONIBLE = """a.existencias - COALESCE((
+    SELECT SUM(r.cantidad) FROM reservas r
+    WHERE r.codigo = a.codigo AND r.terminal <> %s AND r.expira > NOW()
+), 0)"""
+
+
+class StockInsuficiente(Exception):
+    def __init__(self, faltantes):
+        # faltantes: [(codigo, existencias, cantidad_solicitada), ...]
+        self.faltantes = faltantes
+        detalle = ", ".join(
+            f"{codigo} (hay {existencias}, se piden {cantidad})"
+            for codigo, existencias, cantidad in faltantes)
+        super().__init__(f"Stock insuficiente: {detalle}")
+
+
+def registrar_venta(cursor, id_venta, fecha, total, telefono, id_empleado,
+                    metodo_pago, productos, datos_factura=None, validar_existencias=True,
+                    terminal=TERMINAL):
+    # productos: [(codigo, nombre, cantidad, precio), ...]
+    # Se ejecuta dentro de la transacción del llamador, que hace commit o rollback.
+    # validar_existencias=False se usa al enviar ventas de la bitácora: la mercancía
+    # ya se entregó, así que se registran aunque el stock quede negativo.
+    # terminal: caja que cobra; sus apartados no cuentan contra ella y se borran al cobrar.
+    cursor.execute(
+        """INSERT INTO venta (id_venta, fecha, importe, telefono, id_empleado, metodo_pago)
+        VALUES (%s, %s, %s, %s, %s, %s)""",
+        (id_venta, fecha, total, telefono, id_empleado, metodo_pago)
+    )
+
+    if datos_factura:
+        cursor.execute(
+            """INSERT INTO facturas
+            (id_venta, rfc, razon_social, direccion_fiscal, email)
+            VALUES (%s, %s, %s, %s, %s)""",
+            (id_venta, datos_factura['rfc'], datos_factura['razon_social'],
+             datos_factura['direccion_fiscal'], datos_factura['email'])
+        )
+
+    # Todas las líneas en un solo INSERT de varias filas
+    cursor.executemany(
+        "INSERT INTO detalles_venta (id_venta, codigo, cantidad, precio) VALUES (%s, %s, %s, %s)",
+        [(id_venta, codigo, cantidad, precio) for codigo, _, cantidad, precio in productos]
+    )
+
+    if validar_existencias:
+        # Una sola sentencia que solo descuenta donde alcanza. Los artículos quedan
+        # bloqueados hasta el commit de esta venta, no mientras el carrito está abierto.
+        cursor.execute("SAVEPOINT descuento")
+        cursor.execute(
+            f"""UPDATE articulos a
+            JOIN detalles_venta dv ON dv.codigo = a.codigo
+            SET a.existencias = a.existencias - dv.cantidad
+            WHERE dv.id_venta = %s AND {DISPONIBLE} >= dv.cantidad""",
+            (id_venta, terminal)
+        )
+        if cursor.rowcount < len(productos):
+            # Se deshace el descuento parcial para reportar las existencias de antes
+            cursor.execute("ROLLBACK TO SAVEPOINT descuento")
+            cursor.execute(
+                f"""SELECT a.codigo, {DISPONIBLE}, dv.cantidad
+                FROM detalles_venta dv
+                JOIN articulos a ON dv.codigo = a.codigo
+                WHERE dv.id_venta = %s AND {DISPONIBLE} < dv.cantidad""",
+                (terminal, id_venta, terminal)
+            )
+            raise StockInsuficiente(cursor.fetchall())
+    else:
+        cursor.execute(
+            """UPDATE articulos a
+            JOIN detalles_venta dv ON dv.codigo = a.codigo
+            SET a.existencias = a.existencias - dv.cantidad
+            WHERE dv.id_venta = %s""",
+            (id_venta,)
+        )
+
+    # Lo vendido ya no necesita apartado, también al enviar una venta de la bitácora
+    cursor.execute(
+        """DELETE r FROM reservas r
+        JOIN detalles_venta dv ON dv.codigo = r.codigo
+        WHERE dv.id_venta = %s AND r.terminal = %s""",
+        (id_venta, terminal)
+    )
+
+    # Los resúmenes diarios quedan en la misma transacción que la venta
+    acumular_venta(cursor, id_venta, fecha, total, id_empleado, metodo_pago)
@@ -0,0 +1,58 @@
+from datetime import datetime
+
+
+class SesionCajero:
+    # Turno de un empleado en esta caja: su nombre ya verificado y los contadores del turno
+    def __init__(self, id_empleado, nombre):
+        self.id_empleado = id_empleado
+        self.nombre = nombre  # None si hay que volver a verificarlo en la base de datos
+        self.inicio = datetime.now()
+        self.ventas = 0
+        self.importe = 0.0
+        self.sin_conexion = 0  # Ventas que quedaron en la bitácora local
+
+    def registrar_venta(self, total, en_linea):
+        self.ventas += 1
+        self.importe = round(self.importe + total, 2)
+        if not en_linea:
+            self.sin_conexion += 1
+
+    def resumen(self):
+        texto = f"Turno desde {self.inicio.strftime('%H:%M')}: {self.ventas} ventas, ${self.importe:.2f}"
+        if self.sin_conexion:
+            texto += f" ({self.sin_conexion} sin enviar)"
+        return texto
+
+
+class SesionesCajero:
+    # Se usa desde el hilo de la interfaz: la caja y la pestaña de empleados
+    def __init__(self):
+        self._sesiones = {}  # id_empleado -> SesionCajero
+
+    def verificada(self, id_empleado):
+        # La sesión solo sirve para cobrar sin consultar si su nombre sigue vigente
+        sesion = self._sesiones.get(id_empleado)
+        return sesion if sesion and sesion.nombre is not None else None
+
+    def abrir(self, id_empleado, nombre):
+        # Si el empleado ya tenía turno en esta caja se conservan sus contadores
+        sesion = self._sesiones.get(id_empleado)
+        if sesion is None:
+            sesion = self._sesiones[id_empleado] = SesionCajero(id_empleado, nombre)
+        elif nombre is not None:
+            sesion.nombre = nombre
+        return sesion
+
+    def invalidar(self, id_empleado=None):
+        # El empleado se editó o se eliminó: la siguiente venta lo verifica de nuevo.
+        # Sin id_empleado se invalidan todas las sesiones.
+        if id_empleado is None:
+            for sesion in self._sesiones.values():
+                sesion.nombre = None
+            return
+        sesion = self._sesiones.get(id_empleado)
+        if sesion:
+            sesion.nombre = None
+
+
+sesiones = SesionesCajero()
@@ -0,0 +1,232 @@
+import argparse
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import date
+
+from mysql.connector import errorcode
+from mysql.connector.errors import DatabaseError
+from conexion import CONFIGURACION, configurar_pool, cerrar_pool, obtener_conexion, consultar
+from secuencia import folios_venta
+from reservas import ReservasCaja
+from servicio_venta import registrar_venta, StockInsuficiente
+from benchmark import crear_base
+
+# Varias cajas vendiendo a la vez los mismos pocos artículos contra un MySQL local, en una
+# base de datos aparte. Cada caja es un hilo con su propio identificador de terminal: aparta
+# al escanear, espera como si cobrara y registra la venta por la misma ruta que la caja.
+# Al final se revisa que ninguna existencia quedó negativa, que lo descontado coincide con
+# lo vendido y que ninguna venta con su apartado fue rechazada al cobrar.
+BASE_SIMULACION = "BodegaAurrera_simulacion"
+CAJAS = 8
+ARTICULOS = 10        # Pocos artículos para que las cajas compitan por ellos
+EXISTENCIAS = 40      # Existencias iniciales de cada artículo
+SEGUNDOS = 20
+ABANDONO = 0.1        # Fracción de carritos que se cancelan sin cobrar
+
+
+class Resultados:
+    def __init__(self):
+        self.ventas = 0
+        self.abandonadas = 0
+        self.ajustes = 0            # Líneas recortadas porque otra caja ya tenía el apartado
+        self.rechazadas_cobro = 0   # StockInsuficiente al cobrar
+        self.reintentos = 0         # Deadlocks o esperas de bloqueo que se reintentaron
+        self.vendido = Counter()    # codigo -> unidades vendidas
+        self._candado = threading.Lock()
+
+    def sumar(self, **valores):
+        with self._candado:
+            for nombre, valor in valores.items():
+                setattr(self, nombre, getattr(self, nombre) + valor)
+
+    def vender(self, productos):
+        with self._candado:
+            self.ventas += 1
+            for codigo, _, cantidad, _ in productos:
+                self.vendido[codigo] += cantidad
+
+
+def poblar(articulos, existencias):
+    codigos = [str(7900000000000 + i) for i in range(articulos)]
+    conexion = None
+    cursor = None
+    try:
+        conexion = obtener_conexion()
+        cursor = conexion.cursor()
+        cursor.executemany(
+            """INSERT INTO articulos
+            (codigo, nombre, precio, costo, existencias, reorden, id_categorias, id_proveedor, id_unidad)
+            VALUES (%s, %s, 10, 8, %s, '0', 1, 1, 1)""",
+            [(codigo, f"Artículo disputado {numero}", existencias) for numero, codigo in enumerate(codigos)])
+        conexion.commit()
+    finally:
+        if cursor:
+            cursor.close()
+        if conexion:
+            conexion.close()
+    return codigos
+
+
+def cobrar(terminal, productos, resultados):
+    for intento in range(3):
+        conexion = None
+        cursor = None
+        try:
+            conexion = obtener_conexion()
+            cursor = conexion.cursor()
+            total = round(sum(cantidad * precio for _, _, cantidad, precio in productos), 2)
+            registrar_venta(cursor, folios_venta.siguiente(), date.today(), total, "0000000000",
+                            1, "EFECTIVO", productos, terminal=terminal)
+            conexion.commit()
+            return True
+        except StockInsuficiente:
+            conexion.rollback()
+            return False
+        except DatabaseError as e:
+            if conexion:
+                conexion.rollback()
+            if e.errno not in (errorcode.ER_LOCK_DEADLOCK, errorcode.ER_LOCK_WAIT_TIMEOUT) or intento == 2:
+                raise
+            resultados.sumar(reintentos=1)
+        finally:
+            if cursor:
+                cursor.close()
+            if conexion:
+                conexion.close()
+
+
+def caja(numero, codigos, limite, apartar, pausa, semilla, resultados, errores):
+    terminal = f"simulacion-{numero}"
+    apartados = ReservasCaja(terminal)
+    azar = random.Random(semilla + numero)
+    try:
+        apartados.liberar_todo()
+        while time.monotonic() < limite:
+            carrito = {codigo: azar.randint(1, 3)
+                       for codigo in azar.sample(codigos, azar.randint(1, min(3, len(codigos))))}
+            if apartar:
+                for codigo, cantidad in carrito.items():
+                    apartados.cambiar(codigo, cantidad)
+                # Como la caja: una línea rechazada se queda con lo disponible y se vuelve a apartar
+                for _ in range(3):
+                    rechazados = apartados.sincronizar()
+                    if not rechazados:
+                        break
+                    for codigo, _, disponible in rechazados:
+                        resultados.sumar(ajustes=1)
+                        if disponible > 0:
+                            carrito[codigo] = disponible
+                        else:
+                            carrito.pop(codigo, None)
+                        apartados.cambiar(codigo, max(disponible, 0))
+                else:
+                    # Siguen rechazados tras tres intentos: se sueltan esas líneas
+                    for codigo, _, _ in rechazados:
+                        carrito.pop(codigo, None)
+                        apartados.cambiar(codigo, 0)
+                    apartados.sincronizar()
+
+            time.sleep(azar.uniform(0, pausa))  # El cajero sigue escaneando y cobra
+
+            productos = [(codigo, codigo, cantidad, 10.0) for codigo, cantidad in carrito.items()]
+            if not productos or azar.random() < ABANDONO:
+                resultados.sumar(abandonadas=1)
+            elif cobrar(terminal, productos, resultados):
+                resultados.vender(productos)
+            else:
+                resultados.sumar(rechazadas_cobro=1)
+
+            if apartar:
+                for codigo in carrito:
+                    apartados.cambiar(codigo, 0)
+                apartados.sincronizar()
+    except Exception as e:
+        errores.append((terminal, e))
+
+
+def simular(cajas, articulos, existencias, segundos, apartar, pausa, semilla):
+    codigos = poblar(articulos, existencias)
+    resultados = Resultados()
+    errores = []
+    limite = time.monotonic() + segundos
+    hilos = [threading.Thread(target=caja, args=(numero, codigos, limite, apartar, pausa,
+                                                 semilla, resultados, errores))
+             for numero in range(cajas)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return codigos, resultados, errores
+
+
+def revisar(codigos, existencias, resultados, apartar):
+    # Devuelve la lista de invariantes violadas
+    problemas = []
+    marcas = ", ".join(["%s"] * len(codigos))
+    finales = dict(consultar(f"SELECT codigo, existencias FROM articulos WHERE codigo IN ({marcas})",
+                             tuple(codigos)))
+    registrado = dict(consultar(
+        f"SELECT codigo, SUM(cantidad) FROM detalles_venta WHERE codigo IN ({marcas}) GROUP BY codigo",
+        tuple(codigos)))
+    for codigo in codigos:
+        final = finales[codigo]
+        if final < 0:
+            problemas.append(f"{codigo}: existencias negativas ({final})")
+        if existencias - final != resultados.vendido[codigo]:
+            problemas.append(f"{codigo}: se descontaron {existencias - final}, "
+                             f"las cajas vendieron {resultados.vendido[codigo]}")
+        if int(registrado.get(codigo) or 0) != resultados.vendido[codigo]:
+            problemas.append(f"{codigo}: detalles_venta tiene {registrado.get(codigo) or 0}, "
+                             f"las cajas vendieron {resultados.vendido[codigo]}")
+    sobrantes = consultar("SELECT COUNT(*) FROM reservas WHERE terminal LIKE 'simulacion-%'")[0][0]
+    if sobrantes:
+        problemas.append(f"quedaron {sobrantes} apartados sin liberar")
+    if apartar and resultados.rechazadas_cobro:
+        problemas.append(f"{resultados.rechazadas_cobro} ventas con apartado se rechazaron al cobrar")
+    return problemas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Varias cajas vendiendo los mismos artículos a la vez")
+    parser.add_argument("--cajas", type=int, default=CAJAS)
+    parser.add_argument("--articulos", type=int, default=ARTICULOS)
+    parser.add_argument("--existencias", type=int, default=EXISTENCIAS)
+    parser.add_argument("--segundos", type=float, default=SEGUNDOS)
+    parser.add_argument("--pausa", type=float, default=0.05,
+                        help="segundos máximos entre apartar y cobrar")
+    parser.add_argument("--sin-apartar", action="store_true",
+                        help="cobrar sin apartar al escanear (solo el descuento condicional)")
+    parser.add_argument("--base", default=BASE_SIMULACION,
+                        help="base de datos de prueba; se borra y se vuelve a crear")
+    parser.add_argument("--semilla", type=int, default=1)
+    argumentos = parser.parse_args()
+
+    CONFIGURACION["database"] = argumentos.base
+    crear_base(argumentos.base)
+    configurar_pool(tamano=argumentos.cajas + 2)
+    apartar = not argumentos.sin_apartar
+    try:
+        inicio = time.perf_counter()
+        codigos, resultados, errores = simular(
+            argumentos.cajas, argumentos.articulos, argumentos.existencias, argumentos.segundos,
+            apartar, argumentos.pausa, argumentos.semilla)
+        duracion = time.perf_counter() - inicio
+        problemas = revisar(codigos, argumentos.existencias, resultados, apartar)
+    finally:
+        cerrar_pool()
+
+    print(f"{argumentos.cajas} cajas, {argumentos.articulos} artículos con {argumentos.existencias} "
+          f"existencias, {duracion:.1f} s, {'con' if apartar else 'sin'} apartados")
+    print(f"Ventas: {resultados.ventas} ({resultados.ventas / duracion:.1f}/s), "
+          f"abandonadas: {resultados.abandonadas}, líneas ajustadas al apartar: {resultados.ajustes}, "
+          f"rechazadas al cobrar: {resultados.rechazadas_cobro}, reintentos por bloqueo: {resultados.reintentos}")
+    for terminal, error in errores:
+        print(f"ERROR {terminal}: {error}")
+    for problema in problemas:
+        print(f"FALLA {problema}")
+    if not problemas and not errores:
+        print("Sin existencias negativas ni ventas perdidas")
+    sys.exit(1 if problemas or errores else 0)
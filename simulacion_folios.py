@@ -0,0 +1,75 @@
+import argparse
+import multiprocessing
+import sys
+import time
+
+from conexion import CONFIGURACION, configurar_pool, cerrar_pool
+from secuencia import AsignadorFolios, TAMANO_BLOQUE
+from benchmark import crear_base
+
+# Varias terminales pidiendo folios de venta a la vez contra un MySQL local, en una base de
+# datos aparte. Cada terminal es un proceso con su propio pool y su propio AsignadorFolios,
+# como una caja distinta. Al final se revisa que ningún folio se repitió y que no quedaron
+# huecos más allá de los bloques que cada terminal dejó sin terminar.
+BASE_SIMULACION = "BodegaAurrera_folios"
+TERMINALES = 8
+FOLIOS = 2000  # Por terminal
+
+
+def terminal(base, folios, tamano_bloque):
+    # Se ejecuta en un proceso aparte; devuelve los folios en el orden en que los recibió
+    CONFIGURACION["database"] = base
+    configurar_pool(tamano=1, minimas=1)
+    try:
+        asignador = AsignadorFolios("venta", "venta", "id_venta", tamano_bloque)
+        return [asignador.siguiente() for _ in range(folios)]
+    finally:
+        cerrar_pool()
+
+
+def revisar(resultados, folios, tamano_bloque):
+    # Devuelve la lista de invariantes violadas
+    problemas = []
+    todos = [folio for asignados in resultados for folio in asignados]
+    repetidos = len(todos) - len(set(todos))
+    if repetidos:
+        problemas.append(f"{repetidos} folios repetidos entre terminales")
+    for numero, asignados in enumerate(resultados):
+        if asignados != sorted(asignados) or len(set(asignados)) != len(asignados):
+            problemas.append(f"la terminal {numero} recibió folios fuera de orden o repetidos")
+
+    # Cada terminal puede dejar sin usar el resto de su último bloque
+    sobrantes = (-folios) % tamano_bloque
+    huecos = max(todos) - min(todos) + 1 - len(set(todos))
+    if huecos > sobrantes * len(resultados):
+        problemas.append(f"{huecos} folios saltados; se esperaban a lo más {sobrantes * len(resultados)}")
+    if min(todos) != 1:
+        problemas.append(f"el primer folio fue {min(todos)}, no 1")
+    return problemas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Varias terminales pidiendo folios de venta a la vez")
+    parser.add_argument("--terminales", type=int, default=TERMINALES)
+    parser.add_argument("--folios", type=int, default=FOLIOS, help="folios que pide cada terminal")
+    parser.add_argument("--bloque", type=int, default=TAMANO_BLOQUE)
+    parser.add_argument("--base", default=BASE_SIMULACION,
+                        help="base de datos de prueba; se borra y se vuelve a crear")
+    argumentos = parser.parse_args()
+
+    crear_base(argumentos.base)
+    inicio = time.perf_counter()
+    with multiprocessing.Pool(argumentos.terminales) as procesos:
+        resultados = procesos.starmap(
+            terminal, [(argumentos.base, argumentos.folios, argumentos.bloque)] * argumentos.terminales)
+    duracion = time.perf_counter() - inicio
+    problemas = revisar(resultados, argumentos.folios, argumentos.bloque)
+
+    total = argumentos.terminales * argumentos.folios
+    print(f"{argumentos.terminales} terminales, {total} folios en bloques de {argumentos.bloque}, "
+          f"{duracion:.1f} s ({total / duracion:.0f}/s)")
+    for problema in problemas:
+        print(f"FALLA {problema}")
+    if not problemas:
+        print("Sin folios repetidos ni saltados")
+    sys.exit(1 if problemas else 0)
@@ -0,0 +1,267 @@
+import pytest
+from mysql.connector.errors import (
+    DataError, IntegrityError, InterfaceError, OperationalError, ReadTimeoutError
+)
+
+import bitacora as modulo_bitacora
+from bitacora import BitacoraVentas
+from secuencia import folios_venta
+from conexion import configurar_pool, TERMINAL
+
+# Pruebas del envío de la bitácora contra un servidor simulado en memoria: el pool
+# recibe una fábrica de conexiones falsas, así que no hace falta MySQL.
+
+
+class ServidorFalso:
+    # Lo que MySQL tendría confirmado, y las fallas que se quieren provocar
+    def __init__(self):
+        self.ventas = {}               # id_venta -> [(codigo, cantidad, precio), ...]
+        self.reservas = set()          # (terminal, codigo) apartados
+        self.codigos_invalidos = set()  # Códigos que MySQL rechaza por sus datos
+        self.cortar_en_detalle = None   # Número de renglón de detalles en el que se cae la red
+        self.cortar_tras_commit = False  # El commit se aplica pero la respuesta no llega
+        self.lento = False              # Responde, pero después del tope de lectura
+        self.caido = False              # No acepta conexiones nuevas
+        self.detalles_recibidos = 0
+
+
+class CursorFalso:
+    def __init__(self, conexion):
+        self.conexion = conexion
+        self.resultado = []
+        self.rowcount = 0
+
+    def execute(self, sql, parametros=()):
+        self.conexion.revisar()
+        if self.conexion.servidor.lento:
+            # Sin tope de lectura la prueba se quedaría esperando, como la caja
+            assert self.conexion.read_timeout is not None
+            self.conexion.conectada = False  # mysql-connector cierra la conexión tras el tope
+            raise ReadTimeoutError()
+        sentencia = " ".join(sql.split())
+        self.resultado = []
+        self.rowcount = 0
+        if sentencia.startswith("SELECT id_venta FROM venta WHERE id_venta IN"):
+            confirmadas = self.conexion.servidor.ventas
+            self.resultado = [(id_venta,) for id_venta in parametros if id_venta in confirmadas]
+        elif sentencia.startswith("INSERT INTO venta "):
+            id_venta = parametros[0]
+            if id_venta in self.conexion.servidor.ventas or id_venta in self.conexion.ventas:
+                raise IntegrityError(msg=f"Duplicate entry '{id_venta}' for key 'PRIMARY'", errno=1062)
+            self.conexion.ventas[id_venta] = []
+            self.rowcount = 1
+        elif sentencia.startswith("DELETE r FROM reservas r"):
+            id_venta, terminal = parametros
+            codigos = {codigo for codigo, _, _ in self.conexion.ventas[id_venta]}
+            self.conexion.reservas_liberadas |= {(terminal, codigo) for codigo in codigos}
+
+    def executemany(self, sql, filas):
+        self.conexion.revisar()
+        servidor = self.conexion.servidor
+        for id_venta, codigo, cantidad, precio in filas:
+            servidor.detalles_recibidos += 1
+            if servidor.detalles_recibidos == servidor.cortar_en_detalle:
+                self.conexion.perder()
+            if codigo in servidor.codigos_invalidos:
+                raise DataError(msg=f"Incorrect value for column 'codigo': '{codigo}'", errno=1366)
+            self.conexion.ventas[id_venta].append((codigo, cantidad, precio))
+        self.rowcount = len(filas)
+
+    def fetchall(self):
+        return self.resultado
+
+    def close(self):
+        pass
+
+
+class ConexionFalsa:
+    def __init__(self, servidor):
+        if servidor.caido:
+            raise InterfaceError(msg="Can't connect to MySQL server on 'localhost:3306'", errno=2003)
+        self.servidor = servidor
+        self.ventas = {}  # Insertadas en la transacción abierta
+        self.reservas_liberadas = set()
+        self.conectada = True
+        self.read_timeout = None
+
+    @property
+    def in_transaction(self):
+        return bool(self.ventas)
+
+    def revisar(self):
+        if not self.conectada:
+            raise OperationalError(msg="Lost connection to MySQL server during query", errno=2013)
+
+    def perder(self):
+        # Lo que MySQL no confirmó se pierde con la conexión
+        self.conectada = False
+        self.ventas = {}
+        self.reservas_liberadas = set()
+        self.revisar()
+
+    def cursor(self, *args, **kwargs):
+        self.revisar()
+        return CursorFalso(self)
+
+    def commit(self):
+        self.revisar()
+        self.servidor.ventas.update(self.ventas)
+        self.servidor.reservas -= self.reservas_liberadas
+        self.ventas = {}
+        self.reservas_liberadas = set()
+        if self.servidor.cortar_tras_commit:
+            self.servidor.cortar_tras_commit = False
+            self.perder()
+
+    def rollback(self):
+        self.revisar()
+        self.ventas = {}
+        self.reservas_liberadas = set()
+
+    def is_connected(self):
+        return self.conectada
+
+    def close(self):
+        self.conectada = False
+
+
+@pytest.fixture
+def servidor():
+    servidor = ServidorFalso()
+    configurar_pool(lambda: ConexionFalsa(servidor), tamano=2, minimas=0, verificar_tras=0)
+    yield servidor
+    configurar_pool()
+
+
+@pytest.fixture
+def bitacora(tmp_path, monkeypatch):
+    monkeypatch.setattr(modulo_bitacora, "TAMANO_LOTE", 5)
+    return BitacoraVentas(str(tmp_path / "ventas_pendientes.db"))
+
+
+@pytest.fixture
+def folios(monkeypatch):
+    # Un bloque de folios ya reservado: 100 y 101
+    monkeypatch.setattr(folios_venta, "_siguiente", 100)
+    monkeypatch.setattr(folios_venta, "_limite", 102)
+
+
+def nueva_venta(codigos=("7501", "7502")):
+    productos = [(codigo, f"Artículo {codigo}", 1, 10.0) for codigo in codigos]
+    return {
+        "fecha": "2026-10-18 12:00:00",
+        "total": 10.0 * len(productos),
+        "telefono": None,
+        "id_empleado": 1,
+        "metodo_pago": "Efectivo",
+        "productos": productos,
+        "datos_factura": None
+    }
+
+
+def encolar(bitacora, id_venta, codigos=("7501", "7502")):
+    bitacora._encolar(dict(nueva_venta(codigos), id_venta=id_venta))
+
+
+def test_conexion_perdida_durante_executemany(servidor, bitacora):
+    for id_venta in range(1, 8):
+        encolar(bitacora, id_venta)
+    # El primer lote (ventas 1 a 5) se cae en el renglón 7, dentro de la venta 4
+    servidor.cortar_en_detalle = 7
+
+    with pytest.raises(OperationalError):
+        bitacora.enviar()
+
+    # Nada del lote quedó en el servidor y todo sigue pendiente
+    assert servidor.ventas == {}
+    assert bitacora.pendientes() == 7
+    assert bitacora.fallidas() == []
+
+    # Al volver la red se envía todo, en orden y sin duplicar
+    assert bitacora.enviar() == 7
+    assert sorted(servidor.ventas) == list(range(1, 8))
+    assert all(len(detalles) == 2 for detalles in servidor.ventas.values())
+    assert bitacora.pendientes() == 0
+
+
+def test_reenvio_de_lote_confirmado_en_parte(servidor, bitacora):
+    for id_venta in range(1, 4):
+        encolar(bitacora, id_venta)
+    # MySQL confirma el lote pero la respuesta se pierde: la bitácora no alcanza a borrarlo
+    servidor.cortar_tras_commit = True
+
+    with pytest.raises(OperationalError):
+        bitacora.enviar()
+    assert sorted(servidor.ventas) == [1, 2, 3]
+    assert bitacora.pendientes() == 3
+
+    # El siguiente lote mezcla las ventas ya confirmadas con otras nuevas
+    for id_venta in range(4, 6):
+        encolar(bitacora, id_venta)
+    assert bitacora.enviar() == 5
+
+    # Las ya confirmadas se omitieron en lugar de chocar con su llave
+    assert sorted(servidor.ventas) == [1, 2, 3, 4, 5]
+    assert all(len(detalles) == 2 for detalles in servidor.ventas.values())
+    assert bitacora.fallidas() == []
+    assert bitacora.pendientes() == 0
+
+
+def test_error_de_datos_en_un_renglon(servidor, bitacora, caplog):
+    encolar(bitacora, 1)
+    encolar(bitacora, 2, codigos=("7501", "X-INVALIDO"))
+    encolar(bitacora, 3)
+    servidor.codigos_invalidos.add("X-INVALIDO")
+
+    # El lote completo falla y se reintenta venta por venta: solo la 2 queda fuera
+    assert bitacora.enviar() == 2
+    assert sorted(servidor.ventas) == [1, 3]
+    assert bitacora.pendientes() == 0
+
+    fallidas = bitacora.fallidas()
+    assert [(id_local, id_venta) for id_local, id_venta, _, _ in fallidas] == [(2, 2)]
+    assert "X-INVALIDO" in fallidas[0][3]
+    assert [registro.levelname for registro in caplog.records if registro.name == "pos.bitacora"] == ["ERROR"]
+
+    # La venta rechazada no bloquea las siguientes
+    encolar(bitacora, 4)
+    assert bitacora.enviar() == 1
+    assert sorted(servidor.ventas) == [1, 3, 4]
+
+
+def test_cobro_sin_esperar_a_mysql(servidor, bitacora, folios):
+    # Aunque MySQL esté caído, el cobro solo escribe en disco local con un folio del bloque
+    servidor.caido = True
+    assert bitacora.guardar_venta(nueva_venta()) == (100, True)
+    assert bitacora.guardar_venta(nueva_venta()) == (101, True)
+    # El bloque se agotó: la venta queda sin folio hasta enviarla
+    assert bitacora.guardar_venta(nueva_venta()) == (None, True)
+    assert servidor.ventas == {}
+    assert bitacora.pendientes() == 3
+
+    with pytest.raises(InterfaceError):
+        bitacora.enviar()
+    bitacora.ultimo_error = "sin conexión"  # Lo que deja el hilo de envío tras fallar
+    assert bitacora.guardar_venta(nueva_venta()) == (None, False)
+
+
+def test_en_linea_con_mysql_lento_usa_la_bitacora(servidor, tmp_path, folios):
+    bitacora = BitacoraVentas(str(tmp_path / "ventas_pendientes.db"), priorizar=False)
+    servidor.lento = True
+
+    assert bitacora.guardar_venta(nueva_venta()) == (100, False)
+    assert bitacora.pendientes() == 1
+    assert "timed out" in bitacora.ultimo_error
+
+    servidor.lento = False
+    assert bitacora.enviar() == 1
+    assert sorted(servidor.ventas) == [100]
+
+
+def test_reenvio_libera_apartados_de_la_terminal(servidor, bitacora):
+    servidor.reservas = {(TERMINAL, "7501"), (TERMINAL, "7502"), (TERMINAL, "7600"), ("otra-caja", "7501")}
+    encolar(bitacora, 1)
+
+    assert bitacora.enviar() == 1
+    # Solo se liberan los apartados de esta caja para lo vendido
+    assert servidor.reservas == {(TERMINAL, "7600"), ("otra-caja", "7501")}
@@ -0,0 +1,59 @@
+from datetime import datetime
+
+import pytest
+
+import catalogo as modulo_catalogo
+from catalogo import CatalogoArticulos
+
+# El catálogo en memoria sin MySQL: las lecturas de repositorio se sustituyen por funciones.
+
+ARTICULOS = [
+    ("7501", "Refresco", 15.0, 10, datetime(2026, 10, 18, 12, 0)),
+    ("7502", "Galletas", 22.5, 4, datetime(2026, 10, 18, 12, 5)),
+]
+
+
+@pytest.fixture
+def catalogo(monkeypatch):
+    monkeypatch.setattr(modulo_catalogo, "consultar", lambda sql: list(ARTICULOS))
+    cache = CatalogoArticulos()
+    cache.cargar()
+    return cache
+
+
+def test_obtener_no_consulta_la_base(catalogo, monkeypatch):
+    def sin_base(*args):
+        raise AssertionError("obtener() consultó la base de datos")
+    monkeypatch.setattr(modulo_catalogo.repositorio, "obtener_articulo", sin_base)
+
+    assert catalogo.obtener("7501") == ("Refresco", 15.0, 10)
+    # Un código que no está en memoria no se busca aquí; lo pide quien escanea
+    assert catalogo.obtener("0000") is None
+    catalogo.invalidar()
+    assert catalogo.obtener("7502") == ("Galletas", 22.5, 4)
+
+
+def test_cargar_uno(catalogo, monkeypatch):
+    monkeypatch.setattr(modulo_catalogo.repositorio, "obtener_articulo",
+                        lambda codigo: ("Nuevo", 9.0, 3) if codigo == "7600" else None)
+    assert catalogo.cargar_uno("7600") == ("Nuevo", 9.0, 3)
+    assert catalogo.obtener("7600") == ("Nuevo", 9.0, 3)
+    assert catalogo.cargar_uno("0000") is None
+
+
+def test_refrescar_con_invalidar_a_la_mitad(catalogo, monkeypatch):
+    def modificados(desde):
+        # Una importación invalida el catálogo mientras se hace la consulta incremental
+        catalogo.invalidar()
+        return [("7501", "Refresco", 14.0, 10, datetime(2026, 10, 18, 13, 0))]
+    monkeypatch.setattr(modulo_catalogo.repositorio, "articulos_modificados", modificados)
+
+    catalogo.refrescar()
+
+    # Se respeta la invalidación: la siguiente revisión recarga todo
+    assert catalogo._marca is None
+    monkeypatch.setattr(modulo_catalogo, "consultar", lambda sql: [
+        ("7501", "Refresco", 14.0, 10, datetime(2026, 10, 18, 13, 0))])
+    catalogo.mantener()
+    assert catalogo.obtener("7501") == ("Refresco", 14.0, 10)
+    assert catalogo.obtener("7502") is None
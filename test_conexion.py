@@ -0,0 +1,123 @@
+import threading
+import time
+
+import pytest
+from mysql.connector import Error
+from mysql.connector.errors import OperationalError, PoolError
+
+from conexion import PoolConexiones
+
+# El pool con una fábrica de conexiones simuladas en lugar de MySQL.
+
+
+class ConexionFalsa:
+    def __init__(self, numero):
+        self.numero = numero
+        self.in_transaction = False
+        self.conectada = True
+        self.falla_rollback = False
+        self.rollbacks = 0
+        self.cerrada = False
+
+    def rollback(self):
+        if self.falla_rollback:
+            raise OperationalError(msg="Lost connection to MySQL server during query", errno=2013)
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def is_connected(self):
+        return self.conectada
+
+    def close(self):
+        self.cerrada = True
+
+
+class Fabrica:
+    def __init__(self):
+        self.creadas = []
+
+    def __call__(self):
+        conexion = ConexionFalsa(len(self.creadas) + 1)
+        self.creadas.append(conexion)
+        return conexion
+
+
+@pytest.fixture
+def fabrica():
+    return Fabrica()
+
+
+def test_reutiliza_conexiones(fabrica):
+    pool = PoolConexiones(fabrica, tamano=2, minimas=1)
+    pool.precalentar()
+    assert len(fabrica.creadas) == 1
+
+    for _ in range(5):
+        with pool.obtener() as conexion:
+            assert conexion.numero == 1
+    assert pool.estadisticas()["prestamos"] == 5
+    assert pool.estadisticas()["creadas"] == 1
+
+    # Devuelta al pool, la envoltura ya no se puede usar
+    with pytest.raises(Error):
+        conexion.is_connected()
+
+
+def test_pool_agotado_espera_y_falla(fabrica):
+    pool = PoolConexiones(fabrica, tamano=2, minimas=0, espera=0.05)
+    primera = pool.obtener()
+    segunda = pool.obtener()
+
+    with pytest.raises(PoolError):
+        pool.obtener()
+    assert pool.estadisticas()["agotado"] == 1
+    assert len(fabrica.creadas) == 2
+
+    # Quien espera recibe la conexión que se devuelve
+    pool.espera = 2
+    recibida = []
+    hilo = threading.Thread(target=lambda: recibida.append(pool.obtener()))
+    hilo.start()
+    time.sleep(0.05)
+    primera.close()
+    hilo.join()
+    assert recibida[0].numero == 1
+    recibida[0].close()
+    segunda.close()
+    assert pool.estadisticas()["abiertas"] == 2
+
+
+def test_devolver_con_transaccion_abierta(fabrica):
+    pool = PoolConexiones(fabrica, tamano=1, minimas=0)
+    conexion = pool.obtener()
+    fabrica.creadas[0].in_transaction = True
+    conexion.close()
+    assert fabrica.creadas[0].rollbacks == 1
+    assert pool.estadisticas()["libres"] == 1
+
+    # Si el rollback falla, la conexión se descarta y su lugar queda libre
+    conexion = pool.obtener()
+    fabrica.creadas[0].in_transaction = True
+    fabrica.creadas[0].falla_rollback = True
+    conexion.close()
+    assert fabrica.creadas[0].cerrada
+    assert pool.estadisticas()["abiertas"] == 0
+    assert pool.obtener().numero == 2
+
+
+def test_verifica_y_desaloja_conexiones_ociosas(fabrica):
+    pool = PoolConexiones(fabrica, tamano=3, minimas=1, inactividad=0.05, verificar_tras=0)
+    prestadas = [pool.obtener() for _ in range(3)]
+    for conexion in prestadas:
+        conexion.close()
+
+    # Tras la inactividad solo se conservan las mínimas
+    time.sleep(0.1)
+    fabrica.creadas[2].conectada = False  # La más reciente, la primera que se presta
+    conexion = pool.obtener()
+    assert sum(c.cerrada for c in fabrica.creadas[:2]) == 2
+    # La que se cayó mientras estaba ociosa se descarta al prestarla
+    assert fabrica.creadas[2].cerrada
+    assert conexion.numero == 4
+    estadisticas = pool.estadisticas()
+    assert (estadisticas["desalojadas"], estadisticas["descartadas"]) == (2, 1)
@@ -0,0 +1,76 @@
+import threading
+import time
+
+import pytest
+from PyQt6.QtCore import QCoreApplication
+
+from ejecutor import EjecutorConsultas
+
+# El aviso de inactividad del ejecutor, con funciones que esperan una señal en lugar de
+# consultas a MySQL.
+
+
+@pytest.fixture(scope="module")
+def aplicacion():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+@pytest.fixture
+def ejecutor(aplicacion):
+    ejecutor = EjecutorConsultas(hilos=1)
+    ejecutor.avisos = []
+    ejecutor.inactivo.connect(lambda: ejecutor.avisos.append(ejecutor.pendientes()))
+    yield ejecutor
+    ejecutor.esperar(2000)
+
+
+def atender(aplicacion, ejecutor, avisos=1, segundos=2):
+    limite = time.monotonic() + segundos
+    while len(ejecutor.avisos) < avisos and time.monotonic() < limite:
+        aplicacion.processEvents()
+        time.sleep(0.01)
+
+
+def test_inactivo_al_terminar(aplicacion, ejecutor):
+    resultados = []
+    ejecutor.ejecutar(lambda: 1, al_terminar=resultados.append)
+    ejecutor.ejecutar(lambda: 2, al_terminar=resultados.append)
+    atender(aplicacion, ejecutor)
+
+    assert resultados == [1, 2]
+    assert ejecutor.avisos == [0]
+
+
+def test_inactivo_al_cancelar_la_ultima(aplicacion, ejecutor):
+    liberar = threading.Event()
+    resultados = []
+    ejecutor.ejecutar(liberar.wait, clave="ocupada", al_terminar=resultados.append)
+    ejecutor.ejecutar(lambda: "nunca", clave="en_espera", al_terminar=resultados.append)
+
+    ejecutor.cancelar("en_espera")
+    assert ejecutor.avisos == []  # Todavía queda una pendiente
+    ejecutor.cancelar("ocupada")
+    assert ejecutor.avisos == [0]
+
+    # Lo que termine después de cancelarse se descarta sin volver a avisar
+    liberar.set()
+    ejecutor.esperar(2000)
+    aplicacion.processEvents()
+    assert resultados == []
+    assert ejecutor.avisos == [0]
+
+
+def test_inactivo_con_tarea_reemplazada(aplicacion, ejecutor):
+    liberar = threading.Event()
+    resultados = []
+    ejecutor.ejecutar(liberar.wait, clave="buscar", al_terminar=resultados.append)
+    ejecutor.ejecutar(lambda: "vigente", clave="buscar", al_terminar=resultados.append)
+    # Reemplazarla no deja al ejecutor sin pendientes
+    assert ejecutor.avisos == []
+
+    liberar.set()
+    atender(aplicacion, ejecutor)
+    ejecutor.esperar(2000)
+    aplicacion.processEvents()
+    assert resultados == ["vigente"]
+    assert ejecutor.avisos == [0]
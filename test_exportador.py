@@ -0,0 +1,83 @@
+import pytest
+from mysql.connector.errors import InternalError
+
+from conexion import configurar_pool
+from exportador import exportar_ventas, COLUMNAS
+
+# La exportación contra una conexión simulada que, como mysql-connector, no deja cerrar un
+# cursor sin búfer mientras el servidor todavía tiene filas por enviar.
+
+
+class CursorSinBufer:
+    def __init__(self, conexion):
+        self.conexion = conexion
+
+    def execute(self, sql, parametros=()):
+        self.conexion.pendientes = list(self.conexion.filas)
+
+    def fetchmany(self, tamano):
+        bloque = self.conexion.pendientes[:tamano]
+        del self.conexion.pendientes[:tamano]
+        return bloque
+
+    def close(self):
+        if self.conexion.pendientes:
+            raise InternalError(msg="Unread result found")
+
+
+class ConexionFalsa:
+    def __init__(self, filas):
+        self.filas = filas
+        self.pendientes = []
+
+    @property
+    def in_transaction(self):
+        return False
+
+    def cursor(self, buffered=None):
+        return CursorSinBufer(self)
+
+    def consume_results(self):
+        self.pendientes = []
+
+    def rollback(self):
+        if self.pendientes:
+            raise InternalError(msg="Unread result found")
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def pool():
+    fila = (1, "2026-10-18 12:00:00", None, "General", 1, "Ana", "Efectivo", 10.0,
+            "7501", "Refresco", 1, 10.0, 10.0, None, None)
+    pool = configurar_pool(lambda: ConexionFalsa([fila] * 25), tamano=1, minimas=0)
+    yield pool
+    configurar_pool()
+
+
+def test_exportacion_completa(pool, tmp_path):
+    archivo = tmp_path / "ventas.csv"
+    assert exportar_ventas(str(archivo), "2026-10-01", "2026-10-31", tamano_bloque=10) == 25
+    assert archivo.read_text(encoding="utf-8").splitlines()[0] == ",".join(COLUMNAS)
+    assert pool.estadisticas()["libres"] == 1
+
+
+def test_exportacion_cortada_devuelve_la_conexion(pool, tmp_path):
+    def cancelar(filas):
+        raise RuntimeError("exportación cancelada")
+
+    # El error original llega al llamador en lugar del "Unread result found" del cierre
+    with pytest.raises(RuntimeError, match="cancelada"):
+        exportar_ventas(str(tmp_path / "ventas.jsonl.gz"), "2026-10-01", "2026-10-31",
+                        tamano_bloque=10, al_avanzar=cancelar)
+
+    # La conexión volvió al pool sin filas pendientes y se puede volver a prestar
+    assert pool.estadisticas()["libres"] == 1
+    conexion = pool.obtener(espera=0)
+    assert conexion.pendientes == []
+    conexion.close()
@@ -0,0 +1,87 @@
+import os
+
+import pytest
+from mysql.connector import Error
+
+import migraciones
+from conexion import CONFIGURACION, configurar_pool, obtener_conexion
+from migraciones import MINIMO_FILAS, consultas_frecuentes, verificar_planes
+
+# Los planes de las consultas frecuentes. La revisión contra MySQL necesita una base con
+# datos (la que deja python benchmark.py) en POS_PRUEBAS_BASE; sin ella se omite.
+BASE_PRUEBAS = os.environ.get("POS_PRUEBAS_BASE")
+
+
+class CursorExplain:
+    # Responde a cada EXPLAIN con los pasos que tenga anotados para esa consulta
+    def __init__(self, planes):
+        self.planes = planes
+        self.pasos = []
+
+    def execute(self, sql, parametros=()):
+        assert sql.startswith("EXPLAIN ")
+        self.pasos = self.planes.get(sql[len("EXPLAIN "):], [])
+
+    def fetchall(self):
+        return self.pasos
+
+    def close(self):
+        pass
+
+
+class ConexionExplain:
+    def __init__(self, planes):
+        self.planes = planes
+        self.in_transaction = False
+
+    def cursor(self, dictionary=False):
+        assert dictionary
+        return CursorExplain(self.planes)
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        pass
+
+
+def paso(tabla, tipo, filas):
+    return {"table": tabla, "type": tipo, "rows": filas}
+
+
+def test_verificar_planes_reporta_tablas_recorridas():
+    consultas = {nombre: sql for nombre, sql, _ in consultas_frecuentes()}
+    planes = {
+        consultas["Detalle de una venta"]: [paso("dv", "ref", 3), paso("a", "eq_ref", 1)],
+        consultas["Exportar ventas del mes"]: [paso("v", "ALL", MINIMO_FILAS * 50), paso("dv", "ref", 3)],
+        # Las tablas derivadas y las tablas chicas se leen completas sin que importe
+        consultas["Buscar clientes por prefijo"]: [paso("<union2,3,4>", "ALL", MINIMO_FILAS * 10)],
+        consultas["Cambios nuevos"]: [paso("cambios", "ALL", MINIMO_FILAS - 1)],
+    }
+    configurar_pool(lambda: ConexionExplain(planes), tamano=1, minimas=0)
+    try:
+        assert verificar_planes() == [("Exportar ventas del mes", "v", MINIMO_FILAS * 50)]
+    finally:
+        configurar_pool()
+
+
+@pytest.fixture
+def base_con_datos(monkeypatch):
+    if not BASE_PRUEBAS:
+        pytest.skip("sin base de datos de pruebas (POS_PRUEBAS_BASE)")
+    monkeypatch.setitem(CONFIGURACION, "database", BASE_PRUEBAS)
+    configurar_pool(tamano=2, minimas=0)
+    try:
+        obtener_conexion().close()
+    except Error as e:
+        configurar_pool()
+        pytest.skip(f"no se pudo abrir la base de pruebas: {e}")
+    yield
+    configurar_pool()
+
+
+def test_consultas_frecuentes_usan_indices(base_con_datos):
+    assert migraciones.pendientes() == [], "aplica las migraciones antes: python migraciones.py"
+    fallas = verificar_planes()
+    assert fallas == [], "\n".join(
+        f"{nombre}: recorre completa la tabla {tabla} (~{filas} filas)" for nombre, tabla, filas in fallas)
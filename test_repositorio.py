@@ -0,0 +1,121 @@
+import pytest
+from mysql.connector.errors import ProgrammingError
+
+import instrumentacion
+import repositorio
+from conexion import configurar_pool
+
+# La capa de consultas contra conexiones simuladas: cada conexión cuenta las sentencias que
+# prepara y responde a las consultas de repositorio con filas fijas.
+
+ARTICULOS = {
+    "7501": ("Refresco", 15.0, 10),
+    "7502": ("Galletas", 22.5, 4),
+    "7503": ("Café", 89.0, 0),
+}
+
+
+class CursorFalso:
+    def __init__(self, conexion, preparado):
+        self.conexion = conexion
+        self.preparado = preparado
+        self.filas = []
+        self.rowcount = -1
+
+    def execute(self, sql, parametros=()):
+        self.conexion.ejecutadas.append((sql, tuple(parametros)))
+        if sql is repositorio.ARTICULO:
+            self.filas = [ARTICULOS[parametros[0]]] if parametros[0] in ARTICULOS else []
+        elif sql is repositorio.DETALLES_VENTA:
+            self.filas = [("7501", "Refresco", 2, 15.0)]
+        elif sql is repositorio.FACTURA_VENTA:
+            self.filas = []
+        else:
+            raise ProgrammingError(msg="Table 'BodegaAurrera.inexistente' doesn't exist", errno=1146)
+        self.rowcount = len(self.filas)
+
+    def fetchall(self):
+        filas, self.filas = self.filas, []
+        return filas
+
+    def close(self):
+        assert not self.preparado, "los cursores preparados viven lo mismo que la conexión"
+
+
+class ConexionFalsa:
+    def __init__(self):
+        self.preparadas = 0
+        self.ejecutadas = []
+        self.in_transaction = False
+
+    def cursor(self, prepared=False):
+        if prepared:
+            self.preparadas += 1
+        return CursorFalso(self, prepared)
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def conexiones():
+    creadas = []
+
+    def fabrica():
+        creadas.append(ConexionFalsa())
+        return creadas[-1]
+
+    pool = configurar_pool(fabrica, tamano=1, minimas=0)
+    yield creadas, pool
+    configurar_pool()
+
+
+def test_sentencia_preparada_una_vez_por_conexion(conexiones):
+    creadas, pool = conexiones
+    assert repositorio.obtener_articulo("7501") == ("Refresco", 15.0, 10)
+    assert repositorio.obtener_articulo("7502") == ("Galletas", 22.5, 4)
+    assert repositorio.obtener_articulo("0000") is None
+
+    # La conexión del pool se reutiliza con la misma sentencia ya preparada
+    assert len(creadas) == 1
+    assert creadas[0].preparadas == 1
+    assert pool.estadisticas()["libres"] == 1
+
+
+def test_consulta_fallida_devuelve_la_conexion(conexiones):
+    creadas, pool = conexiones
+    with pytest.raises(ProgrammingError):
+        repositorio.consultar("SELECT * FROM inexistente WHERE id = %s", (1,))
+    assert pool.estadisticas()["libres"] == 1
+    assert repositorio.obtener_articulo("7503") == ("Café", 89.0, 0)
+
+
+def test_detalles_de_venta_en_un_prestamo(conexiones):
+    creadas, pool = conexiones
+    detalles, factura = repositorio.detalles_de_venta(12)
+    assert detalles == [("7501", "Refresco", 2, 15.0)]
+    assert factura is None
+    repositorio.detalles_de_venta(12)
+
+    # Las dos sentencias se preparan una vez y comparten la misma conexión
+    assert creadas[0].preparadas == 2
+    assert [parametros for _, parametros in creadas[0].ejecutadas] == [(12,)] * 4
+    assert pool.estadisticas()["libres"] == 1
+
+
+def test_instrumentacion_de_sentencias_preparadas(conexiones, monkeypatch):
+    monkeypatch.setattr(instrumentacion, "ACTIVA", True)
+    instrumentacion.registro.reiniciar()
+    try:
+        repositorio.obtener_articulo("7501")
+        repositorio.obtener_articulo("7502")
+        repositorio.obtener_articulo("0000")
+
+        resumen = {texto: datos for _, texto, datos in instrumentacion.registro.resumen()}
+        datos = resumen[instrumentacion.huella(repositorio.ARTICULO)]
+        assert (datos["llamadas"], datos["filas"]) == (3, 2)
+    finally:
+        instrumentacion.registro.reiniciar()
@@ -0,0 +1,306 @@
+import itertools
+import random
+import threading
+import time
+
+import pytest
+
+from conexion import configurar_pool, obtener_conexion
+from reservas import ReservasCaja
+from servicio_venta import registrar_venta, StockInsuficiente, DISPONIBLE
+
+# Varias cajas apartando y cobrando los mismos artículos a la vez, contra un servidor
+# simulado en memoria. Los bloqueos de fila de MySQL se simulan con un candado por servidor
+# que la conexión toma en su primera sentencia y suelta en commit o rollback: es más
+# estricto que InnoDB, pero las transacciones se intercalan igual que entre cajas reales.
+
+CAJAS = 8
+CARRITOS = 25
+
+
+class ServidorFalso:
+    def __init__(self, existencias):
+        self.existencias = dict(existencias)  # codigo -> existencias
+        self.reservas = {}                    # (terminal, codigo) -> (cantidad, expira)
+        self.ventas = {}                      # id_venta -> [(codigo, cantidad, precio), ...]
+        self.violaciones = []                 # Estados confirmados que rompen las reglas
+        self.candado = threading.Lock()
+
+    def apartado_otras(self, codigo, terminal):
+        ahora = time.monotonic()
+        return sum(cantidad for (otra, apartado), (cantidad, expira) in self.reservas.items()
+                   if apartado == codigo and otra != terminal and expira > ahora)
+
+    def disponible(self, codigo, terminal):
+        return self.existencias[codigo] - self.apartado_otras(codigo, terminal)
+
+    def revisar(self):
+        # Lo que vería una caja al leer después del commit
+        for codigo, existencias in self.existencias.items():
+            if existencias < 0:
+                self.violaciones.append(f"{codigo}: existencias {existencias}")
+            if self.apartado_otras(codigo, None) > existencias:
+                self.violaciones.append(f"{codigo}: apartado mayor a las existencias {existencias}")
+
+
+class CursorFalso:
+    def __init__(self, conexion):
+        self.conexion = conexion
+        self.servidor = conexion.servidor
+        self.resultado = []
+        self.rowcount = 0
+
+    def execute(self, sql, parametros=()):
+        self.conexion.empezar()
+        servidor = self.servidor
+        sentencia = " ".join(sql.split())
+        self.resultado = []
+        self.rowcount = 0
+
+        if sentencia.startswith("DELETE FROM reservas WHERE terminal = %s AND codigo IN"):
+            terminal, *codigos = parametros
+            for codigo in codigos:
+                self.conexion.cambiar(servidor.reservas, (terminal, codigo), None)
+        elif sentencia == "DELETE FROM reservas WHERE terminal = %s":
+            for llave in [llave for llave in servidor.reservas if llave[0] == parametros[0]]:
+                self.conexion.cambiar(servidor.reservas, llave, None)
+        elif sentencia.startswith("SELECT existencias FROM articulos WHERE codigo = %s FOR UPDATE"):
+            codigo = parametros[0]
+            if codigo in servidor.existencias:
+                self.resultado = [(servidor.existencias[codigo],)]
+        elif sentencia.startswith("SELECT COALESCE(SUM(cantidad), 0) FROM reservas"):
+            self.resultado = [(servidor.apartado_otras(*parametros),)]
+        elif sentencia.startswith("INSERT INTO reservas"):
+            terminal, codigo, cantidad, vigencia = parametros
+            self.conexion.cambiar(servidor.reservas, (terminal, codigo),
+                                  (cantidad, time.monotonic() + vigencia))
+        elif sentencia.startswith("INSERT INTO venta "):
+            self.conexion.cambiar(servidor.ventas, parametros[0], [])
+        elif sentencia == "SAVEPOINT descuento":
+            self.conexion.punto = len(self.conexion.deshacer)
+        elif sentencia == "ROLLBACK TO SAVEPOINT descuento":
+            self.conexion.deshacer_hasta(self.conexion.punto)
+        elif sentencia.startswith("UPDATE articulos a JOIN detalles_venta dv"):
+            # Con la condición de disponible solo se descuenta donde alcanza sin tocar lo
+            # apartado por otras cajas; sin ella se descuenta todo (ventas de la bitácora)
+            id_venta = parametros[0]
+            validar = " ".join(DISPONIBLE.split()) in sentencia
+            for codigo, cantidad, _ in servidor.ventas[id_venta]:
+                if not validar or servidor.disponible(codigo, parametros[1]) >= cantidad:
+                    self.conexion.cambiar(servidor.existencias, codigo,
+                                          servidor.existencias[codigo] - cantidad)
+                    self.rowcount += 1
+        elif sentencia.startswith("SELECT a.codigo,"):
+            terminal, id_venta, _ = parametros
+            self.resultado = [(codigo, servidor.disponible(codigo, terminal), cantidad)
+                              for codigo, cantidad, _ in servidor.ventas[id_venta]
+                              if servidor.disponible(codigo, terminal) < cantidad]
+        elif sentencia.startswith("DELETE r FROM reservas r"):
+            id_venta, terminal = parametros
+            for codigo, _, _ in servidor.ventas[id_venta]:
+                self.conexion.cambiar(servidor.reservas, (terminal, codigo), None)
+        elif not sentencia.startswith("INSERT INTO resumen_diario_"):
+            raise AssertionError(f"Sentencia no simulada: {sentencia}")
+
+    def executemany(self, sql, filas):
+        self.conexion.empezar()
+        assert sql.startswith("INSERT INTO detalles_venta")
+        for id_venta, codigo, cantidad, precio in filas:
+            self.servidor.ventas[id_venta].append((codigo, cantidad, precio))
+        self.rowcount = len(filas)
+
+    def fetchone(self):
+        return self.resultado[0] if self.resultado else None
+
+    def fetchall(self):
+        return self.resultado
+
+    def close(self):
+        pass
+
+
+class ConexionFalsa:
+    def __init__(self, servidor):
+        self.servidor = servidor
+        self.deshacer = []  # (diccionario, llave, valor anterior) de la transacción abierta
+        self.punto = 0
+        self.bloqueada = False
+
+    @property
+    def in_transaction(self):
+        return self.bloqueada
+
+    def empezar(self):
+        if not self.bloqueada:
+            if not self.servidor.candado.acquire(timeout=5):
+                raise AssertionError("Una transacción se quedó con los bloqueos")
+            self.bloqueada = True
+
+    def cambiar(self, diccionario, llave, valor):
+        self.deshacer.append((diccionario, llave, diccionario.get(llave)))
+        if valor is None:
+            diccionario.pop(llave, None)
+        else:
+            diccionario[llave] = valor
+
+    def deshacer_hasta(self, punto):
+        while len(self.deshacer) > punto:
+            diccionario, llave, anterior = self.deshacer.pop()
+            if anterior is None:
+                diccionario.pop(llave, None)
+            else:
+                diccionario[llave] = anterior
+
+    def terminar(self):
+        self.deshacer = []
+        if self.bloqueada:
+            self.bloqueada = False
+            self.servidor.candado.release()
+
+    def cursor(self, *args, **kwargs):
+        return CursorFalso(self)
+
+    def commit(self):
+        if self.bloqueada:
+            self.servidor.revisar()
+        self.terminar()
+
+    def rollback(self):
+        self.deshacer_hasta(0)
+        self.terminar()
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        self.rollback()
+
+
+def servidor_con(existencias):
+    servidor = ServidorFalso(existencias)
+    configurar_pool(lambda: ConexionFalsa(servidor), tamano=CAJAS, minimas=0, verificar_tras=0)
+    return servidor
+
+
+@pytest.fixture(autouse=True)
+def restaurar_pool():
+    yield
+    configurar_pool()
+
+
+folios = itertools.count(1)
+
+
+def cobrar(terminal, carrito):
+    # Como la caja al cobrar: una transacción con la venta completa
+    productos = [(codigo, f"Artículo {codigo}", cantidad, 10.0) for codigo, cantidad in carrito.items()]
+    conexion = None
+    cursor = None
+    try:
+        conexion = obtener_conexion()
+        cursor = conexion.cursor()
+        registrar_venta(cursor, next(folios), "2026-10-18 12:00:00", 10.0 * sum(carrito.values()),
+                        None, 1, "Efectivo", productos, terminal=terminal)
+        conexion.commit()
+    except Exception:
+        if conexion:
+            conexion.rollback()
+        raise
+    finally:
+        if cursor:
+            cursor.close()
+        if conexion:
+            conexion.close()
+
+
+def test_apartado_de_otra_caja_provoca_stock_insuficiente():
+    servidor = servidor_con({"7501": 5, "7502": 10})
+    caja_1 = ReservasCaja("caja-1")
+    caja_2 = ReservasCaja("caja-2")
+
+    caja_1.cambiar("7501", 4)
+    assert caja_1.sincronizar() == []
+    caja_2.cambiar("7501", 2)
+    assert caja_2.sincronizar() == [("7501", 2, 1)]
+
+    # La otra caja no puede cobrar lo que la primera tiene apartado, ni en parte
+    with pytest.raises(StockInsuficiente) as error:
+        cobrar("caja-2", {"7501": 2, "7502": 1})
+    assert error.value.faltantes == [("7501", 1, 2)]
+    assert servidor.existencias == {"7501": 5, "7502": 10}
+
+    # Al cobrar, la caja que apartó descuenta y suelta su apartado
+    cobrar("caja-1", {"7501": 4})
+    assert servidor.existencias == {"7501": 1, "7502": 10}
+    assert servidor.reservas == {}
+    assert servidor.violaciones == []
+
+
+def test_cajas_concurrentes():
+    inicial = {"7501": 20, "7502": 20, "7503": 20}
+    servidor = servidor_con(inicial)
+    vendido = {codigo: 0 for codigo in inicial}
+    rechazadas = {"con_apartado": 0, "sin_apartado": 0}
+    candado = threading.Lock()
+    errores = []
+
+    def caja(numero):
+        # Las cajas pares apartan al escanear; las impares cobran directo
+        terminal = f"caja-{numero}"
+        apartar = numero % 2 == 0
+        apartados = ReservasCaja(terminal)
+        azar = random.Random(numero)
+        try:
+            for _ in range(CARRITOS):
+                carrito = {codigo: azar.randint(1, 3)
+                           for codigo in azar.sample(sorted(inicial), azar.randint(1, 2))}
+                if apartar:
+                    for codigo, cantidad in carrito.items():
+                        apartados.cambiar(codigo, cantidad)
+                    # Una línea rechazada se queda con lo disponible y se vuelve a apartar;
+                    # si otra caja se adelanta tres veces, se suelta
+                    for intento in range(4):
+                        rechazados = apartados.sincronizar()
+                        for codigo, cantidad, disponible in rechazados:
+                            if disponible > 0 and intento < 3:
+                                carrito[codigo] = disponible
+                            else:
+                                carrito.pop(codigo)
+                                disponible = 0
+                            apartados.cambiar(codigo, disponible)
+                time.sleep(azar.uniform(0, 0.002))
+
+                if carrito:
+                    try:
+                        cobrar(terminal, carrito)
+                    except StockInsuficiente as e:
+                        # Solo se rechaza si de verdad faltaba algo
+                        assert all(disponible < cantidad for _, disponible, cantidad in e.faltantes)
+                        with candado:
+                            rechazadas["con_apartado" if apartar else "sin_apartado"] += 1
+                    else:
+                        with candado:
+                            for codigo, cantidad in carrito.items():
+                                vendido[codigo] += cantidad
+
+                if apartar:
+                    for codigo in carrito:
+                        apartados.cambiar(codigo, 0)
+                    apartados.sincronizar()
+        except Exception as e:
+            errores.append((terminal, e))
+
+    hilos = [threading.Thread(target=caja, args=(numero,)) for numero in range(CAJAS)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert errores == []
+    assert servidor.violaciones == []
+    assert servidor.existencias == {codigo: inicial[codigo] - vendido[codigo] for codigo in inicial}
+    # Lo apartado siempre se pudo cobrar; sin apartar, el stock se acabó para alguien
+    assert rechazadas["con_apartado"] == 0
+    assert rechazadas["sin_apartado"] > 0
+    # Ningún apartado quedó colgado al terminar
+    assert servidor.reservas == {}
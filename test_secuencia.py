@@ -0,0 +1,169 @@
+import sys
+import threading
+
+import pytest
+
+from conexion import configurar_pool
+from secuencia import AsignadorFolios
+
+# Varias terminales pidiendo folios a la vez contra una tabla secuencias simulada en memoria.
+# Como en InnoDB, el UPDATE bloquea la fila de la secuencia hasta el commit y LAST_INSERT_ID
+# es de cada conexión; el candado del servidor hace las veces del bloqueo de fila.
+
+TERMINALES = 8
+FOLIOS = 150  # Por terminal
+BLOQUE = 7
+
+
+class ServidorFalso:
+    def __init__(self, maximo_existente=0):
+        self.secuencias = {}        # nombre -> siguiente
+        self.maximo_existente = maximo_existente  # MAX(id_venta) antes de la primera reserva
+        self.bloques = []           # (inicio, limite) en el orden en que se confirmaron
+        self.candado = threading.Lock()
+
+
+class CursorFalso:
+    def __init__(self, conexion):
+        self.conexion = conexion
+        self.resultado = None
+        self.rowcount = 0
+
+    def execute(self, sql, parametros=()):
+        conexion = self.conexion
+        secuencias = conexion.servidor.secuencias
+        conexion.empezar()
+        self.rowcount = 0
+        if sql.startswith("UPDATE secuencias SET siguiente = LAST_INSERT_ID(siguiente + %s)"):
+            tamano, nombre = parametros
+            if nombre in secuencias:
+                secuencias[nombre] += tamano
+                conexion.ultimo_id = secuencias[nombre]
+                conexion.bloque = (secuencias[nombre] - tamano, secuencias[nombre])
+                self.rowcount = 1
+        elif sql.startswith("INSERT IGNORE INTO secuencias"):
+            nombre = parametros[0]
+            if nombre not in secuencias:
+                secuencias[nombre] = conexion.servidor.maximo_existente + 1
+                self.rowcount = 1
+        elif sql == "SELECT LAST_INSERT_ID()":
+            self.resultado = (conexion.ultimo_id,)
+        else:
+            raise AssertionError(f"Sentencia no simulada: {sql}")
+
+    def fetchone(self):
+        return self.resultado
+
+    def close(self):
+        pass
+
+
+class ConexionFalsa:
+    def __init__(self, servidor):
+        self.servidor = servidor
+        self.ultimo_id = 0
+        self.bloque = None
+        self.bloqueada = False
+
+    @property
+    def in_transaction(self):
+        return self.bloqueada
+
+    def empezar(self):
+        if not self.bloqueada:
+            if not self.servidor.candado.acquire(timeout=5):
+                raise AssertionError("Una transacción se quedó con el bloqueo de la secuencia")
+            self.bloqueada = True
+
+    def cursor(self, *args, **kwargs):
+        return CursorFalso(self)
+
+    def commit(self):
+        if self.bloque:
+            self.servidor.bloques.append(self.bloque)
+            self.bloque = None
+        self.terminar()
+
+    def rollback(self):
+        raise AssertionError("La reserva de un bloque no debería fallar")
+
+    def terminar(self):
+        if self.bloqueada:
+            self.bloqueada = False
+            self.servidor.candado.release()
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        self.terminar()
+
+
+@pytest.fixture
+def servidor():
+    # Cambios de hilo más frecuentes para que las carreras se noten
+    intervalo = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    servidor = ServidorFalso(maximo_existente=41)
+    configurar_pool(lambda: ConexionFalsa(servidor), tamano=TERMINALES, minimas=0, verificar_tras=0)
+    yield servidor
+    configurar_pool()
+    sys.setswitchinterval(intervalo)
+
+
+def en_paralelo(tarea, hilos):
+    resultados = [None] * hilos
+    errores = []
+    arranque = threading.Barrier(hilos)
+
+    def correr(numero):
+        try:
+            arranque.wait()
+            resultados[numero] = tarea()
+        except Exception as e:
+            errores.append(e)
+
+    trabajos = [threading.Thread(target=correr, args=(numero,)) for numero in range(hilos)]
+    for trabajo in trabajos:
+        trabajo.start()
+    for trabajo in trabajos:
+        trabajo.join()
+    assert errores == []
+    return resultados
+
+
+def revisar_bloques(bloques, primero, tamano):
+    # Bloques contiguos, del tamaño pedido y sin encimarse, desde el folio siguiente al más alto
+    assert bloques == [(inicio, inicio + tamano)
+                       for inicio in range(primero, primero + tamano * len(bloques), tamano)]
+
+
+def test_terminales_concurrentes(servidor):
+    # Cada terminal tiene su propio asignador, como una caja distinta
+    def terminal():
+        asignador = AsignadorFolios("venta", "venta", "id_venta", tamano_bloque=BLOQUE)
+        return [asignador.siguiente() for _ in range(FOLIOS)]
+
+    resultados = en_paralelo(terminal, TERMINALES)
+
+    todos = [folio for folios in resultados for folio in folios]
+    assert len(set(todos)) == len(todos)
+    for folios in resultados:
+        assert folios == sorted(folios)
+
+    bloques = sorted(servidor.bloques)
+    revisar_bloques(bloques, 42, BLOQUE)
+    # Cada folio sale de un bloque reservado; solo sobra el final del último de cada terminal
+    assert all(any(inicio <= folio < limite for inicio, limite in bloques) for folio in todos)
+    sobrantes = len(bloques) * BLOQUE - len(todos)
+    assert sobrantes == TERMINALES * ((-FOLIOS) % BLOQUE)
+
+
+def test_hilos_de_una_terminal(servidor):
+    # Varios hilos de la misma caja comparten el bloque en curso
+    asignador = AsignadorFolios("venta", "venta", "id_venta", tamano_bloque=BLOQUE)
+    resultados = en_paralelo(lambda: [asignador.siguiente() for _ in range(FOLIOS)], TERMINALES)
+
+    todos = sorted(folio for folios in resultados for folio in folios)
+    assert todos == list(range(42, 42 + TERMINALES * FOLIOS))
+    revisar_bloques(servidor.bloques, 42, BLOQUE)
@@ -1,19 +1,28 @@
 from conexion import obtener_conexion
+from cambios import obtener_monitor
+from referencias import referencias
+from modelo_tabla import ModeloTabla, PestanaCatalogo, crear_vista
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QFormLayout,
-    QLineEdit, QPushButton, QTableWidget, QTableWidgetItem,
-    QMessageBox, QHeaderView
+    QLineEdit, QPushButton, QMessageBox
 )
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QIntValidator
 
-class VentanaUnidad(QWidget):
-    def __init__(self, conexion):
+
+CONSULTA = "SELECT id_unidad, nombre FROM unidad"
+
+class VentanaUnidad(PestanaCatalogo, QWidget):
+    TABLA = "unidad"
+    CONSULTA = CONSULTA
+    LLAVE = "id_unidad"
+
+    def __init__(self):
         super().__init__()
-        self.conexion = conexion
         
         self.init_ui()
         self.cargar_datos()
+        obtener_monitor().cambiaron.connect(self.datos_cambiados)
 
     def init_ui(self):
         self.setWindowTitle("Gestión de Unidades")
@@ -39,8 +48,10 @@ class VentanaUnidad(QWidget):
         self.boton_limpiar = QPushButton("🧹 Limpiar")
         self.boton_limpiar.setStyleSheet("background-color: #FFC107; color: black;")
         
+        self.filtro_input = QLineEdit()
+        self.filtro_input.setPlaceholderText("Filtrar la tabla")
+        
         # Tabla
-        self.tabla = QTableWidget()
         self.configurar_tabla()
         
         # Layouts
@@ -57,6 +68,7 @@ class VentanaUnidad(QWidget):
         main_layout = QVBoxLayout()
         main_layout.addLayout(form_layout)
         main_layout.addLayout(button_layout)
+        main_layout.addWidget(self.filtro_input)
         main_layout.addWidget(self.tabla)
         
         self.setLayout(main_layout)
@@ -66,14 +78,12 @@ class VentanaUnidad(QWidget):
         self.boton_actualizar.clicked.connect(self.actualizar)
         self.boton_eliminar.clicked.connect(self.eliminar)
         self.boton_limpiar.clicked.connect(self.limpiar_campos)
-        self.tabla.itemDoubleClicked.connect(self.cargar_datos_desde_tabla)
+        self.tabla.doubleClicked.connect(self.cargar_datos_desde_tabla)
+        self.filtro_input.textChanged.connect(self.modelo.filtrar)
 
     def configurar_tabla(self):
-        self.tabla.setColumnCount(2)
-        self.tabla.setHorizontalHeaderLabels(["ID", "Nombre"])
-        self.tabla.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        self.tabla.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.tabla.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.modelo = ModeloTabla(["ID", "Nombre"])
+        self.tabla = crear_vista(self.modelo)
 
     def agregar(self):
         conexion = None
@@ -92,9 +102,10 @@ class VentanaUnidad(QWidget):
                 "INSERT INTO unidad (id_unidad, nombre) VALUES (%s, %s)",
                 (int(id_uni), nombre))
             conexion.commit()
+            referencias.invalidar("unidad")
+            self.modelo.guardar((int(id_uni), nombre))
             
             QMessageBox.information(self, "Éxito", "Unidad agregada correctamente")
-            self.cargar_datos()
             self.limpiar_campos()
             
         except Exception as e:
@@ -124,9 +135,11 @@ class VentanaUnidad(QWidget):
                 "UPDATE unidad SET nombre = %s WHERE id_unidad = %s",
                 (nombre, int(id_uni)))
             conexion.commit()
+            referencias.invalidar("unidad")
+            if cursor.rowcount:
+                self.modelo.guardar((int(id_uni), nombre))
             
             QMessageBox.information(self, "Éxito", "Unidad actualizada correctamente")
-            self.cargar_datos()
             
         except Exception as e:
             if conexion:
@@ -162,9 +175,10 @@ class VentanaUnidad(QWidget):
                 "DELETE FROM unidad WHERE id_unidad = %s",
                 (int(id_uni),))
             conexion.commit()
+            referencias.invalidar("unidad")
+            self.modelo.quitar(int(id_uni))
             
             QMessageBox.information(self, "Éxito", "Unidad eliminada correctamente")
-            self.cargar_datos()
             self.limpiar_campos()
             
         except Exception as e:
@@ -177,32 +191,10 @@ class VentanaUnidad(QWidget):
             if conexion:
                 conexion.close()
 
-    def cargar_datos(self):
-        conexion = None
-        cursor = None
-        try:
-            self.tabla.setRowCount(0)
-            conexion = obtener_conexion()
-            cursor = conexion.cursor()
-            cursor.execute("SELECT id_unidad, nombre FROM unidad ORDER BY id_unidad")
-            
-            for row_idx, (id_uni, nombre) in enumerate(cursor.fetchall()):
-                self.tabla.insertRow(row_idx)
-                self.tabla.setItem(row_idx, 0, QTableWidgetItem(str(id_uni)))
-                self.tabla.setItem(row_idx, 1, QTableWidgetItem(nombre))
-                
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error al cargar datos:\n{e}")
-        finally:
-            if cursor:
-                cursor.close()
-            if conexion:
-                conexion.close()
-
-    def cargar_datos_desde_tabla(self, item):
-        row = item.row()
-        self.id_input.setText(self.tabla.item(row, 0).text())
-        self.nombre_input.setText(self.tabla.item(row, 1).text())
+    def cargar_datos_desde_tabla(self, indice):
+        id_uni, nombre = self.modelo.fila(indice)
+        self.id_input.setText(str(id_uni))
+        self.nombre_input.setText(nombre)
 
     def limpiar_campos(self):
         self.id_input.clear()
@@ -1,25 +1,44 @@
-from conexion import obtener_conexion
+import sys
+import traceback
+from conexion import obtener_conexion, es_falla_de_conexion
+from ejecutor import obtener_ejecutor
+from cambios import obtener_monitor
+from catalogo import catalogo
+from directorio import directorio
+import repositorio
+from sesion import sesiones
+from reservas import reservas, RENOVAR_CADA
+import pausadas
+from servicio_venta import StockInsuficiente
+from bitacora import bitacora, ESPERA_EN_LINEA, INTERVALO_ENVIO
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QFormLayout,
     QLineEdit, QPushButton, QTableWidget, QTableWidgetItem,
     QMessageBox, QHeaderView, QSpinBox, QLabel, QGroupBox,
     QDialog, QListWidget, QAbstractItemView, QRadioButton,
-    QButtonGroup, QDialogButtonBox, QComboBox,QCheckBox
+    QButtonGroup, QDialogButtonBox, QComboBox,QCheckBox,
+    QTableView, QStyledItemDelegate
 )
-from PyQt6.QtCore import Qt, QDate, pyqtSignal, QEvent
-from PyQt6.QtGui import QDoubleValidator, QIntValidator, QKeyEvent
+from PyQt6.QtCore import Qt, QDate, QTimer, pyqtSignal, QEvent, QAbstractTableModel, QModelIndex
+from PyQt6.QtGui import QDoubleValidator, QIntValidator, QKeyEvent, QColor
 from datetime import datetime
-import json
+
+RESULTADOS_BUSQUEDA = 50  # Productos o clientes que muestra el buscador por cada tecla
 
 class SeleccionProductosDialog(QDialog):
     producto_seleccionado = pyqtSignal(str)
 
-    def __init__(self, conexion):
+    def __init__(self):
         super().__init__()
-        self.conexion = conexion
         self.setWindowTitle("Seleccionar Producto")
         self.resize(500, 400)
         
+        self.filtro_input = QLineEdit()
+        self.filtro_input.setPlaceholderText("Cargando productos...")
+        self.filtro_input.setEnabled(False)
+        self.filtro_input.textChanged.connect(self.filtrar_productos)
+        self.filtro_input.returnPressed.connect(self.seleccionar_producto)
+        
         self.lista_productos = QListWidget()
         self.lista_productos.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
         self.lista_productos.doubleClicked.connect(self.seleccionar_producto)
@@ -30,7 +49,12 @@ class SeleccionProductosDialog(QDialog):
         self.boton_cancelar = QPushButton("Cancelar")
         self.boton_cancelar.clicked.connect(self.reject)
         
+        # Enter en el filtro ya elige el producto; no debe disparar también un botón
+        self.boton_aceptar.setAutoDefault(False)
+        self.boton_cancelar.setAutoDefault(False)
+        
         layout = QVBoxLayout()
+        layout.addWidget(self.filtro_input)
         layout.addWidget(self.lista_productos)
         
         botones_layout = QHBoxLayout()
@@ -41,30 +65,55 @@ class SeleccionProductosDialog(QDialog):
         self.setLayout(layout)
         
         self.cargar_productos()
+        obtener_monitor().cambiaron.connect(self.datos_cambiados)
 
     def cargar_productos(self):
-        try:
-            conexion = obtener_conexion()
-            cursor = conexion.cursor()
-            
-            cursor.execute("""
-                SELECT a.codigo, a.nombre, a.precio, a.existencias 
-                FROM articulos a 
-                ORDER BY a.nombre
-            """)
-            
-            for codigo, nombre, precio, existencias in cursor.fetchall():
-                item_text = f"{codigo} - {nombre} - ${precio:.2f} - Stock: {existencias}"
-                item = QTableWidgetItem(item_text)
-                item.setData(Qt.ItemDataRole.UserRole, codigo)
-                self.lista_productos.addItem(item_text)
-                self.lista_productos.item(self.lista_productos.count()-1).setData(Qt.ItemDataRole.UserRole, codigo)
-                
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error al cargar productos:\n{e}")
-        finally:
-            cursor.close()
-            conexion.close()
+        # El índice de búsqueda se construye en segundo plano la primera vez
+        obtener_ejecutor().ejecutar(
+            catalogo.preparar_busqueda,
+            clave=(id(self), "cargar_productos"),
+            al_terminar=lambda _: self.busqueda_lista(),
+            al_fallar=lambda e: QMessageBox.critical(self, "Error", f"Error al cargar productos:\n{e}")
+        )
+
+    def busqueda_lista(self):
+        self.filtro_input.setPlaceholderText("Buscar por nombre o código")
+        self.filtro_input.setEnabled(True)
+        self.filtro_input.setFocus()
+        self.filtrar_productos(self.filtro_input.text())
+
+    def filtrar_productos(self, texto):
+        # Cada tecla consulta solo el índice en memoria
+        if self.filtro_input.isEnabled():
+            self.mostrar_productos(catalogo.buscar(texto, RESULTADOS_BUSQUEDA))
+
+    def datos_cambiados(self, tabla, llaves):
+        # El catálogo ya se corrigió; solo se vuelven a pedir los resultados visibles
+        if tabla == "articulos":
+            self.filtrar_productos(self.filtro_input.text())
+
+    def mostrar_productos(self, productos):
+        self.lista_productos.clear()
+        for codigo, nombre, precio, existencias in productos:
+            item_text = f"{codigo} - {nombre} - ${precio:.2f} - Stock: {existencias}"
+            self.lista_productos.addItem(item_text)
+            self.lista_productos.item(self.lista_productos.count()-1).setData(Qt.ItemDataRole.UserRole, codigo)
+        if productos:
+            self.lista_productos.setCurrentRow(0)
+
+    def keyPressEvent(self, event):
+        # Las flechas mueven la selección sin quitar el foco del filtro
+        if self.filtro_input.hasFocus() and event.key() in (Qt.Key.Key_Up, Qt.Key.Key_Down):
+            fila = self.lista_productos.currentRow() + (1 if event.key() == Qt.Key.Key_Down else -1)
+            if 0 <= fila < self.lista_productos.count():
+                self.lista_productos.setCurrentRow(fila)
+            return
+        super().keyPressEvent(event)
+
+    def done(self, resultado):
+        obtener_ejecutor().cancelar((id(self), "cargar_productos"))
+        obtener_monitor().cambiaron.disconnect(self.datos_cambiados)
+        super().done(resultado)
 
     def seleccionar_producto(self):
         selected = self.lista_productos.currentRow()
@@ -73,6 +122,180 @@ class SeleccionProductosDialog(QDialog):
             self.producto_seleccionado.emit(codigo)
             self.accept()
 
+class SeleccionClienteDialog(QDialog):
+    cliente_seleccionado = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Seleccionar Cliente")
+        self.resize(550, 400)
+        
+        self.filtro_input = QLineEdit()
+        self.filtro_input.setPlaceholderText("Buscar por teléfono, nombre o RFC")
+        self.filtro_input.textChanged.connect(self.filtrar_clientes)
+        self.filtro_input.returnPressed.connect(self.seleccionar_cliente)
+        
+        self.lista_clientes = QListWidget()
+        self.lista_clientes.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.lista_clientes.doubleClicked.connect(self.seleccionar_cliente)
+        
+        self.boton_aceptar = QPushButton("Aceptar")
+        self.boton_aceptar.clicked.connect(self.seleccionar_cliente)
+        
+        self.boton_cancelar = QPushButton("Cancelar")
+        self.boton_cancelar.clicked.connect(self.reject)
+        
+        self.boton_aceptar.setAutoDefault(False)
+        self.boton_cancelar.setAutoDefault(False)
+        
+        layout = QVBoxLayout()
+        layout.addWidget(self.filtro_input)
+        layout.addWidget(self.lista_clientes)
+        
+        botones_layout = QHBoxLayout()
+        botones_layout.addWidget(self.boton_aceptar)
+        botones_layout.addWidget(self.boton_cancelar)
+        
+        layout.addLayout(botones_layout)
+        self.setLayout(layout)
+        
+        self.cargar_clientes()
+
+    def cargar_clientes(self):
+        # El directorio se arma en segundo plano; mientras tanto se busca en la base de datos
+        obtener_ejecutor().ejecutar(
+            directorio.preparar_busqueda,
+            clave=(id(self), "cargar_clientes"),
+            al_terminar=lambda _: self.filtrar_clientes(self.filtro_input.text()),
+            al_fallar=lambda e: QMessageBox.critical(self, "Error", f"Error al cargar clientes:\n{e}")
+        )
+        self.filtrar_clientes("")
+
+    def filtrar_clientes(self, texto):
+        if directorio.lista():
+            obtener_ejecutor().cancelar((id(self), "buscar"))
+            self.mostrar_clientes(directorio.buscar(texto, RESULTADOS_BUSQUEDA))
+            return
+        obtener_ejecutor().ejecutar(
+            directorio.buscar, texto, RESULTADOS_BUSQUEDA,
+            clave=(id(self), "buscar"),
+            al_terminar=self.mostrar_clientes,
+            al_fallar=lambda e: QMessageBox.critical(self, "Error", f"Error al buscar clientes:\n{e}")
+        )
+
+    def mostrar_clientes(self, clientes):
+        self.lista_clientes.clear()
+        for telefono, nombre, direccion, rfc in clientes:
+            item_text = f"{telefono} - {nombre}"
+            if rfc:
+                item_text += f" - RFC: {rfc}"
+            self.lista_clientes.addItem(item_text)
+            self.lista_clientes.item(self.lista_clientes.count()-1).setData(Qt.ItemDataRole.UserRole, telefono)
+        if clientes:
+            self.lista_clientes.setCurrentRow(0)
+
+    def keyPressEvent(self, event):
+        if self.filtro_input.hasFocus() and event.key() in (Qt.Key.Key_Up, Qt.Key.Key_Down):
+            fila = self.lista_clientes.currentRow() + (1 if event.key() == Qt.Key.Key_Down else -1)
+            if 0 <= fila < self.lista_clientes.count():
+                self.lista_clientes.setCurrentRow(fila)
+            return
+        super().keyPressEvent(event)
+
+    def done(self, resultado):
+        obtener_ejecutor().cancelar((id(self), "cargar_clientes"))
+        obtener_ejecutor().cancelar((id(self), "buscar"))
+        super().done(resultado)
+
+    def seleccionar_cliente(self):
+        selected = self.lista_clientes.currentRow()
+        if selected >= 0:
+            telefono = self.lista_clientes.item(selected).data(Qt.ItemDataRole.UserRole)
+            self.cliente_seleccionado.emit(telefono)
+            self.accept()
+
+class VentasPausadasDialog(QDialog):
+    def __init__(self, id_empleado=None, parent=None):
+        super().__init__(parent)
+        self.id_empleado = id_empleado
+        self.id_pausa = None
+        self.setWindowTitle("Ventas pausadas")
+        self.resize(650, 400)
+        
+        self.solo_empleado_check = QCheckBox(f"Solo las del empleado {id_empleado}")
+        self.solo_empleado_check.setEnabled(id_empleado is not None)
+        self.solo_empleado_check.toggled.connect(self.cargar_pausadas)
+        
+        self.tabla_pausadas = QTableWidget()
+        self.tabla_pausadas.setColumnCount(6)
+        self.tabla_pausadas.setHorizontalHeaderLabels([
+            "Folio", "Hora", "Empleado", "Cliente", "Artículos", "Total"
+        ])
+        self.tabla_pausadas.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.tabla_pausadas.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.tabla_pausadas.setSelectionMode(QTableWidget.SelectionMode.SingleSelection)
+        self.tabla_pausadas.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.tabla_pausadas.verticalHeader().setVisible(False)
+        self.tabla_pausadas.doubleClicked.connect(self.seleccionar_pausada)
+        
+        self.boton_aceptar = QPushButton("Reanudar")
+        self.boton_aceptar.clicked.connect(self.seleccionar_pausada)
+        
+        self.boton_cancelar = QPushButton("Cancelar")
+        self.boton_cancelar.clicked.connect(self.reject)
+        
+        layout = QVBoxLayout()
+        layout.addWidget(self.solo_empleado_check)
+        layout.addWidget(self.tabla_pausadas)
+        
+        botones_layout = QHBoxLayout()
+        botones_layout.addWidget(self.boton_aceptar)
+        botones_layout.addWidget(self.boton_cancelar)
+        
+        layout.addLayout(botones_layout)
+        self.setLayout(layout)
+        
+        self.cargar_pausadas()
+
+    def cargar_pausadas(self):
+        id_empleado = self.id_empleado if self.solo_empleado_check.isChecked() else None
+        obtener_ejecutor().ejecutar(
+            pausadas.listar, id_empleado=id_empleado,
+            clave=(id(self), "cargar_pausadas"),
+            al_terminar=self.mostrar_pausadas,
+            al_fallar=lambda e: QMessageBox.critical(self, "Error", f"Error al cargar ventas pausadas:\n{e}")
+        )
+
+    def mostrar_pausadas(self, filas):
+        self.tabla_pausadas.setRowCount(len(filas))
+        for row_idx, (id_pausa, fecha, id_empleado, empleado, cliente, articulos, total) in enumerate(filas):
+            item_folio = QTableWidgetItem(str(id_pausa))
+            item_folio.setData(Qt.ItemDataRole.UserRole, id_pausa)
+            self.tabla_pausadas.setItem(row_idx, 0, item_folio)
+            self.tabla_pausadas.setItem(row_idx, 1, QTableWidgetItem(fecha.strftime("%d/%m %H:%M")))
+            self.tabla_pausadas.setItem(row_idx, 2, QTableWidgetItem(empleado or "Sin asignar"))
+            self.tabla_pausadas.setItem(row_idx, 3, QTableWidgetItem(cliente))
+            
+            item_articulos = QTableWidgetItem(str(articulos))
+            item_articulos.setTextAlignment(Qt.AlignmentFlag.AlignCenter | Qt.AlignmentFlag.AlignVCenter)
+            self.tabla_pausadas.setItem(row_idx, 4, item_articulos)
+            
+            item_total = QTableWidgetItem(f"${total:.2f}")
+            item_total.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            self.tabla_pausadas.setItem(row_idx, 5, item_total)
+        if filas:
+            self.tabla_pausadas.selectRow(0)
+
+    def done(self, resultado):
+        obtener_ejecutor().cancelar((id(self), "cargar_pausadas"))
+        super().done(resultado)
+
+    def seleccionar_pausada(self):
+        selected = self.tabla_pausadas.currentRow()
+        if selected >= 0:
+            self.id_pausa = self.tabla_pausadas.item(selected, 0).data(Qt.ItemDataRole.UserRole)
+            self.accept()
+
 class FacturacionDialog(QDialog):
     def __init__(self, cliente_actual, es_cliente_general=False, parent=None):
         super().__init__(parent)
@@ -181,16 +404,199 @@ class FacturacionDialog(QDialog):
         
         return datos
 
+class ModeloCarrito(QAbstractTableModel):
+    total_cambiado = pyqtSignal(float)
+    # codigo, cantidad nueva de su línea (0 si se quitó)
+    cantidad_cambiada = pyqtSignal(str, int)
+
+    ENCABEZADOS = ["Código", "Nombre", "Precio", "Cantidad", "Subtotal", "Acciones"]
+    COLUMNA_CANTIDAD = 3
+    COLUMNA_QUITAR = 5
+
+    def __init__(self, validar_cantidad=None, parent=None):
+        super().__init__(parent)
+        # Cada línea: [codigo, nombre, cantidad, precio]
+        self._lineas = []
+        self._filas = {}  # codigo -> fila
+        self._total = 0.0
+        # validar_cantidad(codigo, cantidad) -> bool, se consulta antes de aceptar un cambio
+        self.validar_cantidad = validar_cantidad
+
+    def productos(self):
+        return [tuple(linea) for linea in self._lineas]
+
+    def total(self):
+        return self._total
+
+    def fila_de(self, codigo):
+        return self._filas.get(codigo)
+
+    def cantidad(self, fila):
+        return self._lineas[fila][2]
+
+    def agregar(self, codigo, nombre, cantidad, precio):
+        # Si el código ya está en el carrito solo se suma a su línea
+        fila = self._filas.get(codigo)
+        if fila is not None:
+            self.establecer_cantidad(fila, self._lineas[fila][2] + cantidad)
+            return fila
+
+        fila = len(self._lineas)
+        self.beginInsertRows(QModelIndex(), fila, fila)
+        self._lineas.append([codigo, nombre, cantidad, precio])
+        self._filas[codigo] = fila
+        self.endInsertRows()
+        self._sumar_total(cantidad * precio)
+        self.cantidad_cambiada.emit(codigo, cantidad)
+        return fila
+
+    def establecer_cantidad(self, fila, cantidad):
+        linea = self._lineas[fila]
+        diferencia = (cantidad - linea[2]) * linea[3]
+        linea[2] = cantidad
+        self.dataChanged.emit(self.index(fila, self.COLUMNA_CANTIDAD), self.index(fila, 4))
+        self._sumar_total(diferencia)
+        self.cantidad_cambiada.emit(linea[0], cantidad)
+
+    def actualizar_articulo(self, codigo, nombre, precio):
+        # Nombre o precio cambiados mientras el artículo está en el carrito
+        fila = self._filas.get(codigo)
+        if fila is None:
+            return
+        linea = self._lineas[fila]
+        if linea[1] == nombre and linea[3] == precio:
+            return
+        diferencia = (precio - linea[3]) * linea[2]
+        linea[1] = nombre
+        linea[3] = precio
+        self.dataChanged.emit(self.index(fila, 1), self.index(fila, 4))
+        self._sumar_total(diferencia)
+
+    def quitar(self, fila):
+        if not 0 <= fila < len(self._lineas):
+            return
+        self.beginRemoveRows(QModelIndex(), fila, fila)
+        codigo, _, cantidad, precio = self._lineas.pop(fila)
+        del self._filas[codigo]
+        # Solo cambian de posición las líneas que estaban debajo
+        for indice in range(fila, len(self._lineas)):
+            self._filas[self._lineas[indice][0]] = indice
+        self.endRemoveRows()
+        self._sumar_total(-cantidad * precio)
+        self.cantidad_cambiada.emit(codigo, 0)
+
+    def cargar(self, productos):
+        anteriores = set(self._filas)
+        self.beginResetModel()
+        self._lineas = [list(producto) for producto in productos]
+        self._filas = {linea[0]: fila for fila, linea in enumerate(self._lineas)}
+        self.endResetModel()
+        self._total = round(sum(cantidad * precio for _, _, cantidad, precio in self._lineas), 2)
+        self.total_cambiado.emit(self._total)
+        for codigo in anteriores - self._filas.keys():
+            self.cantidad_cambiada.emit(codigo, 0)
+        for codigo, _, cantidad, _ in self._lineas:
+            self.cantidad_cambiada.emit(codigo, cantidad)
+
+    def limpiar(self):
+        self.cargar([])
+
+    def _sumar_total(self, diferencia):
+        # Se redondea en cada paso para no acumular error de punto flotante
+        self._total = round(self._total + diferencia, 2)
+        self.total_cambiado.emit(self._total)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._lineas)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.ENCABEZADOS)
+
+    def headerData(self, seccion, orientacion, rol=Qt.ItemDataRole.DisplayRole):
+        if orientacion == Qt.Orientation.Horizontal and rol == Qt.ItemDataRole.DisplayRole:
+            return self.ENCABEZADOS[seccion]
+        return None
+
+    def flags(self, indice):
+        banderas = super().flags(indice)
+        if indice.isValid() and indice.column() == self.COLUMNA_CANTIDAD:
+            banderas |= Qt.ItemFlag.ItemIsEditable
+        return banderas
+
+    def data(self, indice, rol=Qt.ItemDataRole.DisplayRole):
+        if not indice.isValid():
+            return None
+        codigo, nombre, cantidad, precio = self._lineas[indice.row()]
+        columna = indice.column()
+
+        if rol == Qt.ItemDataRole.DisplayRole:
+            if columna == 0:
+                return codigo
+            if columna == 1:
+                return nombre
+            if columna == 2:
+                return f"${precio:.2f}"
+            if columna == 3:
+                return str(cantidad)
+            if columna == 4:
+                return f"${cantidad * precio:.2f}"
+            return "❌"
+
+        if rol == Qt.ItemDataRole.EditRole and columna == self.COLUMNA_CANTIDAD:
+            return cantidad
+
+        if rol == Qt.ItemDataRole.TextAlignmentRole:
+            if columna in (2, 4):
+                return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+            if columna in (3, 5):
+                return Qt.AlignmentFlag.AlignCenter
+
+        if columna == self.COLUMNA_QUITAR:
+            if rol == Qt.ItemDataRole.BackgroundRole:
+                return QColor("#f44336")
+            if rol == Qt.ItemDataRole.ForegroundRole:
+                return QColor("white")
+            if rol == Qt.ItemDataRole.ToolTipRole:
+                return "Quitar producto"
+        return None
+
+    def setData(self, indice, valor, rol=Qt.ItemDataRole.EditRole):
+        if not indice.isValid() or indice.column() != self.COLUMNA_CANTIDAD or rol != Qt.ItemDataRole.EditRole:
+            return False
+        fila = indice.row()
+        cantidad = int(valor)
+        if cantidad == self._lineas[fila][2]:
+            return False
+        if self.validar_cantidad and not self.validar_cantidad(self._lineas[fila][0], cantidad):
+            return False
+        self.establecer_cantidad(fila, cantidad)
+        return True
+
+class CantidadDelegate(QStyledItemDelegate):
+    # El QSpinBox solo existe mientras se edita la celda
+    def createEditor(self, parent, opcion, indice):
+        editor = QSpinBox(parent)
+        editor.setRange(1, 999)
+        editor.setFrame(False)
+        return editor
+
+    def setEditorData(self, editor, indice):
+        editor.setValue(indice.data(Qt.ItemDataRole.EditRole))
+
+    def setModelData(self, editor, modelo, indice):
+        editor.interpretText()
+        modelo.setData(indice, editor.value(), Qt.ItemDataRole.EditRole)
+
 class VentanaVenta(QWidget):
-    def __init__(self, conexion):
+    def __init__(self):
         super().__init__()
-        self.conexion = conexion
-        self.productos_agregados = []
+        self.carrito = ModeloCarrito(self.validar_cantidad, self)
         self.cliente_actual = None
-        self.venta_pausada = None
+        self.escaneos_pendientes = {}  # codigo -> cantidad escaneada mientras se consulta
         
         self.init_ui()
         self.installEventFilter(self)
+        obtener_monitor().cambiaron.connect(self.datos_cambiados)
 
     def init_ui(self):
         self.setWindowTitle("Registro de Ventas")
@@ -204,6 +610,9 @@ class VentanaVenta(QWidget):
         self.boton_buscar_cliente = QPushButton("🔍 Buscar")
         self.boton_buscar_cliente.setStyleSheet("background-color: #9E9E9E; color: white;")
         
+        self.boton_directorio = QPushButton("📇 Directorio")
+        self.boton_directorio.setStyleSheet("background-color: #607D8B; color: white;")
+        
         self.cliente_info = QLabel("Cliente: General")
         self.cliente_info.setStyleSheet("font-weight: bold;")
         
@@ -258,7 +667,6 @@ class VentanaVenta(QWidget):
         
         self.boton_continuar = QPushButton("▶ Continuar venta")
         self.boton_continuar.setStyleSheet("background-color: #FF9800; color: white;")
-        self.boton_continuar.hide()
         
         self.boton_pagar = QPushButton("💳 Pagar")
         self.boton_pagar.setStyleSheet("background-color: #2196F3; color: white; font-weight: bold;")
@@ -267,18 +675,40 @@ class VentanaVenta(QWidget):
         self.boton_limpiar.setStyleSheet("background-color: #FFC107; color: black;")
         
         # Tabla de productos
-        self.tabla_productos = QTableWidget()
+        self.tabla_productos = QTableView()
         self.configurar_tabla()
         
         # Información de la venta
         self.label_total = QLabel("Total: $0.00")
         self.label_total.setStyleSheet("font-size: 18px; font-weight: bold; color: #2E7D32;")
         
+        # Aviso de ventas guardadas en la bitácora local que aún no llegan a MySQL
+        self.label_bitacora = QLabel()
+        self.label_bitacora.setStyleSheet("font-weight: bold; color: #FF9800;")
+        self.label_bitacora.hide()
+        self.temporizador_bitacora = QTimer(self)
+        self.temporizador_bitacora.timeout.connect(self.actualizar_estado_bitacora)
+        self.temporizador_bitacora.start(INTERVALO_ENVIO * 1000)
+        
+        # Las ventas pausadas que expiran se borran en segundo plano
+        self.temporizador_purga = QTimer(self)
+        self.temporizador_purga.timeout.connect(self.purgar_pausadas)
+        self.temporizador_purga.start(pausadas.INTERVALO_PURGA * 1000)
+        self.purgar_pausadas()
+        
+        # Existencias apartadas por el carrito; se renuevan mientras la caja sigue abierta
+        self.reservando = False
+        self.temporizador_reservas = QTimer(self)
+        self.temporizador_reservas.timeout.connect(self.renovar_reservas)
+        self.temporizador_reservas.start(RENOVAR_CADA * 1000)
+        obtener_ejecutor().ejecutar(reservas.liberar_todo, al_fallar=self.reportar_error_reservas)
+        
         # Layouts
         cliente_layout = QHBoxLayout()
         cliente_layout.addWidget(QLabel("Teléfono cliente:"))
         cliente_layout.addWidget(self.telefono_input)
         cliente_layout.addWidget(self.boton_buscar_cliente)
+        cliente_layout.addWidget(self.boton_directorio)
         
         cliente_group = QGroupBox("Datos del Cliente")
         cliente_group.setLayout(QVBoxLayout())
@@ -330,6 +760,7 @@ class VentanaVenta(QWidget):
         main_layout.addWidget(self.tabla_productos)
         main_layout.addWidget(pago_group)
         main_layout.addWidget(self.label_total)
+        main_layout.addWidget(self.label_bitacora)
         main_layout.addLayout(acciones_layout)
         
         self.setLayout(main_layout)
@@ -341,6 +772,7 @@ class VentanaVenta(QWidget):
         # Conexiones
         self.boton_buscar_cliente.clicked.connect(self.buscar_cliente)
         self.telefono_input.returnPressed.connect(self.buscar_cliente)
+        self.boton_directorio.clicked.connect(self.mostrar_directorio)
         self.boton_agregar.clicked.connect(self.agregar_producto)
         self.boton_quitar.clicked.connect(self.quitar_producto)
         self.boton_pagar.clicked.connect(self.procesar_pago)
@@ -352,28 +784,40 @@ class VentanaVenta(QWidget):
         self.radio_efectivo.toggled.connect(self.actualizar_metodo_pago)
         self.monto_efectivo.textChanged.connect(self.calcular_cambio)
         self.id_empleado_input.textChanged.connect(self.actualizar_nombre_empleado)
+        self.carrito.total_cambiado.connect(self.mostrar_total)
+        self.carrito.cantidad_cambiada.connect(self.apartar)
+        self.tabla_productos.clicked.connect(self.celda_presionada)
 
     def actualizar_nombre_empleado(self):
         id_empleado = self.id_empleado_input.text()
+        obtener_ejecutor().cancelar((id(self), "empleado"))
         if not id_empleado:
             self.empleado_nombre_label.setText("Empleado: No asignado")
             return
-            
-        try:
-            conexion = obtener_conexion()
-            cursor = conexion.cursor()
-            cursor.execute("SELECT nombre FROM empleado WHERE id_empleado = %s", (int(id_empleado),))
-            empleado = cursor.fetchone()
-            
-            if empleado:
-                self.empleado_nombre_label.setText(f"Empleado: {empleado[0]}")
-            else:
-                self.empleado_nombre_label.setText("Empleado: No encontrado")
-        except Exception as e:
-            self.empleado_nombre_label.setText("Empleado: Error al buscar")
-        finally:
-            cursor.close()
-            conexion.close()
+        
+        # Empleado ya verificado en este turno: no se consulta la base de datos
+        sesion = sesiones.verificada(int(id_empleado))
+        if sesion:
+            self.mostrar_sesion(sesion)
+            return
+        
+        # Cada tecla reemplaza la búsqueda anterior que siga pendiente
+        obtener_ejecutor().ejecutar(
+            repositorio.consultar, repositorio.NOMBRE_EMPLEADO, (int(id_empleado),),
+            clave=(id(self), "empleado"),
+            al_terminar=lambda filas: self.mostrar_nombre_empleado(int(id_empleado), filas),
+            al_fallar=lambda e: self.empleado_nombre_label.setText("Empleado: Error al buscar")
+        )
+
+    def mostrar_nombre_empleado(self, id_empleado, filas):
+        if filas:
+            self.mostrar_sesion(sesiones.abrir(id_empleado, filas[0][0]))
+        else:
+            self.empleado_nombre_label.setText("Empleado: No encontrado")
+
+    def mostrar_sesion(self, sesion):
+        nombre = sesion.nombre or "(sin verificar)"
+        self.empleado_nombre_label.setText(f"Empleado: {nombre}    {sesion.resumen()}")
 
     def eventFilter(self, obj, event):
         if event.type() == QEvent.Type.KeyPress:
@@ -400,13 +844,18 @@ class VentanaVenta(QWidget):
         super().timerEvent(event)
 
     def configurar_tabla(self):
-        self.tabla_productos.setColumnCount(6)
-        self.tabla_productos.setHorizontalHeaderLabels([
-            "Código", "Nombre", "Precio", "Cantidad", "Subtotal", "Acciones"
-        ])
+        self.tabla_productos.setModel(self.carrito)
+        self.tabla_productos.setItemDelegateForColumn(
+            ModeloCarrito.COLUMNA_CANTIDAD, CantidadDelegate(self.tabla_productos))
         self.tabla_productos.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        self.tabla_productos.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.tabla_productos.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.tabla_productos.verticalHeader().setVisible(False)
+        self.tabla_productos.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.tabla_productos.setSelectionMode(QTableView.SelectionMode.SingleSelection)
+        self.tabla_productos.setEditTriggers(
+            QTableView.EditTrigger.DoubleClicked |
+            QTableView.EditTrigger.SelectedClicked |
+            QTableView.EditTrigger.EditKeyPressed
+        )
         
         self.tabla_productos.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
         self.tabla_productos.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)
@@ -433,7 +882,7 @@ class VentanaVenta(QWidget):
         if not self.radio_efectivo.isChecked():
             return
             
-        total = sum(cant * precio for _, _, cant, precio in self.productos_agregados)
+        total = self.carrito.total()
         monto_recibido = float(self.monto_efectivo.text() or 0)
         
         if monto_recibido >= total:
@@ -445,8 +894,18 @@ class VentanaVenta(QWidget):
             self.label_cambio.setText(f"Faltante: ${faltante:.2f}")
             self.label_cambio.setStyleSheet("font-weight: bold; color: #f44336;")
 
+    def datos_cambiados(self, tabla, llaves):
+        # Precios o nombres cambiados desde otra pestaña u otra terminal
+        if tabla != "articulos" or llaves is None:
+            return
+        for codigo, _, _, _ in self.carrito.productos():
+            if codigo in llaves:
+                articulo = catalogo.obtener(codigo)
+                if articulo:
+                    self.carrito.actualizar_articulo(codigo, articulo[0], articulo[1])
+
     def mostrar_seleccion_productos(self):
-        dialog = SeleccionProductosDialog(self.conexion)
+        dialog = SeleccionProductosDialog()
         dialog.producto_seleccionado.connect(self.producto_seleccionado_handler)
         dialog.exec()
 
@@ -454,49 +913,50 @@ class VentanaVenta(QWidget):
         self.codigo_input.setText(codigo)
         self.codigo_input.setFocus()
 
+    def mostrar_directorio(self):
+        dialog = SeleccionClienteDialog(self)
+        dialog.cliente_seleccionado.connect(self.cliente_seleccionado_handler)
+        dialog.exec()
+
+    def cliente_seleccionado_handler(self, telefono):
+        # Se confirma con la consulta exacta para tener la dirección y el RFC vigentes
+        self.telefono_input.setText(telefono)
+        self.buscar_cliente()
+
     def buscar_cliente(self):
         telefono = self.telefono_input.text()
         
         if not telefono:
+            obtener_ejecutor().cancelar((id(self), "cliente"))
             self.cliente_actual = None
             self.cliente_info.setText("Cliente: General (0000000000)")
             return
-            
-        try:
-            conexion = obtener_conexion()
-            cursor = conexion.cursor()
-            
-            cursor.execute("""
-                SELECT nombre, direccion, rfc 
-                FROM clientes 
-                WHERE telefono = %s
-            """, (telefono,))
-            
-            cliente = cursor.fetchone()
-            
-            if cliente:
-                nombre, direccion, rfc = cliente
-                self.cliente_actual = {
-                    'telefono': telefono,
-                    'nombre': nombre,
-                    'direccion': direccion,
-                    'rfc': rfc
-                }
-                info = f"Cliente: {nombre}"
-                if rfc:
-                    info += f" (RFC: {rfc})"
-                self.cliente_info.setText(info)
-            else:
-                self.cliente_actual = None
-                self.cliente_info.setText("Cliente: General (0000000000)")
-                QMessageBox.information(self, "Cliente no encontrado", 
-                                    "Se usará cliente general para esta venta")
-                    
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error al buscar cliente:\n{e}")
-        finally:
-            cursor.close()
-            conexion.close()
+        
+        obtener_ejecutor().ejecutar(
+            repositorio.buscar_cliente, telefono,
+            clave=(id(self), "cliente"),
+            al_terminar=lambda filas: self.mostrar_cliente(telefono, filas),
+            al_fallar=lambda e: QMessageBox.critical(self, "Error", f"Error al buscar cliente:\n{e}")
+        )
+
+    def mostrar_cliente(self, telefono, filas):
+        if filas:
+            nombre, direccion, rfc = filas[0]
+            self.cliente_actual = {
+                'telefono': telefono,
+                'nombre': nombre,
+                'direccion': direccion,
+                'rfc': rfc
+            }
+            info = f"Cliente: {nombre}"
+            if rfc:
+                info += f" (RFC: {rfc})"
+            self.cliente_info.setText(info)
+        else:
+            self.cliente_actual = None
+            self.cliente_info.setText("Cliente: General (0000000000)")
+            QMessageBox.information(self, "Cliente no encontrado", 
+                                "Se usará cliente general para esta venta")
 
     def agregar_producto(self):
         codigo = self.codigo_input.text()
@@ -507,290 +967,235 @@ class VentanaVenta(QWidget):
             return
             
         try:
-            conexion = obtener_conexion()
-            cursor = conexion.cursor()
-            
-            # Verificar si el producto ya está en el carrito
-            producto_existente = None
-            for idx, (cod, nombre, cant, precio) in enumerate(self.productos_agregados):
-                if cod == codigo:
-                    producto_existente = (idx, nombre, precio)
-                    break
-            
-            # Si el producto ya existe, actualizamos la cantidad
-            if producto_existente:
-                idx, nombre, precio = producto_existente
-                nueva_cantidad = self.productos_agregados[idx][2] + cantidad
-                
-                # Verificar stock
-                cursor.execute("SELECT existencias FROM articulos WHERE codigo = %s", (codigo,))
-                existencias = cursor.fetchone()[0]
-                
-                if existencias < nueva_cantidad:
-                    QMessageBox.warning(
-                        self, 
-                        "Stock insuficiente", 
-                        f"Stock actual: {existencias}. No hay suficientes existencias para {nueva_cantidad} unidades."
-                    )
+            # Si el producto ya está en el carrito solo se suma a su línea
+            fila = self.carrito.fila_de(codigo)
+            if fila is not None:
+                nueva_cantidad = self.carrito.cantidad(fila) + cantidad
+                if not self.validar_cantidad(codigo, nueva_cantidad):
                     return
-                
-                self.productos_agregados[idx] = (codigo, nombre, nueva_cantidad, precio)
-                self.actualizar_tabla()
+                self.carrito.establecer_cantidad(fila, nueva_cantidad)
+                self.tabla_productos.selectRow(fila)
                 self.codigo_input.clear()
                 self.codigo_input.setFocus()
                 return
             
-            # Si es un producto nuevo, lo agregamos
-            cursor.execute("""
-                SELECT a.codigo, a.nombre, a.precio, a.existencias 
-                FROM articulos a 
-                WHERE a.codigo = %s
-            """, (codigo,))
-            
-            producto = cursor.fetchone()
-            
-            if not producto:
-                QMessageBox.warning(self, "No encontrado", "Producto no encontrado")
-                return
-                
-            codigo, nombre, precio, existencias = producto
-            
-            if existencias < cantidad:
-                QMessageBox.warning(
-                    self, 
-                    "Stock insuficiente", 
-                    f"Stock actual: {existencias}. No hay suficientes existencias."
-                )
+            # Si es un producto nuevo, lo buscamos en el catálogo en memoria
+            producto = catalogo.obtener(codigo)
+            if producto is None:
+                # No está en memoria (alta reciente o código mal escrito): se consulta en
+                # segundo plano y la caja sigue escaneando
+                self.codigo_input.clear()
+                self.codigo_input.setFocus()
+                self.consultar_producto(codigo, cantidad)
                 return
-                
-            self.productos_agregados.append((codigo, nombre, cantidad, precio))
-            self.actualizar_tabla()
             
-            self.codigo_input.clear()
-            self.codigo_input.setFocus()
+            if self.agregar_nuevo(codigo, cantidad, producto):
+                self.codigo_input.clear()
+                self.codigo_input.setFocus()
             
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Error al agregar producto:\n{e}")
-        finally:
-            cursor.close()
-            conexion.close()
-
-    def quitar_producto(self):
-        if not self.productos_agregados:
-            return
-            
-        selected = self.tabla_productos.currentRow()
-        
-        if selected >= 0:
-            self.productos_agregados.pop(selected)
-            self.actualizar_tabla()
 
-    def actualizar_tabla(self):
-        self.tabla_productos.setRowCount(0)
-        total = 0.0
+    def agregar_nuevo(self, codigo, cantidad, producto):
+        nombre, precio, existencias = producto
         
-        for idx, (codigo, nombre, cantidad, precio) in enumerate(self.productos_agregados):
-            subtotal = cantidad * precio
-            total += subtotal
-            
-            self.tabla_productos.insertRow(idx)
-            
-            # Código
-            self.tabla_productos.setItem(idx, 0, QTableWidgetItem(codigo))
-            
-            # Nombre
-            self.tabla_productos.setItem(idx, 1, QTableWidgetItem(nombre))
-            
-            # Precio
-            item_precio = QTableWidgetItem(f"${precio:.2f}")
-            item_precio.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-            self.tabla_productos.setItem(idx, 2, item_precio)
-            
-            # Cantidad (editable)
-            spin_cantidad = QSpinBox()
-            spin_cantidad.setRange(1, 999)
-            spin_cantidad.setValue(cantidad)
-            spin_cantidad.valueChanged.connect(lambda value, row=idx: self.actualizar_cantidad(row, value))
-            self.tabla_productos.setCellWidget(idx, 3, spin_cantidad)
-            
-            # Subtotal
-            item_subtotal = QTableWidgetItem(f"${subtotal:.2f}")
-            item_subtotal.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-            self.tabla_productos.setItem(idx, 4, item_subtotal)
-            
-            # Botones de acción
-            btn_quitar = QPushButton("❌")
-            btn_quitar.setStyleSheet("background-color: #f44336; color: white;")
-            btn_quitar.clicked.connect(lambda _, row=idx: self.quitar_producto_por_indice(row))
-            
-            btn_layout = QHBoxLayout()
-            btn_layout.addWidget(btn_quitar)
-            btn_layout.setContentsMargins(0, 0, 0, 0)
+        if existencias < cantidad:
+            QMessageBox.warning(
+                self, 
+                "Stock insuficiente", 
+                f"Stock actual: {existencias}. No hay suficientes existencias."
+            )
+            return False
             
-            widget = QWidget()
-            widget.setLayout(btn_layout)
-            self.tabla_productos.setCellWidget(idx, 5, widget)
-        
-        self.label_total.setText(f"Total: ${total:.2f}")
-        self.calcular_cambio()
+        fila = self.carrito.agregar(codigo, nombre, cantidad, precio)
+        self.tabla_productos.scrollTo(self.carrito.index(fila, 0))
+        return True
 
-    def actualizar_cantidad(self, row, nueva_cantidad):
+    def consultar_producto(self, codigo, cantidad):
+        # Escaneos repetidos del mismo código mientras se consulta se suman
+        if codigo in self.escaneos_pendientes:
+            self.escaneos_pendientes[codigo] += cantidad
+            return
+        self.escaneos_pendientes[codigo] = cantidad
+        obtener_ejecutor().ejecutar(
+            catalogo.cargar_uno, codigo,
+            clave=(id(self), "escaneo", codigo),
+            al_terminar=lambda producto: self.producto_consultado(codigo, producto),
+            al_fallar=lambda e: self.producto_no_consultado(codigo, e)
+        )
+
+    def producto_consultado(self, codigo, producto):
+        if codigo not in self.escaneos_pendientes:
+            return  # La venta se terminó o se canceló mientras tanto
+        cantidad = self.escaneos_pendientes.pop(codigo)
+        if not producto:
+            QMessageBox.warning(self, "No encontrado", f"Producto no encontrado: {codigo}")
+            return
+        fila = self.carrito.fila_de(codigo)
+        if fila is None:
+            self.agregar_nuevo(codigo, cantidad, producto)
+        elif self.validar_cantidad(codigo, self.carrito.cantidad(fila) + cantidad):
+            self.carrito.establecer_cantidad(fila, self.carrito.cantidad(fila) + cantidad)
+
+    def producto_no_consultado(self, codigo, error):
+        if self.escaneos_pendientes.pop(codigo, None) is None:
+            return
+        if es_falla_de_conexion(error):
+            QMessageBox.warning(self, "No encontrado",
+                                f"El producto {codigo} no está en el catálogo local y el servidor no responde")
+        else:
+            QMessageBox.critical(self, "Error", f"Error al agregar producto:\n{error}")
+
+    def validar_cantidad(self, codigo, cantidad):
         try:
-            codigo = self.productos_agregados[row][0]
-            
-            conexion = obtener_conexion()
-            cursor = conexion.cursor()
-            
-            cursor.execute("SELECT existencias FROM articulos WHERE codigo = %s", (codigo,))
-            existencias = cursor.fetchone()[0]
-            
-            if existencias < nueva_cantidad:
-                QMessageBox.warning(
-                    self, 
-                    "Stock insuficiente", 
-                    f"Stock actual: {existencias}. No hay suficientes existencias."
-                )
-                # Restaurar cantidad anterior
-                spin = self.tabla_productos.cellWidget(row, 3)
-                spin.setValue(self.productos_agregados[row][2])
-                return
-            
-            # Actualizar cantidad en la lista
-            producto = list(self.productos_agregados[row])
-            producto[2] = nueva_cantidad
-            self.productos_agregados[row] = tuple(producto)
-            
-            # Actualizar subtotal
-            subtotal = nueva_cantidad * self.productos_agregados[row][3]
-            item_subtotal = QTableWidgetItem(f"${subtotal:.2f}")
-            item_subtotal.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-            self.tabla_productos.setItem(row, 4, item_subtotal)
-            
-            # Recalcular total
-            total = sum(cant * precio for _, _, cant, precio in self.productos_agregados)
-            self.label_total.setText(f"Total: ${total:.2f}")
-            self.calcular_cambio()
-            
+            existencias = catalogo.existencias(codigo)
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Error al actualizar cantidad:\n{e}")
-        finally:
-            cursor.close()
-            conexion.close()
+            return False
+            
+        if existencias is None or existencias < cantidad:
+            QMessageBox.warning(
+                self, 
+                "Stock insuficiente", 
+                f"Stock actual: {existencias}. No hay suficientes existencias para {cantidad} unidades."
+            )
+            return False
+        return True
 
-    def quitar_producto_por_indice(self, idx):
-        if 0 <= idx < len(self.productos_agregados):
-            self.productos_agregados.pop(idx)
-            self.actualizar_tabla()
+    def apartar(self, codigo, cantidad):
+        reservas.cambiar(codigo, cantidad)
+        self.sincronizar_reservas()
+
+    def sincronizar_reservas(self):
+        # Una sincronización a la vez; lo que cambie mientras tanto se envía al terminar
+        if self.reservando:
+            return
+        self.reservando = True
+        obtener_ejecutor().ejecutar(
+            reservas.sincronizar,
+            al_terminar=self.reservas_aplicadas,
+            al_fallar=self.reservas_fallidas
+        )
+
+    def reservas_aplicadas(self, rechazados):
+        self.reservando = False
+        avisos = []
+        for codigo, cantidad, disponible in rechazados:
+            fila = self.carrito.fila_de(codigo)
+            if fila is None or self.carrito.cantidad(fila) != cantidad:
+                continue  # La línea ya cambió otra vez
+            # Otra caja apartó o vendió esas existencias: la línea se queda con lo que hay
+            disponible = max(disponible, 0)
+            if disponible:
+                self.carrito.establecer_cantidad(fila, disponible)
+            else:
+                self.carrito.quitar(fila)
+            avisos.append(f"{self.nombre_articulo(codigo)}: se pidieron {cantidad}, disponibles {disponible}")
+        if reservas.hay_pendientes():
+            self.sincronizar_reservas()
+        if avisos:
+            QMessageBox.warning(self, "Existencias apartadas por otra caja",
+                                "Se ajustó el carrito:\n" + "\n".join(avisos))
+
+    def reservas_fallidas(self, error):
+        self.reservando = False
+        self.reportar_error_reservas(error)
+
+    def reportar_error_reservas(self, error):
+        # Sin base de datos se sigue vendiendo; el cobro valida las existencias al final
+        if not es_falla_de_conexion(error):
+            traceback.print_exception(type(error), error, error.__traceback__, file=sys.stderr)
+
+    def renovar_reservas(self):
+        # También reintenta lo que no se pudo enviar por falta de conexión
+        if reservas.hay_pendientes():
+            self.sincronizar_reservas()
+        obtener_ejecutor().ejecutar(reservas.renovar, al_fallar=self.reportar_error_reservas)
+
+    def quitar_producto(self):
+        selected = self.tabla_productos.currentIndex().row()
+        
+        if selected >= 0:
+            self.carrito.quitar(selected)
+
+    def celda_presionada(self, indice):
+        if indice.column() == ModeloCarrito.COLUMNA_QUITAR:
+            self.carrito.quitar(indice.row())
+
+    def mostrar_total(self, total):
+        self.label_total.setText(f"Total: ${total:.2f}")
+        self.calcular_cambio()
 
     def pausar_venta(self):
-        if not self.productos_agregados:
+        productos = self.carrito.productos()
+        if not productos:
             QMessageBox.warning(self, "Venta vacía", "No hay productos para pausar")
             return
             
         try:
-            conexion = obtener_conexion()
-            cursor = conexion.cursor()
-            
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS ventas_pausadas (
-                    id_pausa INT AUTO_INCREMENT PRIMARY KEY,
-                    telefono_cliente VARCHAR(10),
-                    cliente_info TEXT,
-                    productos TEXT,
-                    id_empleado INT,
-                    fecha_pausa DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            productos_json = json.dumps(self.productos_agregados)
-            
-            telefono = self.cliente_actual['telefono'] if self.cliente_actual else None
-            cliente_info = json.dumps(self.cliente_actual) if self.cliente_actual else None
             id_empleado = int(self.id_empleado_input.text()) if self.id_empleado_input.text() else None
+            id_pausa = pausadas.pausar(productos, self.cliente_actual, id_empleado)
             
-            cursor.execute(
-                "INSERT INTO ventas_pausadas (telefono_cliente, cliente_info, productos, id_empleado) VALUES (%s, %s, %s, %s)",
-                (telefono, cliente_info, productos_json, id_empleado)
-            )
-            
-            conexion.commit()
-            
-            self.venta_pausada = {
-                'telefono': telefono,
-                'cliente_info': self.cliente_actual.copy() if self.cliente_actual else None,
-                'productos': self.productos_agregados.copy(),
-                'id_empleado': id_empleado
-            }
-            
-            QMessageBox.information(self, "Venta pausada", "La venta ha sido pausada correctamente")
+            QMessageBox.information(self, "Venta pausada", f"La venta ha sido pausada con el folio {id_pausa}")
             self.limpiar_venta()
-            self.boton_continuar.show()
-            self.boton_pausar.hide()
             
         except Exception as e:
-            if conexion:
-                conexion.rollback()
             QMessageBox.critical(self, "Error", f"No se pudo pausar la venta:\n{e}")
-        finally:
-            cursor.close()
-            conexion.close()
 
     def continuar_venta(self):
-        try:
-            conexion = obtener_conexion()
-            cursor = conexion.cursor()
+        if self.carrito.rowCount():
+            QMessageBox.warning(self, "Venta en curso",
+                                "Pausa o termina la venta actual antes de reanudar otra")
+            return
             
-            cursor.execute("""
-                SELECT id_pausa, telefono_cliente, cliente_info, productos, id_empleado
-                FROM ventas_pausadas 
-                ORDER BY fecha_pausa DESC 
-                LIMIT 1
-            """)
+        id_empleado = int(self.id_empleado_input.text()) if self.id_empleado_input.text() else None
+        dialog = VentasPausadasDialog(id_empleado, self)
+        if dialog.exec() != QDialog.DialogCode.Accepted or dialog.id_pausa is None:
+            return
             
-            venta_pausada = cursor.fetchone()
+        try:
+            venta_pausada = pausadas.tomar(dialog.id_pausa)
             
-            if venta_pausada:
-                id_pausa, telefono, cliente_info_json, productos_json, id_empleado = venta_pausada
-                
-                # Cargar datos del cliente
-                if cliente_info_json:
-                    self.cliente_actual = json.loads(cliente_info_json)
-                    self.telefono_input.setText(self.cliente_actual['telefono'])
-                    info = f"Cliente: {self.cliente_actual['nombre']}"
-                    if 'rfc' in self.cliente_actual and self.cliente_actual['rfc']:
-                        info += f" (RFC: {self.cliente_actual['rfc']})"
-                    self.cliente_info.setText(info)
-                else:
-                    self.cliente_actual = None
-                    self.cliente_info.setText("Cliente: General")
-                
-                # Cargar productos
-                productos = json.loads(productos_json)
-                self.productos_agregados = productos
-                self.actualizar_tabla()
-                
-                # Cargar ID de empleado
-                if id_empleado:
-                    self.id_empleado_input.setText(str(id_empleado))
-                    self.actualizar_nombre_empleado()
-                
-                # Eliminar la venta pausada
-                cursor.execute("DELETE FROM ventas_pausadas WHERE id_pausa = %s", (id_pausa,))
-                conexion.commit()
-                
-                self.boton_continuar.hide()
-                self.boton_pausar.show()
+            if venta_pausada is None:
+                QMessageBox.warning(self, "No disponible", "La venta ya fue reanudada en otra caja o expiró")
+                return
                 
-                QMessageBox.information(self, "Venta reanudada", "Se ha reanudado la venta pausada con todos los datos")
+            # Cargar datos del cliente
+            if venta_pausada['cliente']:
+                self.cliente_actual = venta_pausada['cliente']
+                self.telefono_input.setText(self.cliente_actual['telefono'])
+                info = f"Cliente: {self.cliente_actual['nombre']}"
+                if 'rfc' in self.cliente_actual and self.cliente_actual['rfc']:
+                    info += f" (RFC: {self.cliente_actual['rfc']})"
+                self.cliente_info.setText(info)
+            else:
+                self.cliente_actual = None
+                self.cliente_info.setText("Cliente: General")
+            
+            # Cargar productos (los nombres salen del catálogo en memoria)
+            self.carrito.cargar(pausadas.deserializar_productos(
+                venta_pausada['productos'], self.nombre_articulo))
+            
+            # Cargar ID de empleado
+            if venta_pausada['id_empleado']:
+                self.id_empleado_input.setText(str(venta_pausada['id_empleado']))
+                self.actualizar_nombre_empleado()
+            
+            QMessageBox.information(self, "Venta reanudada", "Se ha reanudado la venta pausada con todos los datos")
                 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"No se pudo continuar la venta:\n{e}")
-        finally:
-            cursor.close()
-            conexion.close()
+
+    def purgar_pausadas(self):
+        obtener_ejecutor().ejecutar(pausadas.purgar_expiradas, clave=(id(self), "purga"))
+
+    def nombre_articulo(self, codigo):
+        articulo = catalogo.obtener(codigo)
+        return articulo[0] if articulo else codigo
 
     def procesar_pago(self):
-        if not self.productos_agregados:
+        productos = self.carrito.productos()
+        if not productos:
             QMessageBox.warning(self, "Venta vacía", "No hay productos en la venta")
             return
             
@@ -803,27 +1208,30 @@ class VentanaVenta(QWidget):
             QMessageBox.warning(self, "Método de pago requerido", "Seleccione un método de pago")
             return
             
-        try:
-            id_empleado = int(self.id_empleado_input.text())
-            
-            # Verificar si el empleado existe
-            conexion = obtener_conexion()
-            cursor = conexion.cursor()
-            cursor.execute("SELECT nombre FROM empleado WHERE id_empleado = %s", (id_empleado,))
-            empleado = cursor.fetchone()
-            
-            if not empleado:
-                QMessageBox.warning(self, "Empleado no encontrado", "El ID de empleado no existe")
-                return
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error al validar empleado:\n{e}")
-            return
-        finally:
-            cursor.close()
-            conexion.close()
+        id_empleado = int(self.id_empleado_input.text())
+        # El empleado se verifica una vez por turno; después se cobra sin consultarlo
+        sesion = sesiones.verificada(id_empleado)
+        if sesion:
+            nombre_empleado = sesion.nombre
+        else:
+            try:
+                # Sin el aviso de obtener_conexion: si MySQL no responde la venta va a la bitácora
+                nombre_empleado = repositorio.nombre_empleado(id_empleado, espera=ESPERA_EN_LINEA)
+                
+                if not nombre_empleado:
+                    QMessageBox.warning(self, "Empleado no encontrado", "El ID de empleado no existe")
+                    return
+                sesion = sesiones.abrir(id_empleado, nombre_empleado)
+            except Exception as e:
+                if not es_falla_de_conexion(e):
+                    QMessageBox.critical(self, "Error", f"Error al validar empleado:\n{e}")
+                    return
+                # Sin base de datos se cobra igual; el empleado se valida al enviar la bitácora
+                nombre_empleado = "(sin verificar)"
+                sesion = sesiones.abrir(id_empleado, None)
             
         if self.radio_efectivo.isChecked():
-            total = sum(cant * precio for _, _, cant, precio in self.productos_agregados)
+            total = self.carrito.total()
             monto_recibido = float(self.monto_efectivo.text() or 0)
             
             if monto_recibido < total:
@@ -882,51 +1290,36 @@ class VentanaVenta(QWidget):
                         conexion.close()
         
         try:
-            conexion = obtener_conexion()
-            cursor = conexion.cursor()
+            total = self.carrito.total()
             
-            total = sum(cant * precio for _, _, cant, precio in self.productos_agregados)
-            
-            cursor.execute("SELECT IFNULL(MAX(id_venta), 0) + 1 FROM venta")
-            id_venta = cursor.fetchone()[0]
             fecha = datetime.now().date()
             metodo_pago = "EFECTIVO" if self.radio_efectivo.isChecked() else "TARJETA"
             
             # Usar teléfono del cliente actual o del cliente general
             telefono_cliente = self.cliente_actual['telefono'] if self.cliente_actual else '0000000000'
             
-            cursor.execute(
-                """INSERT INTO venta (id_venta, fecha, importe, telefono, id_empleado, metodo_pago) 
-                VALUES (%s, %s, %s, %s, %s, %s)""",
-                (id_venta, fecha, total, telefono_cliente, id_empleado, metodo_pago)
-            )
-            
-            if datos_factura:
-                cursor.execute(
-                    """INSERT INTO facturas 
-                    (id_venta, rfc, razon_social, direccion_fiscal, email) 
-                    VALUES (%s, %s, %s, %s, %s)""",
-                    (id_venta, datos_factura['rfc'], datos_factura['razon_social'], 
-                    datos_factura['direccion_fiscal'], datos_factura['email'])
-                )
-            
-            for codigo, _, cantidad, precio in self.productos_agregados:
-                cursor.execute(
-                    "INSERT INTO detalles_venta (id_venta, codigo, cantidad, precio) VALUES (%s, %s, %s, %s)",
-                    (id_venta, codigo, cantidad, precio)
-                )
-                
-                cursor.execute(
-                    "UPDATE articulos SET existencias = existencias - %s WHERE codigo = %s",
-                    (cantidad, codigo)
-                )
-            
-            conexion.commit()
-            
-            resumen = f"VENTA #{id_venta}\n"
+            # Se confirma en la bitácora local y el hilo de envío la manda a MySQL enseguida
+            id_venta, en_linea = bitacora.guardar_venta({
+                'fecha': fecha,
+                'total': total,
+                'telefono': telefono_cliente,
+                'id_empleado': id_empleado,
+                'metodo_pago': metodo_pago,
+                'productos': productos,
+                'datos_factura': datos_factura
+            })
+            
+            catalogo.descontar_existencias(
+                [(codigo, cantidad) for codigo, _, cantidad, _ in productos])
+            sesion.registrar_venta(total, en_linea)
+            self.actualizar_estado_bitacora()
+            
+            resumen = f"VENTA #{id_venta}\n" if id_venta else "VENTA (folio pendiente)\n"
+            if not en_linea:
+                resumen += "Guardada sin conexión; se enviará al servidor automáticamente\n"
             resumen += f"Fecha: {fecha.strftime('%d/%m/%Y %H:%M')}\n"
             resumen += f"Cliente: {self.cliente_actual['nombre'] if self.cliente_actual else 'General'}\n"
-            resumen += f"Empleado: {empleado[0]} (ID: {id_empleado})\n"
+            resumen += f"Empleado: {nombre_empleado} (ID: {id_empleado})\n"
             resumen += f"Método de pago: {metodo_pago}\n"
             
             if self.radio_efectivo.isChecked():
@@ -945,7 +1338,7 @@ class VentanaVenta(QWidget):
             
             resumen += "--------------------------------\n"
             
-            for codigo, nombre, cantidad, precio in self.productos_agregados:
+            for codigo, nombre, cantidad, precio in productos:
                 resumen += f"{nombre[:20]:<20} {cantidad:>3} x ${precio:.2f} = ${cantidad*precio:.2f}\n"
             
             resumen += "--------------------------------\n"
@@ -960,13 +1353,26 @@ class VentanaVenta(QWidget):
             
             self.limpiar_venta()
             
+        except StockInsuficiente as e:
+            mensaje = "No hay existencias suficientes para completar la venta:\n"
+            for codigo, existencias, cantidad in e.faltantes:
+                # Se corrige el stock en memoria con el que informó MySQL; invalidarlo dejaría
+                # el artículo fuera del catálogo mientras sigue en el carrito
+                articulo = catalogo.obtener(codigo)
+                if articulo:
+                    catalogo.actualizar_articulo(codigo, articulo[0], articulo[1], existencias)
+                mensaje += f"{codigo}: stock actual {existencias}, solicitado {cantidad}\n"
+            QMessageBox.warning(self, "Stock insuficiente", mensaje)
         except Exception as e:
-            if conexion:
-                conexion.rollback()
             QMessageBox.critical(self, "Error", f"No se pudo registrar la venta:\n{e}")
-        finally:
-            cursor.close()
-            conexion.close()
+
+    def actualizar_estado_bitacora(self):
+        pendientes = bitacora.pendientes()
+        if pendientes:
+            self.label_bitacora.setText(f"⚠ Ventas sin enviar al servidor: {pendientes}")
+            self.label_bitacora.show()
+        else:
+            self.label_bitacora.hide()
 
     def limpiar_venta(self):
         self.telefono_input.clear()
@@ -974,14 +1380,19 @@ class VentanaVenta(QWidget):
         self.cliente_info.setText("Cliente: General (0000000000)")
         self.codigo_input.clear()
         self.cantidad_spin.setValue(1)
-        self.productos_agregados = []
-        self.actualizar_tabla()
+        self.carrito.limpiar()
+        self.escaneos_pendientes.clear()
         # Deseleccionamos ambos métodos de pago al limpiar
         self.radio_efectivo.setChecked(False)
         self.radio_tarjeta.setChecked(False)
         self.monto_efectivo.clear()
-        self.id_empleado_input.clear()
-        self.empleado_nombre_label.setText("Empleado: No asignado")
+        # El empleado sigue en turno para la siguiente venta
+        sesion = sesiones.verificada(int(self.id_empleado_input.text())) if self.id_empleado_input.text() else None
+        if sesion:
+            self.mostrar_sesion(sesion)
+        else:
+            self.id_empleado_input.clear()
+            self.empleado_nombre_label.setText("Empleado: No asignado")
         self.telefono_input.setFocus()
         # Actualizamos el estado de los controles de pago
         self.actualizar_metodo_pago()
\ No newline at end of file